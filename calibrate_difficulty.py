@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+题目难度校准（答题记录 + Rasch 模型）
+====================================
+questions.difficulty 目前来自导入时的猜测：QuestionParser 固定为 2，
+AdvancedQuestionParser._estimate_difficulty 按题干 + 解析长度估计。
+user_answers 已积累真实作答数据，本工具据此批量重算难度：
+
+  1. 服务端游标（psycopg2 命名游标）分块读取 user_answers，题目 / 用户 id 映射为
+     连续整数后累积为 NumPy 数组，默认每个用户每题只取首次作答（DISTINCT ON）；
+  2. 用 np.bincount 向量化计算每题通过率（p 值）；
+  3. Rasch 模型联合极大似然（JMLE）：反复剔除满分 / 零分的人与题后，
+     对全部作答同时做 Newton 更新，得到题目难度 b（logit）、标准误与 infit；
+  4. b 按固定 logit 切点映射为 1-5 级；样本不足 Rasch 估计的题退回 p 值
+     （含 questions.correct_count / answer_count 汇总），其 logit 先线性换算到 b 尺度
+     再用同一组切点，作答太少的题保持原值；
+  5. 结果 COPY 到临时表后一条 UPDATE 批量写回，只更新难度有变化的题。
+
+使用方法：
+  python calibrate_difficulty.py                          # 读取 DATABASE_URL，生成更新载荷
+  psql "$DATABASE_URL" -f shuju/难度校准_更新.sql
+  python calibrate_difficulty.py --execute                # 直接批量写回
+  python calibrate_difficulty.py --csv user_answers.csv   # 离线：导出的 user_id,question_id,is_correct
+  python calibrate_difficulty.py --benchmark 1000000 5000000
+
+输入：user_answers / questions 表（环境变量 DATABASE_URL）或导出的作答 CSV
+输出：shuju/难度校准_更新.sql（COPY 载荷）、shuju/难度校准报告.json
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ 需要安装 numpy")
+    print("   运行：pip install numpy")
+    exit(1)
+
+
+DEFAULT_OUTPUT = 'shuju/难度校准_更新.sql'
+DEFAULT_REPORT = 'shuju/难度校准报告.json'
+
+CHUNK_SIZE = 100_000
+MIN_ITEM_RESPONSES = 20        # 少于该作答数的题不改难度
+MIN_PERSON_RESPONSES = 5       # 少于该作答数的用户不参与 Rasch 估计
+MAX_ITER = 100
+TOLERANCE = 1e-3
+MAX_STEP = 1.0                 # 单次 Newton 步长上限（logit）
+LOGIT_CUTS = [-1.5, -0.5, 0.5, 1.5]   # b 切点 -> 难度 1-5
+
+STAGING_TABLE = 'difficulty_calibration'
+STAGING_DDL = f"CREATE TEMP TABLE {STAGING_TABLE} (id TEXT PRIMARY KEY, difficulty INTEGER NOT NULL) ON COMMIT DROP;\n"
+UPDATE_SQL = (f"UPDATE questions q SET difficulty = s.difficulty, updated_at = now()\n"
+              f"FROM {STAGING_TABLE} s\n"
+              f"WHERE q.id = s.id AND q.difficulty IS DISTINCT FROM s.difficulty;\n")
+
+ANSWERS_SQL = """
+SELECT {distinct}user_id::text, question_id, is_correct
+FROM user_answers
+WHERE user_id IS NOT NULL AND question_id IS NOT NULL AND is_correct IS NOT NULL
+{order}
+"""
+QUESTIONS_SQL = "SELECT id, difficulty, COALESCE(correct_count, 0), COALESCE(answer_count, 0) FROM questions"
+
+
+@dataclass
+class ResponseData:
+    """作答记录：person / item 为连续整数下标"""
+    question_ids: List[str]
+    n_persons: int
+    person: np.ndarray
+    item: np.ndarray
+    correct: np.ndarray
+
+
+class ResponseCollector:
+    """分块累积作答，字符串 id 映射为连续整数"""
+
+    def __init__(self):
+        self.items: Dict[str, int] = {}
+        self.persons: Dict[str, int] = {}
+        self.chunks: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self.rows = 0
+
+    def add(self, rows: List[Tuple]):
+        if not rows:
+            return
+        persons, items = self.persons, self.items
+        person = np.fromiter((persons.setdefault(r[0], len(persons)) for r in rows), np.int32, len(rows))
+        item = np.fromiter((items.setdefault(r[1], len(items)) for r in rows), np.int32, len(rows))
+        correct = np.fromiter((bool(r[2]) for r in rows), np.int8, len(rows))
+        self.chunks.append((person, item, correct))
+        self.rows += len(rows)
+
+    def finish(self, first_attempt: bool = False) -> ResponseData:
+        if self.chunks:
+            person, item, correct = (np.concatenate(parts) for parts in zip(*self.chunks))
+        else:
+            person, item, correct = np.empty(0, np.int32), np.empty(0, np.int32), np.empty(0, np.int8)
+        self.chunks = []
+        if first_attempt and len(person):
+            # 按读入顺序保留每个 (用户, 题) 的第一条
+            key = person.astype(np.int64) * max(len(self.items), 1) + item
+            _, first = np.unique(key, return_index=True)
+            first.sort()
+            person, item, correct = person[first], item[first], correct[first]
+        question_ids = [None] * len(self.items)
+        for qid, idx in self.items.items():
+            question_ids[idx] = qid
+        return ResponseData(question_ids, len(self.persons), person, item, correct)
+
+
+@dataclass
+class RaschResult:
+    b: np.ndarray              # 题目难度（logit），未估计的为 nan
+    se: np.ndarray
+    infit: np.ndarray
+    theta: np.ndarray
+    fitted_items: np.ndarray   # bool
+    fitted_persons: int
+    responses: int
+    iterations: int
+    converged: bool
+
+
+def fit_rasch(data: ResponseData, min_item: int = MIN_ITEM_RESPONSES,
+              min_person: int = MIN_PERSON_RESPONSES, max_iter: int = MAX_ITER,
+              tol: float = TOLERANCE) -> RaschResult:
+    """JMLE：人与题同步 Newton 更新（步长截断），全部向量化在作答数组上"""
+    n_items, n_persons = len(data.question_ids), data.n_persons
+    person, item, correct = data.person, data.item, data.correct.astype(np.float64)
+
+    # 满分 / 零分（以及作答太少）的人和题没有有限估计，反复剔除直到稳定
+    active = np.ones(len(correct), dtype=bool)
+    while True:
+        p_total = np.bincount(person[active], minlength=n_persons)
+        p_right = np.bincount(person[active], weights=correct[active], minlength=n_persons)
+        i_total = np.bincount(item[active], minlength=n_items)
+        i_right = np.bincount(item[active], weights=correct[active], minlength=n_items)
+        bad_person = (p_total < min_person) | (p_right == 0) | (p_right == p_total)
+        bad_item = (i_total < min_item) | (i_right == 0) | (i_right == i_total)
+        drop = active & (bad_person[person] | bad_item[item])
+        if not drop.any():
+            break
+        active &= ~drop
+
+    pp, ii, xx = person[active], item[active], correct[active]
+    fitted_items = i_total > 0
+    fitted_persons = p_total > 0
+    theta = np.zeros(n_persons)
+    b = np.zeros(n_items)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        theta[fitted_persons] = np.log(p_right[fitted_persons] / (p_total[fitted_persons] - p_right[fitted_persons]))
+        b[fitted_items] = -np.log(i_right[fitted_items] / (i_total[fitted_items] - i_right[fitted_items]))
+    if fitted_items.any():
+        b[fitted_items] -= b[fitted_items].mean()
+
+    iterations, converged = 0, len(xx) == 0
+    while not converged and iterations < max_iter:
+        iterations += 1
+        prob = 1.0 / (1.0 + np.exp(b[ii] - theta[pp]))
+        resid = xx - prob
+        info = prob * (1.0 - prob)
+        item_info = np.bincount(ii, weights=info, minlength=n_items)
+        item_step = np.divide(np.bincount(ii, weights=resid, minlength=n_items), item_info,
+                              out=np.zeros(n_items), where=item_info > 0)
+        person_info = np.bincount(pp, weights=info, minlength=n_persons)
+        person_step = np.divide(np.bincount(pp, weights=resid, minlength=n_persons), person_info,
+                                out=np.zeros(n_persons), where=person_info > 0)
+        b -= np.clip(item_step, -MAX_STEP, MAX_STEP)
+        theta += np.clip(person_step, -MAX_STEP, MAX_STEP)
+        b[fitted_items] -= b[fitted_items].mean()      # 识别约束：题目难度均值为 0
+        converged = bool(max(np.abs(item_step).max(), np.abs(person_step).max()) < tol)
+
+    se = np.full(n_items, np.nan)
+    infit = np.full(n_items, np.nan)
+    if len(xx):
+        prob = 1.0 / (1.0 + np.exp(b[ii] - theta[pp]))
+        info = prob * (1.0 - prob)
+        item_info = np.bincount(ii, weights=info, minlength=n_items)
+        squared = np.bincount(ii, weights=(xx - prob) ** 2, minlength=n_items)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            se[fitted_items] = 1.0 / np.sqrt(item_info[fitted_items])
+            infit[fitted_items] = squared[fitted_items] / item_info[fitted_items]
+    b[~fitted_items] = np.nan
+    return RaschResult(b, se, infit, theta, fitted_items, int(fitted_persons.sum()), len(xx),
+                       iterations, converged)
+
+
+def p_value_logit(right: np.ndarray, total: np.ndarray) -> np.ndarray:
+    """通过率换算到 logit 尺度（满分 / 零分加 0.5 连续性校正）"""
+    p = np.clip((right + 0.5) / (total + 1.0), 1e-3, 1 - 1e-3)
+    return np.log((1 - p) / p)
+
+
+def link_fallback(raw: np.ndarray, b: np.ndarray, use_rasch: np.ndarray, use_p: np.ndarray) -> Tuple[float, float]:
+    """p 值 logit 与 Rasch b 不在同一尺度（未扣除能力分布、幅度偏小）：
+    用同时有两种估计的题做线性回归换算到 b 尺度；Rasch 题不足时按同样方式居中（均值为 0）"""
+    if use_rasch.sum() >= 2 and np.ptp(raw[use_rasch]) > 0:
+        slope, intercept = np.polyfit(raw[use_rasch], b[use_rasch], 1)
+        return float(slope), float(intercept)
+    return 1.0, float(-raw[use_p].mean()) if use_p.any() else 0.0
+
+
+def logit_to_level(b: np.ndarray) -> np.ndarray:
+    return np.digitize(b, LOGIT_CUTS) + 1
+
+
+@dataclass
+class Calibration:
+    question_ids: List[str]
+    responses: np.ndarray
+    p_value: np.ndarray
+    b: np.ndarray
+    se: np.ndarray
+    infit: np.ndarray
+    method: List[str]          # rasch / p_value / unchanged
+    new: np.ndarray            # 新难度，unchanged 时为原值（未知为 0）
+    old: np.ndarray            # 原难度（未知为 0）
+    rasch: RaschResult
+    stats: Dict = field(default_factory=dict)
+
+
+def calibrate(data: ResponseData, question_stats: Dict[str, Tuple[int, int, int]],
+              min_item: int = MIN_ITEM_RESPONSES, min_person: int = MIN_PERSON_RESPONSES) -> Calibration:
+    """question_stats: id -> (原难度, correct_count, answer_count)，作答记录中没有的题也参与 p 值退回"""
+    rasch = fit_rasch(data, min_item, min_person)
+
+    # 只出现在 questions 汇总计数里的题追加到末尾
+    question_ids = list(data.question_ids)
+    index = {qid: idx for idx, qid in enumerate(question_ids)}
+    question_ids.extend(qid for qid in question_stats if qid not in index)
+    n = len(question_ids)
+    extra = n - len(data.question_ids)
+
+    total = np.concatenate([np.bincount(data.item, minlength=len(data.question_ids)), np.zeros(extra)])
+    right = np.concatenate([np.bincount(data.item, weights=data.correct, minlength=len(data.question_ids)),
+                            np.zeros(extra)])
+    old = np.zeros(n, dtype=np.int64)
+    for idx, qid in enumerate(question_ids):
+        stats = question_stats.get(qid)
+        if stats is None:
+            continue
+        old[idx] = stats[0] or 0
+        if stats[2] > total[idx]:
+            # 汇总计数包含匿名 / 未记录的作答，比记录更多时用汇总
+            right[idx], total[idx] = stats[1], stats[2]
+
+    b = np.concatenate([rasch.b, np.full(extra, np.nan)])
+    se = np.concatenate([rasch.se, np.full(extra, np.nan)])
+    infit = np.concatenate([rasch.infit, np.full(extra, np.nan)])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p_value = np.where(total > 0, right / total, np.nan)
+
+    use_rasch = ~np.isnan(b)
+    use_p = ~use_rasch & (total >= min_item)
+    raw = p_value_logit(right, total)
+    slope, intercept = link_fallback(raw, b, use_rasch, use_p)
+    scale = np.where(use_rasch, b, slope * raw + intercept)
+    new = np.where(use_rasch | use_p, logit_to_level(scale), old)
+    method = np.where(use_rasch, 'rasch', np.where(use_p, 'p_value', 'unchanged')).tolist()
+    return Calibration(question_ids, total, p_value, np.where(use_rasch | use_p, scale, np.nan), se, infit,
+                       method, new, old, rasch, {'fallback_slope': round(slope, 4),
+                                                  'fallback_intercept': round(intercept, 4)})
+
+
+# ==================== 数据读取 ====================
+
+def read_database(database_url: str, chunk_size: int, all_attempts: bool
+                  ) -> Tuple[ResponseCollector, Dict[str, Tuple[int, int, int]]]:
+    """命名游标（服务端游标）分块读取 user_answers；questions 汇总一次读取"""
+    try:
+        import psycopg2
+    except ImportError:
+        print("❌ 需要安装 psycopg2")
+        print("   运行：pip install psycopg2-binary")
+        exit(1)
+
+    collector = ResponseCollector()
+    conn = psycopg2.connect(database_url)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(QUESTIONS_SQL)
+            question_stats = {row[0]: tuple(row[1:]) for row in cur.fetchall()}
+        sql = ANSWERS_SQL.format(
+            distinct='' if all_attempts else 'DISTINCT ON (user_id, question_id) ',
+            order='' if all_attempts else 'ORDER BY user_id, question_id, answered_at')
+        with conn.cursor(name='calibrate_difficulty_answers') as cur:
+            cur.itersize = chunk_size
+            cur.execute(sql)
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                collector.add(rows)
+                print(f"   已读取 {collector.rows:,} 条作答", end='\r')
+        print()
+    finally:
+        conn.close()
+    return collector, question_stats
+
+
+def read_csv(path: str, chunk_size: int) -> ResponseCollector:
+    """离线模式：user_id,question_id,is_correct（带表头，按作答时间排序）"""
+    truthy = {'t', 'true', '1', 'y', 'yes'}
+    collector = ResponseCollector()
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        chunk = []
+        for row in reader:
+            if not row.get('user_id') or not row.get('question_id') or row.get('is_correct') in (None, ''):
+                continue
+            chunk.append((row['user_id'], row['question_id'], row['is_correct'].strip().lower() in truthy))
+            if len(chunk) >= chunk_size:
+                collector.add(chunk)
+                chunk = []
+        collector.add(chunk)
+    return collector
+
+
+# ==================== 写回与报告 ====================
+
+def changed_rows(result: Calibration) -> Iterable[Tuple[str, int]]:
+    for idx, qid in enumerate(result.question_ids):
+        if result.method[idx] != 'unchanged' and result.new[idx] != result.old[idx]:
+            yield qid, int(result.new[idx])
+
+
+def write_copy_rows(result: Calibration, out) -> int:
+    count = 0
+    for qid, level in changed_rows(result):
+        out.write(f"{qid}\t{level}\n")
+        count += 1
+    return count
+
+
+def write_payload(result: Calibration, output_path: str) -> int:
+    with open(output_path, 'w', encoding='utf-8') as out:
+        out.write("-- 题目难度校准 - 由 calibrate_difficulty.py 生成\n")
+        out.write(f"-- Rasch 估计 {int(result.rasch.fitted_items.sum())} 题，"
+                  f"作答 {result.rasch.responses:,} 条\n\n")
+        out.write("BEGIN;\n\n")
+        out.write(STAGING_DDL)
+        out.write(f"COPY {STAGING_TABLE} (id, difficulty) FROM stdin;\n")
+        count = write_copy_rows(result, out)
+        out.write("\\.\n\n")
+        out.write(UPDATE_SQL)
+        out.write("\nCOMMIT;\n")
+    return count
+
+
+def execute_update(result: Calibration, database_url: str) -> int:
+    """COPY 到临时表后一条 UPDATE 写回，返回实际更新的题数"""
+    try:
+        import psycopg2
+    except ImportError:
+        print("❌ 需要安装 psycopg2")
+        print("   运行：pip install psycopg2-binary")
+        exit(1)
+
+    buffer = io.StringIO()
+    write_copy_rows(result, buffer)
+    buffer.seek(0)
+
+    conn = psycopg2.connect(database_url)
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(STAGING_DDL)
+                cur.copy_expert(f"COPY {STAGING_TABLE} (id, difficulty) FROM STDIN", buffer)
+                cur.execute(UPDATE_SQL)
+                return cur.rowcount
+    finally:
+        conn.close()
+
+
+def rounded(value: float, digits: int = 3) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def build_report(result: Calibration, data: ResponseData, elapsed: float) -> Dict:
+    rasch = result.rasch
+    items = []
+    for idx, qid in enumerate(result.question_ids):
+        items.append({
+            'id': qid,
+            'method': result.method[idx],
+            'responses': int(result.responses[idx]),
+            'p_value': rounded(result.p_value[idx]),
+            'b': rounded(result.b[idx]),
+            'se': rounded(result.se[idx]),
+            'infit': rounded(result.infit[idx]),
+            'old': int(result.old[idx]) or None,
+            'new': int(result.new[idx]) or None,
+        })
+    misfit = [item for item in items if item['infit'] is not None and not 0.7 <= item['infit'] <= 1.3]
+    return {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'elapsed_seconds': round(elapsed, 3),
+        'summary': {
+            'responses': int(len(data.correct)),
+            'persons': data.n_persons,
+            'questions': len(result.question_ids),
+            'rasch_responses': rasch.responses,
+            'rasch_persons': rasch.fitted_persons,
+            'iterations': rasch.iterations,
+            'converged': rasch.converged,
+            'methods': dict(Counter(result.method)),
+            'changed': sum(1 for _ in changed_rows(result)),
+        },
+        'logit_cuts': LOGIT_CUTS,
+        'fallback_link': result.stats,
+        'distribution': {
+            'old': {str(k): v for k, v in sorted(Counter(int(x) for x in result.old if x).items())},
+            'new': {str(k): v for k, v in sorted(Counter(int(x) for x in result.new if x).items())},
+        },
+        'misfit': sorted(misfit, key=lambda item: -abs(item['infit'] - 1))[:50],
+        'items': items,
+    }
+
+
+def print_summary(report: Dict):
+    summary = report['summary']
+    print(f"\n📊 作答 {summary['responses']:,} 条，用户 {summary['persons']:,}，题目 {summary['questions']:,}")
+    state = '收敛' if summary['converged'] else '未收敛'
+    print(f"   Rasch：{summary['rasch_persons']:,} 人 / {summary['rasch_responses']:,} 条，"
+          f"{summary['iterations']} 轮迭代（{state}）")
+    methods = summary['methods']
+    print(f"   Rasch 估计 {methods.get('rasch', 0)} 题，p 值退回 {methods.get('p_value', 0)} 题，"
+          f"作答不足保持原值 {methods.get('unchanged', 0)} 题")
+    print(f"   难度分布（新）: {', '.join(f'{k}级 {v}' for k, v in report['distribution']['new'].items())}")
+    if report['misfit']:
+        print(f"⚠️  infit 超出 0.7-1.3 的题: {len(report['misfit'])}（详见报告 misfit）")
+    print(f"   需要更新: {summary['changed']} 题")
+    print(f"⏱️  {report['elapsed_seconds']:.2f} 秒")
+
+
+# ==================== 基准 ====================
+
+def synthetic_responses(size: int, n_items: int = 2000, per_person: int = 50,
+                        seed: int = 42) -> Tuple[ResponseData, np.ndarray]:
+    """按 Rasch 模型生成作答：能力 N(0,1)，难度 N(0,1.2)，每人随机作答 per_person 题"""
+    rng = np.random.default_rng(seed)
+    n_persons = max(size // per_person, 1)
+    theta = rng.normal(0, 1, n_persons)
+    b = rng.normal(0, 1.2, n_items)
+    person = np.repeat(np.arange(n_persons, dtype=np.int32), per_person)
+    item = rng.integers(0, n_items, n_persons * per_person).astype(np.int32)
+    prob = 1.0 / (1.0 + np.exp(b[item] - theta[person]))
+    correct = (rng.random(len(prob)) < prob).astype(np.int8)
+    return ResponseData([f"q{i}" for i in range(n_items)], n_persons, person, item, correct), b
+
+
+def run_benchmark(sizes: Iterable[int]):
+    print("=== 难度校准基准（合成作答）===\n")
+    for size in sizes:
+        data, true_b = synthetic_responses(size)
+        started = time.time()
+        rasch = fit_rasch(data)
+        elapsed = time.time() - started
+        mask = rasch.fitted_items
+        r = np.corrcoef(true_b[mask], rasch.b[mask])[0, 1]
+        levels_true = logit_to_level(true_b[mask] - true_b[mask].mean())
+        levels_fit = logit_to_level(rasch.b[mask])
+        exact = np.mean(levels_true == levels_fit)
+        within = np.mean(np.abs(levels_true - levels_fit) <= 1)
+        print(f"📊 {len(data.correct):,} 条作答 / {data.n_persons:,} 人 / {mask.sum()} 题: "
+              f"{elapsed:.2f} 秒，{rasch.iterations} 轮，"
+              f"与真实难度 r={r:.3f}，等级一致 {exact:.1%}（±1 级 {within:.1%}）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='根据答题记录批量校准题目难度（p 值 + Rasch）')
+    parser.add_argument('--csv', help='离线作答 CSV（user_id,question_id,is_correct），不连接数据库')
+    parser.add_argument('--output', '-o', default=DEFAULT_OUTPUT, help='输出 COPY 更新载荷')
+    parser.add_argument('--report', default=DEFAULT_REPORT, help='校准报告 JSON')
+    parser.add_argument('--execute', action='store_true', help='直接写回数据库（读取环境变量 DATABASE_URL）')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='服务端游标每次读取的行数')
+    parser.add_argument('--min-responses', type=int, default=MIN_ITEM_RESPONSES, help='题目最少作答数')
+    parser.add_argument('--min-person', type=int, default=MIN_PERSON_RESPONSES, help='参与 Rasch 的用户最少作答数')
+    parser.add_argument('--all-attempts', action='store_true', help='使用全部作答（默认每人每题只取首次）')
+    parser.add_argument('--benchmark', type=int, nargs='+', metavar='N', help='合成 N 条作答测试速度与还原度')
+
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(args.benchmark)
+        return
+
+    print("=== 题目难度校准 ===\n")
+
+    database_url = os.environ.get('DATABASE_URL')
+    if (not args.csv or args.execute) and not database_url:
+        print("❌ 未设置环境变量 DATABASE_URL")
+        return
+
+    started = time.time()
+    if args.csv:
+        if not os.path.exists(args.csv):
+            print(f"❌ 文件不存在：{args.csv}")
+            return
+        print(f"📂 读取作答 CSV: {args.csv}")
+        collector = read_csv(args.csv, args.chunk_size)
+        question_stats = {}
+        data = collector.finish(first_attempt=not args.all_attempts)
+    else:
+        print("📂 分块读取 user_answers（服务端游标）")
+        collector, question_stats = read_database(database_url, args.chunk_size, args.all_attempts)
+        data = collector.finish()
+
+    if not len(data.correct) and not question_stats:
+        print("⚠️ 没有作答记录，无需校准")
+        return
+
+    result = calibrate(data, question_stats, args.min_responses, args.min_person)
+    report = build_report(result, data, time.time() - started)
+    print_summary(report)
+
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.execute:
+        updated = execute_update(result, database_url)
+        print(f"\n✅ 已写回数据库 {updated} 题难度")
+    else:
+        count = write_payload(result, args.output)
+        print(f"\n✅ 更新载荷: {args.output}（{count} 题）")
+    print(f"📄 报告: {args.report}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+中文数字转换
+============
+章/节/考点标题中的中文序号（第二十章、第一百零五题……）统一在这里转换为整数，
+各提取脚本共用同一张预先生成的 1-999 查找表。
+
+    from cn_numerals import cn_to_num
+    cn_to_num('二十')        # 20
+    cn_to_num('一百零五')    # 105
+    cn_to_num('12')          # 12
+    cn_to_num('甲', default=1)  # 1
+"""
+
+from typing import Dict
+
+CN_DIGITS = '零一二三四五六七八九'
+
+# 标题中序号可能出现的字符，可用于拼装正则字符类
+CN_NUMERAL_CHARS = '零〇一二两三四五六七八九十百'
+
+MAX_CN_NUM = 999
+
+
+def _to_cn(n: int) -> str:
+    """整数转规范中文写法（1-999）"""
+    hundreds, rest = divmod(n, 100)
+    tens, ones = divmod(rest, 10)
+    parts = []
+    if hundreds:
+        parts.append(CN_DIGITS[hundreds] + '百')
+        if rest and tens == 0:
+            parts.append('零')
+    if tens:
+        # 十一～十九省略“一”，一百一十等百位之后保留
+        parts.append(('' if tens == 1 and not hundreds else CN_DIGITS[tens]) + '十')
+    if ones:
+        parts.append(CN_DIGITS[ones])
+    return ''.join(parts)
+
+
+def _build_table() -> Dict[str, int]:
+    table: Dict[str, int] = {}
+    for n in range(1, MAX_CN_NUM + 1):
+        cn = _to_cn(n)
+        variants = {cn, cn.replace('零', '〇')}
+        if cn.startswith('十'):
+            variants.add('一' + cn)            # 一十二
+        if cn.startswith('二百'):
+            variants |= {v.replace('二百', '两百', 1) for v in list(variants)}
+        if n >= 110 and n % 10 == 0 and n % 100 and cn.endswith('十'):
+            variants.add(cn[:-1])              # 一百一 = 110（口语省略）
+        for variant in variants:
+            table.setdefault(variant, n)
+    return table
+
+
+CN_NUM_TABLE: Dict[str, int] = _build_table()
+
+
+def cn_to_num(text: str, default: int = 0) -> int:
+    """中文数字（或阿拉伯数字）转整数，无法识别时返回 default"""
+    text = (text or '').strip()
+    if not text:
+        return default
+    if text.isdigit():
+        return int(text)
+    return CN_NUM_TABLE.get(text, default)
@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+题目近似重复检测工具（MinHash + LSH）
+====================================
+历年真题 JSON、1200 题章节练习、question_parser.py 解析出的原始文本题库、
+AI 生成题导出等来源中，同一道题常以细微改写的形式出现多次，两两比较无法扩展。
+
+本工具：
+  1. 题干 + 选项（选项排序后拼接，乱序不影响）规范化后切成字符 n-gram；
+  2. 用 NumPy 批量计算 MinHash 签名；
+  3. LSH 分带：签名按 bands 分段哈希入桶，同桶即候选，整体近似线性；
+  4. 候选对用 n-gram 集合的精确 Jaccard 复核（题干单独再比一次，
+     并跳过同卷内共用一组选项的配伍兄弟题，以及题干过短且答案不同的题对，
+     如综合分析题的“四诊合参，辨析其证候是”），并查集聚成重复簇；
+  5. 输出簇报告与合并建议（保留来源优先级最高、信息最完整的一题）。
+
+使用方法：
+  python dedupe_questions.py
+  python dedupe_questions.py --json parsed_questions.json ai_questions.json --threshold 0.8
+  python dedupe_questions.py --benchmark 10000 100000
+
+输入：shuju/ 下的历年真题与章节练习题库（默认），以及 --json 指定的题目数组
+输出：shuju/题目去重报告.json
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import time
+import zlib
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ 需要安装 numpy")
+    print("   运行：pip install numpy")
+    exit(1)
+
+from normalize_layout import normalize_text
+
+
+DEFAULT_OUTPUT = 'shuju/题目去重报告.json'
+DEFAULT_CHAPTER_BANK = 'shuju/执业药师西药二1200题原.json'
+
+NGRAM = 3
+NUM_PERM = 128
+BANDS = 16
+THRESHOLD = 0.7
+STEM_THRESHOLD = 0.5
+SHORT_STEM = 20  # 规范化后题干不超过该长度时，题干本身不足以区分，需要答案一致才算重复
+MAX_BUCKET = 200
+SIGNATURE_BATCH = 1000
+PERM_BATCH = 16  # 每次只展开 16 个排列，中间矩阵为 16 × 本批 n-gram 数，避免 128 × N 的峰值内存
+
+MAX_HASH = np.uint32(0xFFFFFFFF)
+
+# 合并建议中保留哪一题：来源优先级（数字越小越优先）
+SOURCE_PRIORITY = {'历年真题': 0, '章节练习': 1, '原始文本': 2, 'AI生成': 3}
+
+
+TEXT_NOISE = re.compile(r'[^0-9a-z一-鿿]')
+
+
+@dataclass
+class QuestionRecord:
+    """参与去重的一道题"""
+    uid: str
+    source: str
+    label: str
+    stem: str
+    options: List[str] = field(default_factory=list)
+    answer: str = ''
+    explanation: str = ''
+    paper: str = ''  # 所属试卷 / 章节，用于识别配伍题组
+
+    def is_sibling(self, other: 'QuestionRecord') -> bool:
+        """同卷且选项完全相同：配伍题组内共用一组选项的兄弟题，不算重复"""
+        return bool(self.paper and self.options) and self.paper == other.paper \
+            and sorted(self.options) == sorted(other.options)
+
+    def answer_values(self) -> Set[str]:
+        """答案字母换成对应选项文本，选项乱序时仍可比较；无法对应时保留字母"""
+        values = set()
+        for letter in re.findall(r'[A-Za-z]', self.answer or ''):
+            pos = ord(letter.upper()) - ord('A')
+            values.add(normalize_key(self.options[pos]) if pos < len(self.options) else letter.upper())
+        return values
+
+    @property
+    def text(self) -> str:
+        return self.stem + '|' + '|'.join(sorted(self.options))
+
+
+def normalize_key(text: str) -> str:
+    return TEXT_NOISE.sub('', normalize_text(text).lower())
+
+
+def option_values(options) -> List[str]:
+    """选项统一为文本列表（[{key, value}] / {A: ...} / ["A.xxx"]）"""
+    if isinstance(options, dict):
+        return [str(v) for v in options.values()]
+    values = []
+    for item in options or []:
+        if isinstance(item, dict):
+            values.append(str(item.get('value', '')))
+        else:
+            values.append(re.sub(r'^\s*[A-Ea-e]\s*[\.．、:：]\s*', '', str(item)))
+    return values
+
+
+def load_exam_history() -> List[QuestionRecord]:
+    from import_exam_history import discover_sources, normalize_source
+
+    records = []
+    sources, _ = discover_sources([])
+    for source in sources:
+        rows, _ = normalize_source(source)
+        for row in rows:
+            records.append(QuestionRecord(
+                uid=f"history:{source.year}:{source.subject}:{row['question_number']}",
+                source='历年真题',
+                label=f"{source.year} {source.subject} 第{row['question_number']}题",
+                stem=row['content'],
+                options=option_values(row['options']),
+                answer=row['correct_answer'],
+                explanation=row['explanation'],
+                paper=f"{source.year}:{source.subject}",
+            ))
+    return records
+
+
+def load_chapter_bank(path: str) -> List[QuestionRecord]:
+    from import_chapter_questions import iter_questions
+
+    if not os.path.exists(path):
+        return []
+    records = []
+    for q in iter_questions(path):
+        records.append(QuestionRecord(
+            uid=f"chapter:{q.get('question_id')}",
+            source='章节练习',
+            label=f"{q.get('chapter', '')} {q.get('section', '')} 第{q.get('qno')}题",
+            stem=q.get('stem', ''),
+            options=option_values(q.get('options')),
+            answer=q.get('answer', ''),
+            explanation=q.get('explanation', ''),
+            paper=f"{q.get('chapter', '')}/{q.get('section', '')}",
+        ))
+    return records
+
+
+def load_json_questions(path: str, source: Optional[str] = None) -> List[QuestionRecord]:
+    """通用题目数组：question_parser.py 的 export_json、数据库导出的 questions / AI 生成题等"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('questions', [])
+    name = os.path.basename(path)
+    source = source or ('AI生成' if 'ai' in name.lower() else '原始文本')
+
+    records = []
+    for idx, q in enumerate(data):
+        if not isinstance(q, dict):
+            continue
+        stem = q.get('content') or q.get('question') or q.get('stem') or ''
+        records.append(QuestionRecord(
+            uid=f"json:{name}:{q.get('id', idx)}",
+            source=source,
+            label=f"{name} #{q.get('number', q.get('question_number', idx + 1))}",
+            stem=stem,
+            options=option_values(q.get('options')),
+            answer=str(q.get('correct_answer') or q.get('answer') or ''),
+            explanation=q.get('explanation') or q.get('analysis') or '',
+        ))
+    return records
+
+
+def shingles(text: str, n: int = NGRAM) -> np.ndarray:
+    """规范化后切字符 n-gram，哈希为 32 位整数，返回去重排序后的 uint32 数组
+
+    用数组而不是 Python set 保存：10 万题时 set 本身就要近 1 GB，数组约为其 1/20。
+    """
+    text = normalize_key(text)
+    if len(text) < n:
+        grams = [text] if text else []
+    else:
+        grams = [text[i:i + n] for i in range(len(text) - n + 1)]
+    return np.unique(np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint32, count=len(grams)))
+
+
+class MinHasher:
+    """批量 MinHash：h_k(x) = (a_k * x + b_k) >> 32（multiply-shift，uint64 溢出即取模），逐批一次计算全部排列"""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(0, 2 ** 63, size=(num_perm, 1), dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.randint(0, 2 ** 63, size=(num_perm, 1), dtype=np.uint64)
+
+    def signatures(self, shingle_sets: List[np.ndarray], batch_size: int = SIGNATURE_BATCH,
+                   perm_batch: int = PERM_BATCH) -> np.ndarray:
+        """返回 (题目数, num_perm) 的 uint32 签名矩阵；空集合所在行全为最大值（调用方据集合本身剔除）"""
+        result = np.full((len(shingle_sets), self.num_perm), MAX_HASH, dtype=np.uint32)
+        shift = np.uint64(32)
+        for start in range(0, len(shingle_sets), batch_size):
+            batch = shingle_sets[start:start + batch_size]
+            rows = [i for i, s in enumerate(batch) if s.size]
+            if not rows:
+                continue
+            lengths = np.array([batch[i].size for i in rows])
+            values = np.concatenate([batch[i] for i in rows]).astype(np.uint64)
+            offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            targets = start + np.array(rows)
+            for perm in range(0, self.num_perm, perm_batch):
+                hashed = ((self.a[perm:perm + perm_batch] * values + self.b[perm:perm + perm_batch]) >> shift).astype(np.uint32)
+                result[targets, perm:perm + perm_batch] = np.minimum.reduceat(hashed, offsets, axis=1).T
+        return result
+
+
+def lsh_candidates(signatures: np.ndarray, valid: np.ndarray, bands: int,
+                   max_bucket: int = MAX_BUCKET) -> Tuple[Set[Tuple[int, int]], int]:
+    """分带入桶，返回 (候选对, 因过大被跳过的桶数)
+
+    每个 band 的若干行先合成一个 64 位桶键，再排序分组，避免逐行构造 Python 字典键。
+    """
+    rows_per_band = signatures.shape[1] // bands
+    mixers = np.random.RandomState(7).randint(0, 2 ** 63, size=rows_per_band, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    candidates: Set[Tuple[int, int]] = set()
+    oversized = 0
+    for band in range(bands):
+        chunk = signatures[valid, band * rows_per_band:(band + 1) * rows_per_band].astype(np.uint64)
+        keys = (chunk * mixers).sum(axis=1)
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])))
+        sizes = np.diff(np.concatenate((starts, [len(sorted_keys)])))
+        for begin, size in zip(starts[sizes > 1].tolist(), sizes[sizes > 1].tolist()):
+            if size > max_bucket:
+                oversized += 1
+                continue
+            members = sorted(valid[order[begin:begin + size]].tolist())
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    candidates.add((a, b))
+    return candidates, oversized
+
+
+def jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    """两个去重后的 n-gram 数组的 Jaccard 相似度"""
+    if not a.size or not b.size:
+        return 0.0
+    common = np.intersect1d(a, b, assume_unique=True).size
+    return common / (a.size + b.size - common)
+
+
+class UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def find_duplicates(records: List[QuestionRecord], threshold: float = THRESHOLD,
+                    stem_threshold: float = STEM_THRESHOLD, ngram: int = NGRAM,
+                    num_perm: int = NUM_PERM, bands: int = BANDS) -> Dict:
+    """完整流程：n-gram -> MinHash -> LSH 候选 -> Jaccard 复核 -> 聚簇，返回簇与各阶段耗时"""
+    timings = {}
+    started = time.time()
+    sets = [shingles(r.text, ngram) for r in records]
+    timings['shingle'] = time.time() - started
+
+    started = time.time()
+    signatures = MinHasher(num_perm).signatures(sets)
+    timings['minhash'] = time.time() - started
+
+    started = time.time()
+    valid = np.array([i for i, st in enumerate(sets) if st.size], dtype=np.int64)
+    candidates, oversized = lsh_candidates(signatures, valid, bands)
+    timings['lsh'] = time.time() - started
+
+    started = time.time()
+    uf = UnionFind(len(records))
+    pairs = []
+    stem_sets: Dict[int, np.ndarray] = {}
+    for a, b in candidates:
+        if records[a].is_sibling(records[b]):
+            continue
+        score = jaccard(sets[a], sets[b])
+        if score < threshold:
+            continue
+        for idx in (a, b):
+            if idx not in stem_sets:
+                stem_sets[idx] = shingles(records[idx].stem, ngram)
+        if jaccard(stem_sets[a], stem_sets[b]) < stem_threshold:
+            continue
+        if is_short_conflict(records[a], records[b]):
+            continue
+        uf.union(a, b)
+        pairs.append((a, b, score))
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for idx in sorted({i for a, b, _ in pairs for i in (a, b)}):
+        groups[uf.find(idx)].append(idx)
+    timings['verify'] = time.time() - started
+
+    return {
+        'clusters': [members for members in groups.values() if len(members) > 1],
+        'pairs': pairs,
+        'shingle_sets': sets,
+        'candidates': len(candidates),
+        'oversized_buckets': oversized,
+        'timings': timings,
+    }
+
+
+def is_short_conflict(a: QuestionRecord, b: QuestionRecord) -> bool:
+    """题干过短（案例背景缺失的“四诊合参，辨析其证候是”、仅药名不同的“XX的功能有”）且答案不同：
+    选项相同也只说明是同一类问法，不算重复"""
+    if len(normalize_key(a.stem)) > SHORT_STEM or len(normalize_key(b.stem)) > SHORT_STEM:
+        return False
+    answers_a, answers_b = a.answer_values(), b.answer_values()
+    return bool(answers_a and answers_b) and answers_a != answers_b
+
+
+def completeness(record: QuestionRecord) -> Tuple:
+    """合并时优先保留：来源优先级高、有答案、有解析、选项多的题"""
+    return (SOURCE_PRIORITY.get(record.source, len(SOURCE_PRIORITY)),
+            not record.answer, not record.explanation, -len(record.options))
+
+
+def build_report(records: List[QuestionRecord], result: Dict, threshold: float, stem_threshold: float) -> Dict:
+    sets = result['shingle_sets']
+
+    clusters = []
+    for members in sorted(result['clusters'], key=len, reverse=True):
+        keep = min(members, key=lambda i: completeness(records[i]))
+        answers = {records[i].answer for i in members if records[i].answer}
+        clusters.append({
+            'size': len(members),
+            'sources': dict(Counter(records[i].source for i in members)),
+            'answer_conflict': len(answers) > 1,
+            'keep': records[keep].uid,
+            'merge': [records[i].uid for i in members if i != keep],
+            'members': [{
+                'uid': records[i].uid,
+                'source': records[i].source,
+                'label': records[i].label,
+                'answer': records[i].answer,
+                'similarity_to_keep': round(jaccard(sets[keep], sets[i]), 3),
+                'stem': records[i].stem[:80],
+            } for i in members],
+        })
+
+    return {
+        'parameters': {'threshold': threshold, 'stem_threshold': stem_threshold, 'ngram': NGRAM, 'num_perm': NUM_PERM, 'bands': BANDS},
+        'statistics': {
+            'questions': len(records),
+            'by_source': dict(Counter(r.source for r in records)),
+            'candidate_pairs': result['candidates'],
+            'duplicate_pairs': len(result['pairs']),
+            'clusters': len(clusters),
+            'duplicate_questions': sum(c['size'] - 1 for c in clusters),
+            'cross_source_clusters': sum(1 for c in clusters if len(c['sources']) > 1),
+            'answer_conflicts': sum(1 for c in clusters if c['answer_conflict']),
+            'timings': {k: round(v, 3) for k, v in result['timings'].items()},
+        },
+        'clusters': clusters,
+    }
+
+
+def mutate(text: str, rng: random.Random, rate: float) -> str:
+    """模拟改写：随机替换/删除少量字符"""
+    chars = list(text)
+    for _ in range(max(1, int(len(chars) * rate))):
+        if not chars:
+            break
+        pos = rng.randrange(len(chars))
+        if rng.random() < 0.5:
+            del chars[pos]
+        else:
+            chars[pos] = chr(rng.randint(0x4e00, 0x9fa5))
+    return ''.join(chars)
+
+
+def synthetic_bank(seed_records: List[QuestionRecord], size: int, duplicate_rate: float = 0.1,
+                   rng: Optional[random.Random] = None) -> Tuple[List[QuestionRecord], Set[Tuple[int, int]]]:
+    """以真实题目为种子生成 size 道题：多数为重新组合的“新题”，duplicate_rate 比例为已有题的轻度改写"""
+    rng = rng or random.Random(42)
+    stems = [r.stem for r in seed_records if len(r.stem) >= 10]
+    options = [o for r in seed_records for o in r.options if o]
+    records: List[QuestionRecord] = []
+    planted: Set[Tuple[int, int]] = set()
+
+    for idx in range(size):
+        if records and rng.random() < duplicate_rate:
+            origin = rng.randrange(len(records))
+            base = records[origin]
+            opts = base.options[:]
+            rng.shuffle(opts)
+            records.append(QuestionRecord(f"bench:{idx}", 'AI生成', f"改写自 {origin}",
+                                          mutate(base.stem, rng, 0.05), opts))
+            planted.add((origin, idx))
+            continue
+        # 新题：两段不同题干拼接 + 随机选项，避免种子之间本身的重复
+        stem = rng.choice(stems)[:40] + rng.choice(stems)[-40:] + str(idx)
+        records.append(QuestionRecord(f"bench:{idx}", '原始文本', f"合成 {idx}",
+                                      stem, rng.sample(options, min(5, len(options)))))
+    return records, planted
+
+
+def run_benchmark(seed_records: List[QuestionRecord], sizes: Iterable[int], threshold: float, stem_threshold: float):
+    print("\n📈 基准测试（合成题库，10% 为轻度改写的重复题）")
+    print(f"{'题目数':>8} {'n-gram':>8} {'MinHash':>8} {'LSH':>8} {'复核':>8} {'总计':>8} {'候选对':>9} {'召回率':>7}")
+    for size in sizes:
+        records, planted = synthetic_bank(seed_records, size)
+        result = find_duplicates(records, threshold, stem_threshold)
+        uf = UnionFind(len(records))
+        for a, b, _ in result['pairs']:
+            uf.union(a, b)
+        found = sum(1 for a, b in planted if uf.find(a) == uf.find(b))
+        t = result['timings']
+        print(f"{size:>8} {t['shingle']:>7.2f}s {t['minhash']:>7.2f}s {t['lsh']:>7.2f}s {t['verify']:>7.2f}s "
+              f"{sum(t.values()):>7.2f}s {result['candidates']:>9} {found / max(1, len(planted)):>7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='题目近似重复检测（MinHash + LSH）')
+    parser.add_argument('--json', nargs='*', default=[], help='额外的题目 JSON（原始文本解析结果、AI 生成题导出等）')
+    parser.add_argument('--chapter-bank', default=DEFAULT_CHAPTER_BANK, help='章节练习题库 JSON')
+    parser.add_argument('--no-history', action='store_true', help='不加载 shuju/ 下的历年真题')
+    parser.add_argument('--threshold', '-t', type=float, default=THRESHOLD, help='判定重复的 Jaccard 阈值')
+    parser.add_argument('--stem-threshold', type=float, default=STEM_THRESHOLD, help='题干单独比较的 Jaccard 阈值')
+    parser.add_argument('--output', '-o', default=DEFAULT_OUTPUT, help='输出报告文件')
+    parser.add_argument('--benchmark', nargs='*', type=int, metavar='N', help='运行合成题库基准测试（如 10000 100000）')
+
+    args = parser.parse_args()
+
+    print("=== 题目近似重复检测 ===\n")
+
+    records: List[QuestionRecord] = []
+    if not args.no_history:
+        records += load_exam_history()
+    records += load_chapter_bank(args.chapter_bank)
+    for path in args.json:
+        records += load_json_questions(path)
+
+    for source, count in Counter(r.source for r in records).items():
+        print(f"📖 {source}: {count} 道")
+
+    if args.benchmark is not None:
+        run_benchmark(records, args.benchmark or [10000, 100000], args.threshold, args.stem_threshold)
+        return
+
+    result = find_duplicates(records, args.threshold, args.stem_threshold)
+    report = build_report(records, result, args.threshold, args.stem_threshold)
+    stats = report['statistics']
+
+    print(f"\n📊 候选对 {stats['candidate_pairs']}，确认重复对 {stats['duplicate_pairs']}")
+    print(f"   - 重复簇: {stats['clusters']}（跨来源 {stats['cross_source_clusters']}）")
+    print(f"   - 可合并题目: {stats['duplicate_questions']}")
+    if stats['answer_conflicts']:
+        print(f"   ⚠️ 簇内答案不一致: {stats['answer_conflicts']}")
+    if result['oversized_buckets']:
+        print(f"   ⚠️ 跳过过大的 LSH 桶: {result['oversized_buckets']}")
+    print(f"⏱️  耗时 {sum(result['timings'].values()):.2f} 秒")
+
+    for cluster in report['clusters'][:5]:
+        keep = next(m for m in cluster['members'] if m['uid'] == cluster['keep'])
+        print(f"\n   [{cluster['size']} 道] 保留 {keep['label']}")
+        for member in cluster['members'][:4]:
+            print(f"     - {member['label']} ({member['similarity_to_keep']:.2f}): {member['stem'][:30]}")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ 报告: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+知识树版本差异比对工具
+====================
+西药药二_知识树.json、_v2、_from_markdown、_知识点_完整版 等多个提取结果结构各异，
+选哪一份导入只能靠肉眼对比。本工具：
+
+  - 把各种格式统一成 章 -> 小节 -> 考点 的节点树（code 如 2.1.3）；
+  - 自底向上为每个节点计算 Merkle 哈希：节点自身字段哈希 + 子树哈希（子节点哈希按顺序组合，
+    与 code 无关），两棵树中子树哈希相同的部分整体跳过，比对时间与树规模成线性；
+  - 报告新增、删除、移动（内容相同但 code / 位置变化）、修改（同 code 字段变化）的节点；
+  - 可输出只含差异行的 knowledge_tree upsert 载荷，重新导入知识树时只触碰变化的节点。
+
+使用方法：
+  python diff_knowledge_trees.py shuju/西药药二_知识树.json shuju/西药药二_知识树_v2.json
+  python diff_knowledge_trees.py shuju/西药药二_知识树.json shuju/西药药二_知识树_v2.json \\
+      shuju/西药药二_知识点_from_markdown.json shuju/西药药二_知识点_完整版.json      # 以第一份为基准逐一比对
+  python diff_knowledge_trees.py OLD.json NEW.json --payload shuju/知识树_差异导入.sql [--prune]
+
+输出：差异报告 JSON（--report），可选 upsert 载荷（--payload，仅两份输入时）
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from cn_numerals import CN_NUMERAL_CHARS, cn_to_num
+from pg_copy import DEFAULT_SUBJECT_CODE, copy_text
+
+
+DEFAULT_REPORT = 'shuju/知识树差异报告.json'
+
+NODE_TYPES = {1: 'chapter', 2: 'section', 3: 'knowledge_point'}
+HASH_FIELDS = ['title', 'content', 'point_type', 'drug_name', 'importance', 'memory_tips']
+
+CHAPTER_PATTERN = re.compile(rf'第([{CN_NUMERAL_CHARS}\d]+)章\s*(.*)')
+SECTION_PATTERN = re.compile(rf'第([{CN_NUMERAL_CHARS}\d]+)节\s*(.*)')
+POINT_NAME_PATTERN = re.compile(r'^考点\s*(\d+)\s*')
+
+
+@dataclass
+class TreeNode:
+    """知识树节点（章 / 小节 / 考点）"""
+    code: str
+    level: int
+    title: str
+    content: str = ''
+    point_type: str = ''
+    drug_name: str = ''
+    importance: int = 3
+    memory_tips: str = ''
+    parent: Optional[str] = None
+    children: List[str] = field(default_factory=list)
+    own_hash: str = ''
+    tree_hash: str = ''
+
+    @property
+    def node_type(self) -> str:
+        return NODE_TYPES[self.level]
+
+    def fields(self) -> Dict:
+        return {name: getattr(self, name) for name in HASH_FIELDS}
+
+
+class KnowledgeTree:
+    """按 code 索引的节点树"""
+
+    def __init__(self, name: str, subject_code: str = DEFAULT_SUBJECT_CODE):
+        self.name = name
+        self.subject_code = subject_code
+        self.nodes: Dict[str, TreeNode] = {}
+        self.roots: List[str] = []
+
+    def add(self, node: TreeNode) -> TreeNode:
+        """加入节点；同一父节点下 code 重复时顺延编号（提取结果里常见的重复“考点1”）"""
+        if node.code in self.nodes:
+            prefix = node.parent + '.' if node.parent else ''
+            siblings = self.nodes[node.parent].children if node.parent else self.roots
+            node.code = f"{prefix}{len(siblings) + 1}"
+            while node.code in self.nodes:
+                node.code = f"{prefix}{int(node.code.rsplit('.', 1)[-1]) + 1}"
+        self.nodes[node.code] = node
+        (self.nodes[node.parent].children if node.parent else self.roots).append(node.code)
+        return node
+
+    def compute_hashes(self):
+        """自底向上计算节点哈希与子树哈希（迭代后序遍历，避免递归深度问题）"""
+        stack = [(code, False) for code in reversed(self.roots)]
+        while stack:
+            code, visited = stack.pop()
+            node = self.nodes[code]
+            if not visited:
+                stack.append((code, True))
+                stack.extend((child, False) for child in reversed(node.children))
+                continue
+            own = json.dumps([node.level, node.fields()], ensure_ascii=False, sort_keys=True)
+            node.own_hash = hashlib.sha1(own.encode('utf-8')).hexdigest()
+            combined = node.own_hash + ''.join(self.nodes[c].tree_hash for c in node.children)
+            node.tree_hash = hashlib.sha1(combined.encode('ascii')).hexdigest()
+
+    def descendants(self, code: str) -> List[str]:
+        result, stack = [], [code]
+        while stack:
+            current = stack.pop()
+            result.append(current)
+            stack.extend(self.nodes[current].children)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        return dict(Counter(node.node_type for node in self.nodes.values()))
+
+
+def text_of(value) -> str:
+    """内容字段可能是字符串、字符串列表或 {type, content} 块列表"""
+    if isinstance(value, list):
+        return '\n'.join(text_of(item) for item in value if item)
+    if isinstance(value, dict):
+        return str(value.get('content') or '')
+    return str(value or '').strip()
+
+
+def point_node(code: str, parent: str, data: Dict) -> TreeNode:
+    return TreeNode(
+        code=code, level=3, parent=parent,
+        title=str(data.get('title') or '').strip(),
+        content=text_of(data.get('content')),
+        point_type=str(data.get('point_type') or ''),
+        drug_name=str(data.get('drug_name') or ''),
+        importance=int(data.get('importance') or 3),
+        memory_tips=str(data.get('memory_tips') or ''),
+    )
+
+
+def load_nested(tree: KnowledgeTree, data: Dict):
+    """chapters[].sections[].knowledge_points|points（知识树、v2、from_markdown）
+    以及合并版 chapter_number/chapter_title + parts.*.knowledge_points"""
+    for chapter in data.get('chapters', []):
+        chapter_code = str(chapter.get('id') or cn_to_num(chapter.get('chapter_number', '')))
+        chapter_node = tree.add(TreeNode(chapter_code, 1, (chapter.get('title') or chapter.get('chapter_title') or '').strip()))
+        for section in chapter.get('sections', []):
+            section_code = str(section.get('id') or f"{chapter_node.code}.{cn_to_num(section.get('section_number', ''))}")
+            section_node = tree.add(TreeNode(section_code, 2, (section.get('title') or section.get('section_title') or '').strip(),
+                                             parent=chapter_node.code))
+            points = section.get('knowledge_points') or section.get('points') or []
+            for part in (section.get('parts') or {}).values():
+                points = points + [{'title': p.get('title'), 'content': p.get('content')}
+                                   for p in part.get('knowledge_points', [])]
+            for idx, point in enumerate(points, 1):
+                code = str(point.get('id') or f"{section_node.code}.{idx}")
+                tree.add(point_node(code, section_node.code, point))
+
+
+def load_point_list(tree: KnowledgeTree, data: Dict):
+    """西药药二_知识点_完整版.json：考点列表[{名称, 章节, 小节, 内容}]，编号取自中文章节号"""
+    for entry in data.get('考点列表', []):
+        chapter_match = CHAPTER_PATTERN.search(entry.get('章节', ''))
+        section_match = SECTION_PATTERN.search(entry.get('小节', ''))
+        if not chapter_match or not section_match:
+            continue
+        chapter_code = str(cn_to_num(chapter_match.group(1)))
+        section_code = f"{chapter_code}.{cn_to_num(section_match.group(1))}"
+        if chapter_code not in tree.nodes:
+            tree.add(TreeNode(chapter_code, 1, chapter_match.group(2).strip()))
+        if section_code not in tree.nodes:
+            tree.add(TreeNode(section_code, 2, section_match.group(2).strip(), parent=chapter_code))
+        name = entry.get('名称', '')
+        number = POINT_NAME_PATTERN.match(name)
+        code = f"{section_code}.{number.group(1) if number else len(tree.nodes[section_code].children) + 1}"
+        tree.add(point_node(code, section_code, {
+            'title': POINT_NAME_PATTERN.sub('', name),
+            'content': entry.get('内容'),
+            'drug_name': '、'.join(entry.get('相关药物') or []),
+        }))
+
+
+def load_records(tree: KnowledgeTree, records: List[Dict]):
+    """西药药二_数据库记录*.json：[{type, code, title, parent_id, level, ...}]"""
+    for record in sorted(records, key=lambda r: r.get('level') or len(str(r.get('code', '')).split('.'))):
+        code = str(record.get('code') or record.get('id'))
+        level = int(record.get('level') or len(code.split('.')))
+        parent = code.rsplit('.', 1)[0] if level > 1 else None
+        if parent is not None and parent not in tree.nodes:
+            continue
+        if level == 3:
+            tree.add(point_node(code, parent, record))
+        else:
+            tree.add(TreeNode(code, level, str(record.get('title') or '').strip(), parent=parent))
+
+
+def load_tree(path: str) -> KnowledgeTree:
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    name = os.path.basename(path)
+    if isinstance(data, list):
+        subject_code = next((r.get('subject_code') for r in data if r.get('subject_code')), DEFAULT_SUBJECT_CODE)
+        tree = KnowledgeTree(name, subject_code)
+        load_records(tree, data)
+    else:
+        tree = KnowledgeTree(name, data.get('subject_code') or data.get('metadata', {}).get('subject_code')
+                             or DEFAULT_SUBJECT_CODE)
+        if '考点列表' in data:
+            load_point_list(tree, data)
+        else:
+            load_nested(tree, data)
+    tree.compute_hashes()
+    return tree
+
+
+@dataclass
+class TreeDiff:
+    added: List[str] = field(default_factory=list)                 # 新树中的 code
+    removed: List[str] = field(default_factory=list)               # 旧树中的 code
+    changed: List[Tuple[str, List[str]]] = field(default_factory=list)
+    moved: List[Tuple[str, str, bool]] = field(default_factory=list)  # (旧 code, 新 code, 整棵子树)
+    unchanged_subtrees: int = 0
+
+    def summary(self) -> Dict[str, int]:
+        return {'added': len(self.added), 'removed': len(self.removed),
+                'moved': len(self.moved), 'changed': len(self.changed),
+                'unchanged_subtrees': self.unchanged_subtrees}
+
+
+def diff_trees(old: KnowledgeTree, new: KnowledgeTree) -> TreeDiff:
+    """同 code 逐层比对，子树哈希相同则整体跳过；剩余的新增/删除再按哈希配对识别移动"""
+    diff = TreeDiff()
+    added, removed = [], []
+    stack = [(a, b) for a, b in zip_codes(old.roots, new.roots)]
+    while stack:
+        old_code, new_code = stack.pop()
+        if old_code is None:
+            added.append(new_code)
+            continue
+        if new_code is None:
+            removed.append(old_code)
+            continue
+        a, b = old.nodes[old_code], new.nodes[new_code]
+        if a.tree_hash == b.tree_hash:
+            diff.unchanged_subtrees += 1
+            continue
+        if a.own_hash != b.own_hash:
+            diff.changed.append((new_code, [f for f in HASH_FIELDS if getattr(a, f) != getattr(b, f)]))
+        stack.extend(zip_codes(a.children, b.children))
+
+    # 移动：先按子树哈希整体配对（整节挪到别的章），再按节点自身哈希配对；只接受两侧都唯一的哈希
+    removed_nodes = [c for r in removed for c in old.descendants(r)]
+    added_nodes = [c for a in added for c in new.descendants(a)]
+    consumed_old, consumed_new = set(), set()
+    for attr in ('tree_hash', 'own_hash'):
+        old_by_hash = unique_by(old, [c for c in removed_nodes if c not in consumed_old], attr)
+        new_by_hash = unique_by(new, [c for c in added_nodes if c not in consumed_new], attr)
+        for digest, old_code in old_by_hash.items():
+            new_code = new_by_hash.get(digest)
+            if new_code is None or old.nodes[old_code].level != new.nodes[new_code].level:
+                continue
+            whole = attr == 'tree_hash'
+            diff.moved.append((old_code, new_code, whole))
+            if whole:
+                consumed_old.update(old.descendants(old_code))
+                consumed_new.update(new.descendants(new_code))
+            else:
+                consumed_old.add(old_code)
+                consumed_new.add(new_code)
+
+    diff.added = [c for c in added_nodes if c not in consumed_new]
+    diff.removed = [c for c in removed_nodes if c not in consumed_old]
+    diff.moved.sort(key=lambda m: code_key(m[1]))
+    diff.changed.sort(key=lambda c: code_key(c[0]))
+    diff.added.sort(key=code_key)
+    diff.removed.sort(key=code_key)
+    return diff
+
+
+def zip_codes(old_codes: List[str], new_codes: List[str]) -> List[Tuple[Optional[str], Optional[str]]]:
+    new_set = set(new_codes)
+    old_set = set(old_codes)
+    pairs = [(c, c if c in new_set else None) for c in old_codes]
+    pairs.extend((None, c) for c in new_codes if c not in old_set)
+    return pairs
+
+
+def unique_by(tree: KnowledgeTree, codes: List[str], attr: str) -> Dict[str, str]:
+    counts = Counter(getattr(tree.nodes[c], attr) for c in codes)
+    return {getattr(tree.nodes[c], attr): c for c in codes if counts[getattr(tree.nodes[c], attr)] == 1}
+
+
+def code_key(code: str) -> List[int]:
+    return [int(part) if part.isdigit() else 0 for part in code.split('.')]
+
+
+def diff_report(old: KnowledgeTree, new: KnowledgeTree, diff: TreeDiff) -> Dict:
+    def brief(tree: KnowledgeTree, code: str) -> Dict:
+        node = tree.nodes[code]
+        return {'code': code, 'type': node.node_type, 'title': node.title}
+
+    return {
+        'old': {'file': old.name, 'nodes': old.stats()},
+        'new': {'file': new.name, 'nodes': new.stats()},
+        'summary': diff.summary(),
+        'added': [brief(new, c) for c in diff.added],
+        'removed': [brief(old, c) for c in diff.removed],
+        'moved': [{**brief(new, n), 'from': o, 'subtree': whole} for o, n, whole in diff.moved],
+        'changed': [{**brief(new, c), 'fields': fields,
+                     **({'old_title': old.nodes[c].title} if 'title' in fields else {})}
+                    for c, fields in diff.changed],
+    }
+
+
+PAYLOAD_COLUMNS = ['id', 'code', 'title', 'content', 'node_type', 'point_type', 'drug_name', 'importance',
+                   'memory_tips', 'parent_id', 'subject_code', 'level', 'sort_order']
+STAGING_TABLE = 'knowledge_tree_diff_import'
+
+
+def node_id(subject_code: str, code: str) -> str:
+    return f"{subject_code}_{code}"
+
+
+def payload_rows(new: KnowledgeTree, diff: TreeDiff) -> List[List]:
+    """需要写入的节点：新增、修改、移动目标（整棵子树移动时含其所有后代）"""
+    codes = set(diff.added) | {c for c, _ in diff.changed}
+    for _, new_code, whole in diff.moved:
+        codes.update(new.descendants(new_code) if whole else [new_code])
+    rows = []
+    for code in sorted(codes, key=lambda c: (new.nodes[c].level, code_key(c))):
+        node = new.nodes[code]
+        rows.append([
+            node_id(new.subject_code, code), code, node.title, node.content or None, node.node_type,
+            node.point_type or None, node.drug_name or None, node.importance, node.memory_tips or None,
+            node_id(new.subject_code, node.parent) if node.parent else None, new.subject_code,
+            node.level, code_key(code)[-1],
+        ])
+    return rows
+
+
+def removed_ids(old: KnowledgeTree, new: KnowledgeTree, diff: TreeDiff) -> List[str]:
+    """删除的节点及移动前的旧位置（code 在新树中已不存在的才删）"""
+    codes = set(diff.removed)
+    for old_code, _, whole in diff.moved:
+        codes.update(old.descendants(old_code) if whole else [old_code])
+    return [node_id(old.subject_code, c) for c in sorted(codes, key=code_key) if c not in new.nodes]
+
+
+def write_payload(path: str, old: KnowledgeTree, new: KnowledgeTree, diff: TreeDiff, prune: bool) -> Tuple[int, int]:
+    rows = payload_rows(new, diff)
+    deletes = removed_ids(old, new, diff)
+    columns = ', '.join(PAYLOAD_COLUMNS)
+    updates = ',\n  '.join(f"{c} = EXCLUDED.{c}" for c in PAYLOAD_COLUMNS if c != 'id')
+    with open(path, 'w', encoding='utf-8') as out:
+        out.write("-- 知识树差异导入 - 由 diff_knowledge_trees.py 生成\n")
+        out.write(f"-- {old.name} -> {new.name}：写入 {len(rows)} 个节点，删除 {len(deletes) if prune else 0} 个\n\n")
+        out.write("BEGIN;\n\n")
+        out.write(f"CREATE TEMP TABLE {STAGING_TABLE} (LIKE knowledge_tree INCLUDING DEFAULTS) ON COMMIT DROP;\n")
+        out.write(f"COPY {STAGING_TABLE} ({columns}) FROM stdin;\n")
+        for row in rows:
+            out.write('\t'.join(copy_text(v) for v in row))
+            out.write('\n')
+        out.write("\\.\n\n")
+        out.write(f"INSERT INTO knowledge_tree ({columns})\n"
+                  f"SELECT {columns} FROM {STAGING_TABLE} ORDER BY level, sort_order\n"
+                  f"ON CONFLICT (id) DO UPDATE SET\n  {updates},\n  updated_at = now();\n")
+        if deletes:
+            # 删除会级联到子节点与 user_knowledge_mastery，默认只列出不执行
+            id_list = ',\n  '.join("'" + i.replace("'", "''") + "'" for i in deletes)
+            statement = f"DELETE FROM knowledge_tree WHERE id IN (\n  {id_list}\n);\n"
+            if prune:
+                out.write("\n" + statement)
+            else:
+                out.write("\n-- 以下节点在新版本中已不存在（加 --prune 才会删除，删除会级联清除掌握度记录）：\n")
+                out.write(''.join(f"-- {line}\n" for line in statement.rstrip('\n').split('\n')))
+        out.write("\nCOMMIT;\n")
+    return len(rows), len(deletes)
+
+
+def print_diff(old: KnowledgeTree, new: KnowledgeTree, diff: TreeDiff, limit: int):
+    summary = diff.summary()
+    print(f"\n📊 {old.name} -> {new.name}")
+    print(f"   新增 {summary['added']}，删除 {summary['removed']}，移动 {summary['moved']}，"
+          f"修改 {summary['changed']}（相同子树跳过 {summary['unchanged_subtrees']}）")
+    for label, items in (('➕', [(c, new.nodes[c].title) for c in diff.added]),
+                         ('➖', [(c, old.nodes[c].title) for c in diff.removed]),
+                         ('🔀', [(f"{o} -> {n}{'（整棵子树）' if w else ''}", new.nodes[n].title) for o, n, w in diff.moved]),
+                         ('✏️', [(f"{c} [{', '.join(f)}]", new.nodes[c].title) for c, f in diff.changed])):
+        for code, title in items[:limit]:
+            print(f"   {label} {code} {title[:30]}")
+        if len(items) > limit:
+            print(f"   {label} ... 另有 {len(items) - limit} 个")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='知识树版本差异比对（Merkle 哈希）')
+    parser.add_argument('trees', nargs='+', help='知识树 JSON；第一份为基准，其余逐一与之比对')
+    parser.add_argument('--report', default=DEFAULT_REPORT, help='差异报告输出文件')
+    parser.add_argument('--payload', help='输出只含差异节点的 knowledge_tree upsert 载荷（仅两份输入时）')
+    parser.add_argument('--prune', action='store_true', help='载荷中删除新版本已不存在的节点')
+    parser.add_argument('--limit', type=int, default=10, help='每类差异最多打印条数')
+
+    args = parser.parse_args()
+
+    print("=== 知识树版本差异比对 ===\n")
+
+    if len(args.trees) < 2:
+        print("❌ 至少需要两份知识树")
+        return
+    if args.payload and len(args.trees) != 2:
+        print("❌ --payload 只能用于两份输入（旧版本 新版本）")
+        return
+    missing = [p for p in args.trees if not os.path.exists(p)]
+    if missing:
+        print(f"❌ 文件不存在：{', '.join(missing)}")
+        return
+
+    started = time.time()
+    trees = [load_tree(path) for path in args.trees]
+    for tree in trees:
+        counts = tree.stats()
+        print(f"🌳 {tree.name}: {counts.get('chapter', 0)} 章 {counts.get('section', 0)} 节 "
+              f"{counts.get('knowledge_point', 0)} 个考点")
+
+    base = trees[0]
+    reports = []
+    for tree in trees[1:]:
+        diff = diff_trees(base, tree)
+        print_diff(base, tree, diff, args.limit)
+        reports.append(diff_report(base, tree, diff))
+        if args.payload:
+            written, deleted = write_payload(args.payload, base, tree, diff, args.prune)
+            action = '删除' if args.prune else '待删除（未启用 --prune）'
+            print(f"\n✅ upsert 载荷: {args.payload}（写入 {written} 个节点，{action} {deleted} 个）")
+    print(f"\n⏱️  {time.time() - started:.2f} 秒")
+
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(reports if len(reports) > 1 else reports[0], f, ensure_ascii=False, indent=2)
+    print(f"✅ 差异报告: {args.report}")
+
+
+if __name__ == '__main__':
+    main()
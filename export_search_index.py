@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地全文检索库导出工具（SQLite FTS5）
+====================================
+把题库与考点导出为一个独立的 SQLite 文件，离线按药名、短语检索，不必连 Supabase：
+
+  - questions / knowledge_points 两张明细表，questions 在 subject、source_year、
+    question_type、chapter 上建二级索引，供筛选；
+  - FTS5 全文索引，两种中文分词方式：
+      bigram（默认）：写入前先切成中文二元组、空格分隔，FTS5 按 unicode61 建索引，
+                     查询同样切分后按短语匹配，两个字的药名也能命中；
+      trigram：直接使用 SQLite 3.34+ 内置的 trigram 分词器，查询词至少 3 个字；
+  - 附带小型查询 API（SearchIndex），可在其他脚本中直接 import 使用。
+
+使用方法：
+  python export_search_index.py
+  python export_search_index.py --json parsed_questions.json --tokenizer trigram
+  python export_search_index.py --query 阿司匹林 --subject 药学专业知识（二）
+
+  from export_search_index import SearchIndex
+  with SearchIndex('shuju/题库检索.sqlite') as index:
+      index.search('华法林 出血', question_type='single', limit=10)
+
+输入：shuju/ 下的历年真题、章节练习题库、考点文件，以及 --json 指定的题目数组
+输出：shuju/题库检索.sqlite
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import time
+from typing import Dict, Iterator, List, Optional
+
+from normalize_layout import normalize_text
+
+
+DEFAULT_OUTPUT = 'shuju/题库检索.sqlite'
+SCHEMA_VERSION = 1
+
+TOKEN_PATTERN = re.compile(r'[一-鿿]+|[a-z0-9]+')
+
+QUESTION_FIELDS = ['id', 'exam_type', 'subject', 'chapter', 'question_type', 'question_number', 'content',
+                   'options', 'correct_answer', 'explanation', 'knowledge_points', 'source_type', 'source_year']
+POINT_FIELDS = ['code', 'chapter', 'section', 'title', 'content']
+
+
+def bigram_tokens(text: str) -> List[str]:
+    """按原文顺序切分：中文连续片段切二元组（单字保留），英文数字按词"""
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(normalize_text(text or '').lower()):
+        run = match.group(0)
+        if run[0] >= '一' and len(run) > 1:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def options_text(options) -> str:
+    if isinstance(options, str):
+        try:
+            options = json.loads(options)
+        except ValueError:
+            return options
+    if isinstance(options, dict):
+        return ' '.join(f"{k}.{v}" for k, v in options.items())
+    return ' '.join(f"{o.get('key', '')}.{o.get('value', '')}" if isinstance(o, dict) else str(o)
+                    for o in options or [])
+
+
+def iter_history_questions() -> Iterator[Dict]:
+    from import_exam_history import discover_sources, normalize_source
+
+    sources, _ = discover_sources([])
+    for source in sources:
+        rows, _ = normalize_source(source)
+        for row in rows:
+            yield {**row, 'id': f"history:{source.year}:{source.subject}:{row['question_number']}"}
+
+
+def iter_chapter_questions(path: str) -> Iterator[Dict]:
+    from import_chapter_questions import COLUMNS, KnowledgeTreeIndex, DEFAULT_SUBJECT, DEFAULT_TREE, \
+        build_row, iter_questions
+
+    tree = KnowledgeTreeIndex.load(DEFAULT_TREE)
+    for q in iter_questions(path):
+        values, _ = build_row(q, tree, DEFAULT_SUBJECT)
+        row = dict(zip(COLUMNS, values))
+        row['options'] = json.loads(row['options'])
+        row['knowledge_points'] = row['knowledge_points'].strip('{}').replace('"', '').split(',')
+        if row['id']:
+            yield row
+
+
+def iter_json_questions(path: str) -> Iterator[Dict]:
+    """questions 表结构的 JSON 数组（question_parser.py 的 export_json、数据库导出等）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('questions', [])
+    name = os.path.basename(path)
+    for idx, q in enumerate(data):
+        if isinstance(q, dict):
+            yield {**q, 'id': str(q.get('id') or f"json:{name}:{idx}")}
+
+
+def iter_points(point_dir: str) -> Iterator[Dict]:
+    from link_knowledge_points import load_points
+
+    for point in load_points(point_dir):
+        yield {'code': point.code, 'chapter': point.chapter, 'section': point.section,
+               'title': point.title, 'content': point.body}
+
+
+class SearchIndexBuilder:
+    """建库：明细表 + 二级索引 + FTS5"""
+
+    def __init__(self, path: str, tokenizer: str = 'bigram'):
+        if os.path.exists(path):
+            os.remove(path)
+        self.tokenizer = tokenizer
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode = OFF')
+        self.conn.execute('PRAGMA synchronous = OFF')
+        self._create_schema()
+
+    def _fts_options(self, table: str) -> str:
+        if self.tokenizer == 'trigram':
+            return f"content='{table}', content_rowid='rowid', tokenize='trigram'"
+        return "content='', tokenize='unicode61'"
+
+    def _create_schema(self):
+        self.conn.executescript(f"""
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE questions (
+                rowid INTEGER PRIMARY KEY,
+                id TEXT UNIQUE NOT NULL,
+                exam_type TEXT, subject TEXT, chapter TEXT, question_type TEXT, question_number INTEGER,
+                content TEXT, options TEXT, correct_answer TEXT, explanation TEXT,
+                knowledge_points TEXT, source_type TEXT, source_year INTEGER
+            );
+            CREATE TABLE knowledge_points (
+                rowid INTEGER PRIMARY KEY,
+                code TEXT UNIQUE NOT NULL, chapter TEXT, section TEXT, title TEXT, content TEXT
+            );
+            CREATE VIRTUAL TABLE questions_fts USING fts5(content, options, explanation, {self._fts_options('questions')});
+            CREATE VIRTUAL TABLE points_fts USING fts5(title, content, {self._fts_options('knowledge_points')});
+        """)
+        self.conn.executemany('INSERT INTO meta VALUES (?, ?)', [
+            ('schema_version', str(SCHEMA_VERSION)), ('tokenizer', self.tokenizer)])
+
+    def _fts_value(self, text: str) -> str:
+        return ' '.join(bigram_tokens(text)) if self.tokenizer == 'bigram' else (text or '')
+
+    def add_questions(self, questions: Iterator[Dict]) -> int:
+        added = 0
+        for q in questions:
+            q = {**q, 'options': options_text(q.get('options'))}
+            values = [q.get(f) for f in QUESTION_FIELDS]
+            values[QUESTION_FIELDS.index('knowledge_points')] = json.dumps(q.get('knowledge_points') or [],
+                                                                           ensure_ascii=False)
+            cur = self.conn.execute(
+                f"INSERT OR REPLACE INTO questions ({', '.join(QUESTION_FIELDS)}) "
+                f"VALUES ({', '.join('?' * len(QUESTION_FIELDS))})", values)
+            self.conn.execute('INSERT INTO questions_fts (rowid, content, options, explanation) VALUES (?, ?, ?, ?)',
+                              (cur.lastrowid, self._fts_value(q.get('content')), self._fts_value(q['options']),
+                               self._fts_value(q.get('explanation'))))
+            added += 1
+        return added
+
+    def add_points(self, points: Iterator[Dict]) -> int:
+        added = 0
+        for p in points:
+            cur = self.conn.execute(
+                f"INSERT OR REPLACE INTO knowledge_points ({', '.join(POINT_FIELDS)}) VALUES (?, ?, ?, ?, ?)",
+                [p[f] for f in POINT_FIELDS])
+            self.conn.execute('INSERT INTO points_fts (rowid, title, content) VALUES (?, ?, ?)',
+                              (cur.lastrowid, self._fts_value(p['title']), self._fts_value(p['content'])))
+            added += 1
+        return added
+
+    def finish(self):
+        """数据写完后再建二级索引并合并 FTS 段，比边写边维护索引快"""
+        self.conn.executescript("""
+            CREATE INDEX idx_questions_subject ON questions(subject);
+            CREATE INDEX idx_questions_year ON questions(source_year);
+            CREATE INDEX idx_questions_type ON questions(question_type);
+            CREATE INDEX idx_questions_chapter ON questions(chapter);
+            CREATE INDEX idx_questions_subject_year ON questions(subject, source_year);
+            CREATE INDEX idx_points_section ON knowledge_points(section);
+            INSERT INTO questions_fts(questions_fts) VALUES ('optimize');
+            INSERT INTO points_fts(points_fts) VALUES ('optimize');
+            ANALYZE;
+        """)
+        self.conn.commit()
+        self.conn.execute('VACUUM')
+        self.conn.close()
+
+
+class SearchIndex:
+    """查询 API：全文检索 + 科目/年份/题型/章节筛选，结果按 bm25 排序"""
+
+    def __init__(self, path: str = DEFAULT_OUTPUT):
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.tokenizer = self.conn.execute("SELECT value FROM meta WHERE key = 'tokenizer'").fetchone()[0]
+
+    def __enter__(self) -> 'SearchIndex':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def match_expression(self, query: str) -> str:
+        """空格分隔的多个词全部命中（AND），每个词按短语匹配"""
+        phrases = []
+        for term in query.split():
+            if self.tokenizer == 'bigram':
+                tokens = bigram_tokens(term)
+                if tokens:
+                    phrases.append('"' + ' '.join(tokens) + '"')
+            else:
+                phrases.append('"' + term.replace('"', '""') + '"')
+        return ' AND '.join(phrases)
+
+    def search(self, query: str, subject: Optional[str] = None, year: Optional[int] = None,
+               question_type: Optional[str] = None, chapter: Optional[str] = None,
+               limit: int = 20) -> List[Dict]:
+        expression = self.match_expression(query)
+        if not expression:
+            return []
+        filters, params = [], [expression]
+        for column, value in (('subject', subject), ('source_year', year),
+                              ('question_type', question_type), ('chapter', chapter)):
+            if value is not None:
+                filters.append(f"q.{column} = ?")
+                params.append(value)
+        where = ''.join(f" AND {f}" for f in filters)
+        rows = self.conn.execute(
+            f"SELECT q.*, bm25(questions_fts, 3.0, 1.0, 1.0) AS score FROM questions_fts "
+            f"JOIN questions q ON q.rowid = questions_fts.rowid "
+            f"WHERE questions_fts MATCH ?{where} ORDER BY score LIMIT ?", params + [limit])
+        return [dict(row, knowledge_points=json.loads(row['knowledge_points'] or '[]')) for row in rows]
+
+    def search_points(self, query: str, section: Optional[str] = None, limit: int = 20) -> List[Dict]:
+        expression = self.match_expression(query)
+        if not expression:
+            return []
+        params = [expression] + ([section] if section else []) + [limit]
+        rows = self.conn.execute(
+            f"SELECT p.*, bm25(points_fts, 5.0, 1.0) AS score FROM points_fts "
+            f"JOIN knowledge_points p ON p.rowid = points_fts.rowid "
+            f"WHERE points_fts MATCH ?{' AND p.section = ?' if section else ''} ORDER BY score LIMIT ?", params)
+        return [dict(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        return {table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ('questions', 'knowledge_points')}
+
+
+def build(output: str, tokenizer: str, chapter_banks: List[str], json_files: List[str],
+          point_dir: Optional[str], include_history: bool = True) -> Dict:
+    builder = SearchIndexBuilder(output, tokenizer)
+    stats = {}
+    if include_history:
+        stats['历年真题'] = builder.add_questions(iter_history_questions())
+    for path in chapter_banks:
+        if os.path.exists(path):
+            stats[os.path.basename(path)] = builder.add_questions(iter_chapter_questions(path))
+    for path in json_files:
+        stats[os.path.basename(path)] = builder.add_questions(iter_json_questions(path))
+    if point_dir and os.path.isdir(point_dir):
+        stats['考点'] = builder.add_points(iter_points(point_dir))
+    builder.finish()
+    return stats
+
+
+def print_results(results: List[Dict], title_key: str):
+    for row in results:
+        label = row.get('code') or ' '.join(str(v) for v in (
+            row.get('source_year'), row.get('subject') or row.get('source_type'),
+            f"第{row['question_number']}题" if row.get('question_number') else row.get('id')) if v)
+        print(f"   - [{row['score']:.2f}] {label}: {(row.get(title_key) or '')[:50]}")
+
+
+def main():
+    from extract_point_blocks import DEFAULT_POINT_DIR
+    from import_chapter_questions import DEFAULT_INPUT
+
+    parser = argparse.ArgumentParser(description='导出 SQLite FTS5 本地检索库')
+    parser.add_argument('--output', '-o', default=DEFAULT_OUTPUT, help='SQLite 文件')
+    parser.add_argument('--tokenizer', choices=['bigram', 'trigram'], default='bigram', help='中文分词方式')
+    parser.add_argument('--chapter-bank', nargs='*', default=[DEFAULT_INPUT], help='章节练习题库 JSON')
+    parser.add_argument('--json', nargs='*', default=[], help='questions 表结构的题目 JSON')
+    parser.add_argument('--points', default=DEFAULT_POINT_DIR, help='考点文件目录')
+    parser.add_argument('--no-history', action='store_true', help='不导出历年真题')
+    parser.add_argument('--query', '-q', help='只在已有检索库上查询')
+    parser.add_argument('--subject', help='查询时按科目筛选')
+    parser.add_argument('--year', type=int, help='查询时按年份筛选')
+    parser.add_argument('--type', dest='question_type', help='查询时按题型筛选（single / multiple）')
+    parser.add_argument('--limit', type=int, default=10, help='查询返回条数')
+
+    args = parser.parse_args()
+
+    if args.query:
+        if not os.path.exists(args.output):
+            print(f"❌ 检索库不存在：{args.output}（先运行 python export_search_index.py）")
+            return
+        with SearchIndex(args.output) as index:
+            started = time.time()
+            questions = index.search(args.query, args.subject, args.year, args.question_type, limit=args.limit)
+            points = index.search_points(args.query, limit=args.limit)
+            elapsed = (time.time() - started) * 1000
+        print(f"🔍 “{args.query}”：题目 {len(questions)} 条，考点 {len(points)} 条（{elapsed:.1f} ms）")
+        print_results(questions, 'content')
+        print_results(points, 'title')
+        return
+
+    print("=== 导出本地全文检索库 ===\n")
+    started = time.time()
+    stats = build(args.output, args.tokenizer, args.chapter_bank, args.json, args.points,
+                  include_history=not args.no_history)
+    elapsed = time.time() - started
+
+    for name, count in stats.items():
+        print(f"📖 {name}: {count}")
+    size = os.path.getsize(args.output)
+    print(f"\n⏱️  {elapsed:.2f} 秒，分词方式 {args.tokenizer}，文件 {size / 1024 / 1024:.1f} MB")
+    print(f"✅ 检索库: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
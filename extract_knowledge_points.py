@@ -10,6 +10,8 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field, asdict
 from pathlib import Path
 
+from cn_numerals import cn_to_num
+
 @dataclass
 class KnowledgePoint:
     """知识点数据结构"""
@@ -266,12 +268,7 @@ class KnowledgeExtractor:
     
     def _chinese_to_num(self, chinese: str) -> int:
         """中文数字转阿拉伯数字"""
-        mapping = {
-            '一': 1, '二': 2, '三': 3, '四': 4, '五': 5,
-            '六': 6, '七': 7, '八': 8, '九': 9, '十': 10,
-            '十一': 11, '十二': 12, '十三': 13, '十四': 14, '十五': 15
-        }
-        return mapping.get(chinese, 1)
+        return cn_to_num(chinese, default=1)
     
     def _build_knowledge_tree(self) -> Dict:
         """构建知识树"""
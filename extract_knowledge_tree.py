@@ -6,7 +6,8 @@
 
 import json
 import re
-from typing import Dict, List, Optional, Any
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Any, Tuple
 from collections import defaultdict
 
 class KnowledgeTreeExtractor:
@@ -14,6 +15,8 @@ class KnowledgeTreeExtractor:
         # 章节匹配模式
         self.chapter_pattern = re.compile(r'第[一二三四五六七八九十]+章\s+([^/]+)')
         self.section_pattern = re.compile(r'第[一二三四五六七八九十]+节\s+([^\n]+)')
+        # 段落分割模式（多个换行或特定标记）
+        self.paragraph_split_pattern = re.compile(r'\n{2,}|【|考点|项目|具体内容')
         
         # 知识点类型关键词
         self.knowledge_types = {
@@ -37,14 +40,20 @@ class KnowledgeTreeExtractor:
         # 药物名称模式（常见药物后缀）
         self.drug_suffixes = ['片', '胶囊', '注射液', '颗粒', '口服液', '栓', '膏', '散', '丸']
         
-    def extract_text_from_json(self, json_data: Dict) -> str:
-        """从JSON数据中提取所有文本内容"""
+    def extract_text_from_json(self, json_data: Dict,
+                               positions: Optional[List[Tuple[int, int, int]]] = None) -> str:
+        """从JSON数据中提取所有文本内容
+        
+        传入 positions 时，按行追加 (行起始偏移, page_idx, block_idx)，供按页定位段落使用。
+        """
         text_parts = []
+        line_blocks = []
         
         if 'pdf_info' in json_data:
             for page in json_data['pdf_info']:
+                page_idx = page.get('page_idx', 0)
                 if 'para_blocks' in page:
-                    for block in page['para_blocks']:
+                    for block_idx, block in enumerate(page['para_blocks']):
                         # 处理普通文本块
                         if 'lines' in block:
                             for line in block['lines']:
@@ -57,6 +66,7 @@ class KnowledgeTreeExtractor:
                                                 line_text.append(content)
                                     if line_text:
                                         text_parts.append(' '.join(line_text))
+                                        line_blocks.append((page_idx, block_idx))
                         # 处理列表块
                         elif 'blocks' in block:
                             for sub_block in block['blocks']:
@@ -71,6 +81,13 @@ class KnowledgeTreeExtractor:
                                                         line_text.append(content)
                                             if line_text:
                                                 text_parts.append(' '.join(line_text))
+                                                line_blocks.append((page_idx, block_idx))
+        
+        if positions is not None:
+            offset = 0
+            for part, (page_idx, block_idx) in zip(text_parts, line_blocks):
+                positions.append((offset, page_idx, block_idx))
+                offset += len(part) + 1
         
         return '\n'.join(text_parts)
     
@@ -81,7 +98,7 @@ class KnowledgeTreeExtractor:
         if 'pdf_info' in json_data:
             for page in json_data['pdf_info']:
                 if 'para_blocks' in page:
-                    for block in page['para_blocks']:
+                    for block_idx, block in enumerate(page['para_blocks']):
                         # 处理普通文本块
                         if 'lines' in block:
                             for line in block['lines']:
@@ -91,7 +108,8 @@ class KnowledgeTreeExtractor:
                                             tables.append({
                                                 'html': span['html'],
                                                 'content': span.get('content', ''),
-                                                'page_idx': page.get('page_idx', 0)
+                                                'page_idx': page.get('page_idx', 0),
+                                                'block_idx': block_idx
                                             })
                         # 处理列表块
                         elif 'blocks' in block:
@@ -104,36 +122,101 @@ class KnowledgeTreeExtractor:
                                                     tables.append({
                                                         'html': span['html'],
                                                         'content': span.get('content', ''),
-                                                        'page_idx': page.get('page_idx', 0)
+                                                        'page_idx': page.get('page_idx', 0),
+                                                        'block_idx': block_idx
                                                     })
         
         return tables
     
-    def parse_chapters(self, text: str) -> List[Dict]:
+    def build_table_index(self, tables: List[Dict]) -> Dict:
+        """按 (page_idx, block_idx) 排序表格，建立页码区间索引"""
+        ordered = sorted(tables, key=lambda t: (t.get('page_idx', 0), t.get('block_idx', 0)))
+        return {
+            'pages': [t.get('page_idx', 0) for t in ordered],
+            'tables': ordered
+        }
+    
+    def tables_in_pages(self, table_index: Dict, first_page: int, last_page: int) -> List[Dict]:
+        """二分查找页码区间 [first_page, last_page] 内的表格"""
+        pages = table_index['pages']
+        lo = bisect_left(pages, first_page)
+        hi = bisect_right(pages, last_page)
+        return table_index['tables'][lo:hi]
+    
+    def page_of_offset(self, line_offsets: List[int], positions: List[Tuple[int, int, int]],
+                       offset: int) -> int:
+        """根据文本偏移定位所在页码"""
+        if not positions:
+            return 0
+        idx = bisect_right(line_offsets, offset) - 1
+        return positions[max(idx, 0)][1]
+    
+    def _split_paragraphs(self, text: str):
+        """按段落分割文本，同时返回每段在原文中的起始偏移"""
+        start = 0
+        for match in self.paragraph_split_pattern.finditer(text):
+            yield start, text[start:match.start()]
+            start = match.end()
+        yield start, text[start:]
+    
+    def build_heading_index(self, text: str) -> List[Dict]:
+        """一次扫描建立章/节标题的偏移索引
+        
+        每个条目记录标题类型、匹配结果和所在行的起始偏移；end 为该标题正文的结束偏移，
+        即下一个章/节标题的起始位置。
+        """
+        index = []
+        offset = 0
+        
+        for line in text.split('\n'):
+            stripped = line.strip()
+            if stripped:
+                kind = None
+                match = self.chapter_pattern.search(stripped)
+                if match:
+                    kind = 'chapter'
+                else:
+                    match = self.section_pattern.search(stripped)
+                    if match:
+                        kind = 'section'
+                
+                if kind:
+                    index.append({
+                        'kind': kind,
+                        'match': match,
+                        'start': offset,
+                        'end': len(text)
+                    })
+            offset += len(line) + 1
+        
+        # 每个标题的正文到下一个标题为止
+        for entry, following in zip(index, index[1:]):
+            entry['end'] = following['start']
+        
+        return index
+    
+    def parse_chapters(self, text: str, heading_index: Optional[List[Dict]] = None) -> List[Dict]:
         """解析章节结构"""
+        if heading_index is None:
+            heading_index = self.build_heading_index(text)
+        
         chapters = []
-        lines = text.split('\n')
         
         current_chapter = None
         current_section = None
         chapter_counter = 0
         section_counter = 0
         
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line:
-                continue
-            
+        for entry in heading_index:
             # 匹配章节（支持多种格式）
-            chapter_match = self.chapter_pattern.search(line)
-            if chapter_match:
+            if entry['kind'] == 'chapter':
                 if current_chapter:
                     if current_section:
                         current_chapter['sections'].append(current_section)
                     chapters.append(current_chapter)
                 
                 chapter_counter += 1
-                chapter_name = chapter_match.group(1).strip()
+                chapter_name = entry['match'].group(1).strip()
                 # 清理章节名称（移除页码等）
                 chapter_name = re.sub(r'//.*$', '', chapter_name).strip()
                 
@@ -147,13 +230,12 @@ class KnowledgeTreeExtractor:
                 continue
             
             # 匹配节
-            section_match = self.section_pattern.search(line)
-            if section_match and current_chapter:
+            if entry['kind'] == 'section' and current_chapter:
                 if current_section:
                     current_chapter['sections'].append(current_section)
                 
                 section_counter += 1
-                section_name = section_match.group(1).strip()
+                section_name = entry['match'].group(1).strip()
                 # 清理节名称（移除页码等）
                 section_name = re.sub(r'\s+\d+$', '', section_name).strip()
                 section_name = re.sub(r'\.\s*$', '', section_name).strip()
@@ -161,6 +243,7 @@ class KnowledgeTreeExtractor:
                 current_section = {
                     'section_id': section_counter,
                     'section_name': section_name,
+                    'text_span': (entry['start'], entry['end']),
                     'knowledge_points': []
                 }
                 continue
@@ -370,13 +453,17 @@ class KnowledgeTreeExtractor:
             json_data = json.load(f)
         
         print("📝 正在提取文本内容...")
-        text = self.extract_text_from_json(json_data)
+        positions = []
+        text = self.extract_text_from_json(json_data, positions)
+        line_offsets = [pos[0] for pos in positions]
         
         print("📊 正在提取表格内容...")
         tables = self.extract_html_tables(json_data)
+        table_index = self.build_table_index(tables)
         
         print("🌳 正在解析章节结构...")
-        chapters = self.parse_chapters(text)
+        heading_index = self.build_heading_index(text)
+        chapters = self.parse_chapters(text, heading_index)
         
         print("🔍 正在识别知识点...")
         # 按章节和节组织知识点
@@ -385,10 +472,7 @@ class KnowledgeTreeExtractor:
             'chapters': []
         }
         
-        # 将文本按章节分割
-        chapter_texts = re.split(r'第[一二三四五六七八九十]+章', text)
-        
-        for i, chapter in enumerate(chapters):
+        for chapter in chapters:
             chapter_id = chapter['chapter_id']
             chapter_name = chapter['chapter_name']
             
@@ -400,9 +484,6 @@ class KnowledgeTreeExtractor:
                 'sections': []
             }
             
-            # 获取该章节的文本内容
-            chapter_text = chapter_texts[i] if i < len(chapter_texts) else ''
-            
             # 处理每个节
             for section in chapter['sections']:
                 section_id = section['section_id']
@@ -416,51 +497,18 @@ class KnowledgeTreeExtractor:
                     'knowledge_points': []
                 }
                 
-                # 在该节的文本中查找知识点
-                # 使用更灵活的匹配策略
-                section_keywords = section_name[:5]  # 使用节名称的前几个字作为关键词
-                
-                # 尝试多种匹配方式
-                section_patterns = [
-                    re.compile(rf'{re.escape(section_keywords)}.*?(?=第[一二三四五六七八九十]+节|第[一二三四五六七八九十]+章|$)', re.DOTALL),
-                    re.compile(rf'{re.escape(section_name)}.*?(?=第[一二三四五六七八九十]+节|第[一二三四五六七八九十]+章|$)', re.DOTALL),
-                ]
-                
-                section_text = ''
-                for pattern in section_patterns:
-                    match = pattern.search(chapter_text)
-                    if match:
-                        section_text = match.group(0)
-                        break
-                
-                # 如果没找到，尝试在整个文本中搜索
-                if not section_text:
-                    # 查找包含节名称关键词的文本段
-                    lines = chapter_text.split('\n')
-                    start_idx = -1
-                    for idx, line in enumerate(lines):
-                        if section_keywords in line:
-                            start_idx = idx
-                            break
-                    
-                    if start_idx >= 0:
-                        # 获取后续的文本，直到下一个节或章
-                        end_idx = len(lines)
-                        for idx in range(start_idx + 1, len(lines)):
-                            if (re.search(r'第[一二三四五六七八九十]+节', lines[idx]) or 
-                                re.search(r'第[一二三四五六七八九十]+章', lines[idx])):
-                                end_idx = idx
-                                break
-                        section_text = '\n'.join(lines[start_idx:end_idx])
+                # 直接按标题索引切出该节正文（到下一个节或章为止）
+                span_start, span_end = section['text_span']
+                section_text = text[span_start:span_end]
                 
                 if section_text:
                     # 提取知识点
                     # 按段落分割（使用多个换行或特定标记）
-                    paragraphs = re.split(r'\n{2,}|【|考点|项目|具体内容', section_text)
+                    paragraphs = self._split_paragraphs(section_text)
                     
                     point_id = 1
-                    for para in paragraphs:
-                        para = para.strip()
+                    for para_offset, raw_para in paragraphs:
+                        para = raw_para.strip()
                         if len(para) < 50:  # 跳过太短的段落
                             continue
                         
@@ -472,8 +520,13 @@ class KnowledgeTreeExtractor:
                         ])
                         
                         if has_keyword:
-                            # 获取相关的表格（简化处理，使用所有表格）
-                            knowledge = self.extract_structured_knowledge(para, tables)
+                            # 只取段落所在页码区间内的表格
+                            para_start = span_start + para_offset
+                            first_page = self.page_of_offset(line_offsets, positions, para_start)
+                            last_page = self.page_of_offset(line_offsets, positions,
+                                                            para_start + len(raw_para) - 1)
+                            para_tables = self.tables_in_pages(table_index, first_page, last_page)
+                            knowledge = self.extract_structured_knowledge(para, para_tables)
                             
                             # 如果提取到了有效信息，添加到知识点列表
                             if (knowledge['drug_name'] or 
@@ -483,6 +536,7 @@ class KnowledgeTreeExtractor:
                                 knowledge['point_id'] = f"{chapter_id}.{section_id}.{point_id}"
                                 knowledge['point_title'] = self._generate_point_title(para)
                                 knowledge['full_content'] = para[:2000]  # 保存完整内容（限制长度）
+                                knowledge['page_range'] = [first_page, last_page]
                                 section_data['knowledge_points'].append(knowledge)
                                 point_id += 1
                 
@@ -6,9 +6,12 @@
 
 import json
 import re
-from typing import Dict, List, Optional
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 
+from cn_numerals import cn_to_num
+
 @dataclass
 class KnowledgePoint:
     """知识点"""
@@ -35,16 +38,141 @@ class Chapter:
     sections: List[Section] = field(default_factory=list)
 
 
+class KeywordAutomaton:
+    """多模式字符串匹配自动机（Aho-Corasick），一次扫描找出文本中的全部关键词"""
+    
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Tuple[str, Any]]] = [[]]
+    
+    def add(self, word: str, value: Any):
+        """加入关键词及其关联值"""
+        state = 0
+        for ch in word:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = nxt
+        self.output[state].append((word, value))
+    
+    def build(self):
+        """构建失败指针（加入全部关键词后调用一次）"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+    
+    def find_all(self, text: str) -> List[Tuple[str, Any]]:
+        """返回文本中命中的全部 (关键词, 关联值)"""
+        hits = []
+        state = 0
+        for ch in text:
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            hits.extend(self.output[state])
+        return hits
+
+
+class SectionChapterResolver:
+    """小节 -> 章节解析器
+    
+    合并目录中的小节标题与关键词映射构建自动机，每个小节标题只扫描一次。
+    目录标题命中优先（最长匹配，节号一致者优先），其次为关键词命中；
+    命中多个章节或未命中时记录到 issues，供运行结束后报告。
+    """
+    
+    def __init__(self, chapters: List[Dict], toc_sections: List[Tuple[str, int, str]],
+                 keyword_chapter: Dict[str, str]):
+        self.chapter_by_id = {chapter['id']: chapter for chapter in chapters}
+        self.issues: List[Dict] = []
+        self.automaton = KeywordAutomaton()
+        
+        for chapter_id, section_num, title in toc_sections:
+            if chapter_id in self.chapter_by_id:
+                self.automaton.add(self.normalize(title), ('toc', chapter_id, section_num))
+        for priority, (keyword, chapter_id) in enumerate(keyword_chapter.items()):
+            if chapter_id in self.chapter_by_id:
+                self.automaton.add(keyword, ('keyword', chapter_id, priority))
+        self.automaton.build()
+    
+    @staticmethod
+    def normalize(title: str) -> str:
+        """去掉空白和目录引导符，便于目录标题与正文标题对齐"""
+        return re.sub(r'[\s.．…·]+', '', title)
+    
+    def resolve(self, section_title: str, section_num: Optional[int] = None,
+                fallback: Optional[Dict] = None) -> Optional[Dict]:
+        """解析小节所属章节，无法确定时返回 fallback（通常为上一小节所在章节）"""
+        toc_hits = []
+        keyword_hits = []
+        for word, (source, chapter_id, extra) in self.automaton.find_all(self.normalize(section_title)):
+            if source == 'toc':
+                toc_hits.append((len(word), extra == section_num, chapter_id))
+            else:
+                keyword_hits.append((extra, word, chapter_id))
+        
+        if toc_hits:
+            best = max(toc_hits)
+            candidates = {chapter_id for length, same_num, chapter_id in toc_hits
+                          if (length, same_num) == best[:2]}
+            if len(candidates) > 1:
+                self._report('ambiguous', section_title, sorted(candidates), best[2])
+            return self.chapter_by_id[best[2]]
+        
+        if keyword_hits:
+            keyword_hits.sort()
+            candidates = sorted({chapter_id for _, _, chapter_id in keyword_hits}, key=int)
+            chosen = keyword_hits[0][2]
+            if len(candidates) > 1:
+                self._report('ambiguous', section_title, candidates, chosen,
+                             keywords=[word for _, word, _ in keyword_hits])
+            return self.chapter_by_id[chosen]
+        
+        self._report('missing', section_title, [], fallback['id'] if fallback else None)
+        return fallback
+    
+    def _report(self, kind: str, section_title: str, candidates: List[str],
+                chosen: Optional[str], **extra):
+        self.issues.append(dict(kind=kind, section=section_title,
+                                candidates=candidates, chosen=chosen, **extra))
+    
+    def print_report(self):
+        """打印歧义/未匹配小节"""
+        if not self.issues:
+            print("小节归属：全部唯一匹配")
+            return
+        print(f"小节归属问题 {len(self.issues)} 个:")
+        for issue in self.issues:
+            label = '⚠️ 歧义' if issue['kind'] == 'ambiguous' else '❌ 未匹配'
+            print(f"  {label}: {issue['section']} 候选={issue['candidates']} 采用={issue['chosen']}")
+
+
 class KnowledgeExtractorV2:
     """知识点提取器V2"""
     
     def __init__(self):
         self.chapters = []
+        self.toc_sections = []  # 目录中的小节 (章节id, 节号, 标题)
+        self.section_resolver = None
         self.all_text_by_page = {}
         
         # 正则模式
         self.patterns = {
             'chapter': re.compile(r'第([一二三四五六七八九十]+)章\s*(.+?)(?:\s*//|$)'),
+            'toc_section': re.compile(r'第([一二三四五六七八九十]+)节\s*(.+?)[\s.．…]*\d{3}'),
             'section': re.compile(r'第([一二三四五六七八九十]+)节\s*(.+?)(?:\s*\d+|$)'),
             'point': re.compile(r'考点(\d+)\s*(.+)'),
             'drug_eval': re.compile(r'(.+?)的临床用药评价'),
@@ -68,13 +196,23 @@ class KnowledgeExtractorV2:
             4: ['禁忌', '禁用', '严重', '致死', '特别注意', '相互作用'],
             3: ['常用', '主要', '重要'],
         }
+        self._build_point_classifier()
         
-        # 中文数字映射
-        self.cn_num = {
-            '一': 1, '二': 2, '三': 3, '四': 4, '五': 5,
-            '六': 6, '七': 7, '八': 8, '九': 9, '十': 10,
-            '十一': 11, '十二': 12, '十三': 13, '十四': 14, '十五': 15,
-            '十六': 16, '十七': 17, '十八': 18, '十九': 19, '二十': 20
+        # 小节标题关键词 -> 章节id（目录未覆盖时使用）
+        self.section_keywords = {
+            '解热': '2', '镇痛': '2', '抗炎': '2', '抗风湿': '2', '抗痛风': '2',
+            '镇咳': '3', '祛痰': '3', '平喘': '3', '呼吸': '3', '肺纤维化': '3',
+            '抑酸': '4', '胃': '4', '肠': '4', '消化': '4', '肝胆': '4', '止吐': '4',
+            '心律': '5', '高血压': '5', '血脂': '5', '心绞痛': '5', '心力衰竭': '5',
+            '血栓': '6', '出血': '6', '贫血': '6', '白细胞': '6', '骨髓': '6',
+            '利尿': '7', '前列腺': '7', '勃起': '7', '膀胱': '7',
+            '垂体': '8', '糖皮质': '8', '甲状腺': '8', '胰岛素': '8', '血糖': '8', '骨代谢': '8', '性激素': '8',
+            '抗菌': '9', '青霉素': '9', '头孢': '9', '抗感染': '9', '抗病毒': '9', '抗真菌': '9',
+            '抗肿瘤': '10', 'DNA': '10', '抗代谢': '10',
+            '电解质': '11', '营养': '11', '维生素': '11',
+            '眼科': '12', '耳鼻': '12', '口腔': '12',
+            '皮肤': '13', '抗过敏': '13',
+            '镇静': '1', '催眠': '1', '中枢': '1', '精神': '1',
         }
     
     def extract_from_json(self, json_path: str) -> Dict:
@@ -87,9 +225,12 @@ class KnowledgeExtractorV2:
         
         # 2. 解析目录结构（从前几页）
         self._parse_toc()
+        self.section_resolver = SectionChapterResolver(
+            self.chapters, self.toc_sections, self.section_keywords)
         
         # 3. 解析正文内容
         self._parse_content()
+        self.section_resolver.print_report()
         
         # 4. 构建知识树
         return self._build_tree()
@@ -135,10 +276,12 @@ class KnowledgeExtractorV2:
                 toc_text += item['text'] + "\n"
         
         # 提取章节
+        chapter_starts = []
         for match in self.patterns['chapter'].finditer(toc_text):
             cn_num = match.group(1)
             title = match.group(2).strip()
-            chapter_id = str(self.cn_num.get(cn_num, len(self.chapters) + 1))
+            chapter_id = str(cn_to_num(cn_num, default=len(self.chapters) + 1))
+            chapter_starts.append((match.start(), chapter_id))
             
             # 避免重复
             if not any(c['id'] == chapter_id for c in self.chapters):
@@ -148,7 +291,18 @@ class KnowledgeExtractorV2:
                     'sections': []
                 })
         
-        print(f"从目录解析到 {len(self.chapters)} 个章节")
+        # 提取小节，归属到其前最近的章
+        for match in self.patterns['toc_section'].finditer(toc_text):
+            owner = None
+            for start, chapter_id in chapter_starts:
+                if start > match.start():
+                    break
+                owner = chapter_id
+            if owner:
+                self.toc_sections.append(
+                    (owner, cn_to_num(match.group(1)), match.group(2).strip()))
+        
+        print(f"从目录解析到 {len(self.chapters)} 个章节, {len(self.toc_sections)} 个小节")
     
     def _parse_content(self):
         """解析正文内容"""
@@ -173,10 +327,11 @@ class KnowledgeExtractorV2:
                     
                     cn_num = section_match.group(1)
                     section_title = section_match.group(2).strip()
-                    section_num = self.cn_num.get(cn_num, 1)
+                    section_num = cn_to_num(cn_num, default=1)
                     
                     # 确定所属章节
-                    current_chapter = self._find_chapter_for_section(section_title)
+                    current_chapter = self._find_chapter_for_section(
+                        section_title, section_num, current_chapter)
                     if current_chapter:
                         section_id = f"{current_chapter['id']}.{section_num}"
                         current_section = {
@@ -232,53 +387,65 @@ class KnowledgeExtractorV2:
             current_point['content'] = '\n'.join(content_buffer)
             self._classify_point(current_point)
     
-    def _find_chapter_for_section(self, section_title: str) -> Optional[Dict]:
+    def _find_chapter_for_section(self, section_title: str, section_num: Optional[int] = None,
+                                  fallback: Optional[Dict] = None) -> Optional[Dict]:
         """根据小节标题找到所属章节"""
-        # 关键词映射
-        keyword_chapter = {
-            '解热': '2', '镇痛': '2', '抗炎': '2', '抗风湿': '2', '抗痛风': '2',
-            '镇咳': '3', '祛痰': '3', '平喘': '3', '呼吸': '3', '肺纤维化': '3',
-            '抑酸': '4', '胃': '4', '肠': '4', '消化': '4', '肝胆': '4', '止吐': '4',
-            '心律': '5', '高血压': '5', '血脂': '5', '心绞痛': '5', '心力衰竭': '5',
-            '血栓': '6', '出血': '6', '贫血': '6', '白细胞': '6', '骨髓': '6',
-            '利尿': '7', '前列腺': '7', '勃起': '7', '膀胱': '7',
-            '垂体': '8', '糖皮质': '8', '甲状腺': '8', '胰岛素': '8', '血糖': '8', '骨代谢': '8', '性激素': '8',
-            '抗菌': '9', '青霉素': '9', '头孢': '9', '抗感染': '9', '抗病毒': '9', '抗真菌': '9',
-            '抗肿瘤': '10', 'DNA': '10', '抗代谢': '10',
-            '电解质': '11', '营养': '11', '维生素': '11',
-            '眼科': '12', '耳鼻': '12', '口腔': '12',
-            '皮肤': '13', '抗过敏': '13',
-            '镇静': '1', '催眠': '1', '中枢': '1', '精神': '1',
-        }
+        if self.section_resolver is None:
+            self.section_resolver = SectionChapterResolver(
+                self.chapters, self.toc_sections, self.section_keywords)
+        return self.section_resolver.resolve(section_title, section_num, fallback)
+    
+    def _build_point_classifier(self):
+        """把类型关键词与重要性关键词编译为一个交替正则
+        
+        关键词按长度降序放入零宽前瞻，任一位置都能命中从该处开始的最长关键词；
+        从同一位置开始的更短关键词必是其前缀，因此预先把前缀的类型/重要性折叠进表中，
+        扫描一遍即可得到与逐条匹配相同的结果。
+        """
+        type_rank = {ptype: rank for rank, ptype in enumerate(self.type_patterns)}
+        attrs: Dict[str, Tuple[Optional[str], int]] = {}
+        for ptype, keywords in self.type_patterns.items():
+            for keyword in keywords:
+                attrs[keyword] = (ptype, 0)
+        for level, keywords in self.importance_keywords.items():
+            for keyword in keywords:
+                ptype, importance = attrs.get(keyword, (None, 0))
+                attrs[keyword] = (ptype, max(importance, level))
         
-        for keyword, chapter_id in keyword_chapter.items():
-            if keyword in section_title:
-                for chapter in self.chapters:
-                    if chapter['id'] == chapter_id:
-                        return chapter
+        self._point_keyword_info: Dict[str, Tuple[int, int]] = {}
+        no_type = len(type_rank)
+        for keyword in attrs:
+            rank, importance = no_type, 0
+            for prefix, (ptype, level) in attrs.items():
+                if keyword.startswith(prefix):
+                    if ptype is not None:
+                        rank = min(rank, type_rank[ptype])
+                    importance = max(importance, level)
+            self._point_keyword_info[keyword] = (rank, importance)
         
-        # 默认返回最后一个章节
-        return self.chapters[-1] if self.chapters else None
+        self._point_types = list(self.type_patterns)
+        alternation = '|'.join(re.escape(k) for k in sorted(attrs, key=len, reverse=True))
+        # 先用首字符集合快速跳过不可能命中的位置
+        first_chars = ''.join(sorted({re.escape(k[0]) for k in attrs}))
+        self._point_keyword_regex = re.compile(f'(?=[{first_chars}])(?=({alternation}))')
     
     def _classify_point(self, point: Dict):
-        """分类知识点类型"""
-        content = point.get('content', '') + point.get('title', '')
+        """分类知识点类型并计算重要性（标题与内容各扫描一次）"""
+        no_type = len(self._point_types)
+        rank, importance = no_type, point['importance']
+        info = self._point_keyword_info
         
-        # 检测类型
-        for ptype, patterns in self.type_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, content):
-                    point['point_type'] = ptype
-                    break
-            if point['point_type']:
-                break
+        for text in (point.get('content', ''), point.get('title', '')):
+            for match in self._point_keyword_regex.finditer(text):
+                kw_rank, kw_importance = info[match.group(1)]
+                if kw_rank < rank:
+                    rank = kw_rank
+                if kw_importance > importance:
+                    importance = kw_importance
         
-        # 计算重要性
-        for level, keywords in self.importance_keywords.items():
-            for keyword in keywords:
-                if keyword in content:
-                    point['importance'] = max(point['importance'], level)
-                    break
+        if rank < no_type and not point['point_type']:
+            point['point_type'] = self._point_types[rank]
+        point['importance'] = importance
     
     def _build_tree(self) -> Dict:
         """构建知识树"""
@@ -6,18 +6,25 @@
 
 使用方法：
 python extract_markdown_knowledge.py
+python extract_markdown_knowledge.py --benchmark   # 结构解析基准测试（原文件与100倍合成文件）
 
 输入：西药药二-药理学树状复习笔记.md
 输出：shuju/西药药二_知识点_from_markdown.json
 """
 
+import contextlib
+import io
 import json
 import re
+import sys
+import time
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field, asdict
 from pathlib import Path
 from enum import Enum
 
+from cn_numerals import cn_to_num
+
 
 class PointType(Enum):
     """知识点类型"""
@@ -119,8 +126,14 @@ class MarkdownKnowledgeExtractor:
             'adverse_severe': re.compile(r'[🔴]\s*严重'),
             'adverse_moderate': re.compile(r'[🟡]\s*中度'),
             'adverse_mild': re.compile(r'[🟢]\s*轻度'),
+            # 内容类型/不良反应分级的预筛：不含这些标记的行跳过对应检测
+            'content_hint': re.compile(r'作用机制|药动学|不良反应|禁忌|相互作用|[🔴🟡🟢]'),
         }
         
+        # 行首字符 -> 行类别（只有对应类别的行才会运行相应的匹配器）
+        self.line_kind_by_prefix = {'#': 'heading', '>': 'quote', '|': 'table'}
+        self.list_prefixes = ('- ', '• ', '├', '└', '│')
+        
         # 已知药物名称列表（用于精确匹配）
         self.known_drugs = [
             # 镇静催眠药
@@ -168,13 +181,6 @@ class MarkdownKnowledgeExtractor:
             '乳果糖', '聚乙二醇', '比沙可啶', '洛哌丁胺', '蒙脱石散',
         ]
         
-        # 中文数字映射
-        self.cn_num_map = {
-            '一': 1, '二': 2, '三': 3, '四': 4, '五': 5,
-            '六': 6, '七': 7, '八': 8, '九': 9, '十': 10,
-            '十一': 11, '十二': 12, '十三': 13, '十四': 14, '十五': 15
-        }
-        
         # 知识点类型关键词
         self.type_keywords = {
             PointType.MECHANISM: ['作用机制', '机制', '原理', '通过'],
@@ -196,7 +202,7 @@ class MarkdownKnowledgeExtractor:
     
     def cn_to_num(self, cn: str) -> int:
         """中文数字转阿拉伯数字"""
-        return self.cn_num_map.get(cn, 1)
+        return cn_to_num(cn, default=1)
     
     def count_stars(self, text: str) -> int:
         """计算星级数量"""
@@ -226,6 +232,22 @@ class MarkdownKnowledgeExtractor:
                     return ptype.value
         return PointType.OTHER.value
     
+    def classify_line(self, line: str) -> str:
+        """按行首字符给行分类：fence/heading/quote/table/list/blank/text"""
+        if not line:
+            return 'blank'
+        if line.startswith('```'):
+            return 'fence'
+        kind = self.line_kind_by_prefix.get(line[0])
+        if kind:
+            return kind
+        stripped = line.lstrip()
+        if not stripped:
+            return 'blank'
+        if stripped.startswith(self.list_prefixes):
+            return 'list'
+        return 'text'
+    
     def extract_from_markdown(self, md_path: str) -> Dict:
         """从Markdown文件提取知识点"""
         print(f"正在读取 {md_path}...")
@@ -256,12 +278,12 @@ class MarkdownKnowledgeExtractor:
         current_content_type = ""
         adverse_level = ""
         
-        i = 0
-        while i < len(lines):
-            line = lines[i].rstrip()
+        for raw_line in lines:
+            line = raw_line.rstrip()
+            kind = self.classify_line(line)
             
             # 处理代码块
-            if self.patterns['code_block'].match(line):
+            if kind == 'fence':
                 in_code_block = not in_code_block
                 if in_code_block:
                     content_buffer.append(line)
@@ -272,113 +294,111 @@ class MarkdownKnowledgeExtractor:
                         self._save_content(current_drug_info, current_content_type, 
                                           '\n'.join(content_buffer))
                     content_buffer = []
-                i += 1
                 continue
             
             if in_code_block:
                 content_buffer.append(line)
-                i += 1
                 continue
             
-            # 检测章节标题
-            chapter_match = self.patterns['chapter'].match(line)
-            if chapter_match:
-                cn_num = chapter_match.group(1)
-                title = chapter_match.group(2).strip()
-                chapter_id = str(self.cn_to_num(cn_num))
-                
-                current_chapter = Chapter(id=chapter_id, title=title)
-                self.chapters.append(current_chapter)
-                current_section = None
-                current_drug = None
-                print(f"  章节: 第{chapter_id}章 {title}")
-                i += 1
-                continue
-            
-            # 检测小节标题
-            section_match = self.patterns['section'].match(line)
-            if section_match and current_chapter:
-                cn_num = section_match.group(1)
-                title = section_match.group(2).strip()
-                section_num = self.cn_to_num(cn_num)
-                section_id = f"{current_chapter.id}.{section_num}"
-                
-                current_section = Section(id=section_id, title=title)
-                current_chapter.sections.append(current_section)
-                current_drug = None
-                print(f"    小节: {section_id} {title}")
-                i += 1
-                continue
-            
-            # 检测药物标题
-            drug_match = self.patterns['drug'].match(line)
-            if drug_match and current_section:
-                drug_name = drug_match.group(1).strip()
-                # 清理药物名称中的emoji和特殊字符
-                drug_name = re.sub(r'[🔸🔹💊🔬📊⚠️🚫📝📌]', '', drug_name).strip()
-                # 清理序号前缀（如 "一、"、"1. "、"二、" 等）
-                drug_name = re.sub(r'^[一二三四五六七八九十\d]+[、.．]\s*', '', drug_name).strip()
-                # 清理其他常见前缀
-                drug_name = re.sub(r'^(代表药物详解|作用机制分类|作用机制|药物分类|药物对比)\s*', '', drug_name).strip()
-                
-                if drug_name and len(drug_name) > 1:
-                    stars = drug_match.group(2) if drug_match.group(2) else ""
-                    freq_tag = drug_match.group(3) if drug_match.group(3) else ""
+            if kind == 'heading':
+                # 检测章节标题
+                chapter_match = self.patterns['chapter'].match(line)
+                if chapter_match:
+                    cn_num = chapter_match.group(1)
+                    title = chapter_match.group(2).strip()
+                    chapter_id = str(self.cn_to_num(cn_num))
                     
-                    importance = self.count_stars(stars) if stars else 3
+                    current_chapter = Chapter(id=chapter_id, title=title)
+                    self.chapters.append(current_chapter)
+                    current_section = None
+                    current_drug = None
+                    print(f"  章节: 第{chapter_id}章 {title}")
+                    continue
+                
+                # 检测小节标题
+                section_match = self.patterns['section'].match(line)
+                if section_match and current_chapter:
+                    cn_num = section_match.group(1)
+                    title = section_match.group(2).strip()
+                    section_num = self.cn_to_num(cn_num)
+                    section_id = f"{current_chapter.id}.{section_num}"
                     
-                    current_drug = drug_name
-                    current_drug_info = DrugInfo(
-                        name=drug_name,
-                        category=current_section.title if current_section else "",
-                        importance=importance
-                    )
-                    self.drugs[drug_name] = current_drug_info
+                    current_section = Section(id=section_id, title=title)
+                    current_chapter.sections.append(current_section)
+                    current_drug = None
+                    print(f"    小节: {section_id} {title}")
+                    continue
+                
+                # 检测药物标题
+                drug_match = self.patterns['drug'].match(line)
+                if drug_match and current_section:
+                    drug_name = drug_match.group(1).strip()
+                    # 清理药物名称中的emoji和特殊字符
+                    drug_name = re.sub(r'[🔸🔹💊🔬📊⚠️🚫📝📌]', '', drug_name).strip()
+                    # 清理序号前缀（如 "一、"、"1. "、"二、" 等）
+                    drug_name = re.sub(r'^[一二三四五六七八九十\d]+[、.．]\s*', '', drug_name).strip()
+                    # 清理其他常见前缀
+                    drug_name = re.sub(r'^(代表药物详解|作用机制分类|作用机制|药物分类|药物对比)\s*', '', drug_name).strip()
                     
-                    # 创建知识点
-                    self._create_drug_point(current_chapter, current_section, 
-                                           drug_name, importance, freq_tag)
-                i += 1
-                continue
-            
-            # 检测内容类型标记
-            if '作用机制' in line or '🔬 作用机制' in line:
-                current_content_type = "mechanism"
-            elif '药动学' in line or '📊 药动学' in line:
-                current_content_type = "pharmacokinetics"
-            elif '不良反应' in line or '⚠️ 不良反应' in line:
-                current_content_type = "adverse"
-            elif '禁忌' in line or '🚫 禁忌' in line:
-                current_content_type = "contraindication"
-            elif '相互作用' in line:
-                current_content_type = "interaction"
+                    if drug_name and len(drug_name) > 1:
+                        stars = drug_match.group(2) if drug_match.group(2) else ""
+                        freq_tag = drug_match.group(3) if drug_match.group(3) else ""
+                        
+                        importance = self.count_stars(stars) if stars else 3
+                        
+                        current_drug = drug_name
+                        current_drug_info = DrugInfo(
+                            name=drug_name,
+                            category=current_section.title if current_section else "",
+                            importance=importance
+                        )
+                        self.drugs[drug_name] = current_drug_info
+                        
+                        # 创建知识点
+                        self._create_drug_point(current_chapter, current_section, 
+                                               drug_name, importance, freq_tag)
+                    continue
             
-            # 检测不良反应严重程度
-            if self.patterns['adverse_severe'].search(line):
-                adverse_level = "severe"
-            elif self.patterns['adverse_moderate'].search(line):
-                adverse_level = "moderate"
-            elif self.patterns['adverse_mild'].search(line):
-                adverse_level = "mild"
+            if self.patterns['content_hint'].search(line):
+                # 检测内容类型标记
+                if '作用机制' in line:
+                    current_content_type = "mechanism"
+                elif '药动学' in line:
+                    current_content_type = "pharmacokinetics"
+                elif '不良反应' in line:
+                    current_content_type = "adverse"
+                elif '禁忌' in line:
+                    current_content_type = "contraindication"
+                elif '相互作用' in line:
+                    current_content_type = "interaction"
+                
+                # 检测不良反应严重程度
+                if self.patterns['adverse_severe'].search(line):
+                    adverse_level = "severe"
+                elif self.patterns['adverse_moderate'].search(line):
+                    adverse_level = "moderate"
+                elif self.patterns['adverse_mild'].search(line):
+                    adverse_level = "mild"
             
             # 检测记忆口诀
-            memory_match = self.patterns['memory_tip'].match(line)
-            if memory_match and current_drug_info:
-                tip = memory_match.group(1).strip()
-                current_drug_info.memory_tips.append(tip)
-                
-                # 为当前药物创建记忆口诀知识点
-                if current_section:
-                    self._create_memory_point(current_chapter, current_section,
-                                             current_drug, tip)
+            if kind == 'quote':
+                memory_match = self.patterns['memory_tip'].match(line)
+                if memory_match and current_drug_info:
+                    tip = memory_match.group(1).strip()
+                    current_drug_info.memory_tips.append(tip)
+                    
+                    # 为当前药物创建记忆口诀知识点
+                    if current_section:
+                        self._create_memory_point(current_chapter, current_section,
+                                                 current_drug, tip)
             
             # 检测表格
-            if self.patterns['table_row'].match(line):
+            if kind == 'table' and self.patterns['table_row'].match(line):
                 if not in_table:
                     in_table = True
                     table_data = []
                 table_data.append(line)
-            elif in_table and line.strip() == '':
+            elif in_table and kind == 'blank':
                 # 表格结束，处理表格数据
                 if current_section and table_data:
                     self._process_table(current_chapter, current_section, 
@@ -387,7 +407,7 @@ class MarkdownKnowledgeExtractor:
                 table_data = []
             
             # 收集列表项内容
-            if line.strip().startswith(('- ', '• ', '├', '└', '│')):
+            if kind == 'list':
                 item = re.sub(r'^[\s\-•├└│─]+', '', line).strip()
                 if item and current_drug_info:
                     if current_content_type == "adverse" and adverse_level:
@@ -400,8 +420,6 @@ class MarkdownKnowledgeExtractor:
                         current_drug_info.interactions.append(item)
                     elif current_content_type == "pharmacokinetics":
                         current_drug_info.pharmacokinetics.append(item)
-            
-            i += 1
         
         print(f"\n提取完成: {len(self.drugs)} 个药物, {len(self.knowledge_points)} 个知识点")
     
@@ -754,6 +772,25 @@ ON CONFLICT (id) DO UPDATE SET title = EXCLUDED.title, content = EXCLUDED.conten
                 print(f"      口诀: {info['memory_tips'][0][:30]}...")
 
 
+def run_benchmark(md_path: str, multipliers: Tuple[int, ...] = (1, 100), repeat: int = 5):
+    """基准测试：_parse_structure 在原文件及其N倍合成版本上的耗时（取最优值）"""
+    with open(md_path, 'r', encoding='utf-8') as f:
+        lines = f.read().split('\n')
+    
+    print(f"📏 基准测试: {md_path}")
+    for multiplier in multipliers:
+        synthetic = lines * multiplier
+        best = float('inf')
+        for _ in range(repeat):
+            extractor = MarkdownKnowledgeExtractor()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                extractor._parse_structure(synthetic)
+            best = min(best, time.perf_counter() - start)
+        print(f"  - {multiplier}×（{len(synthetic)} 行）: {best * 1000:.1f} ms，"
+              f"{len(synthetic) / best:,.0f} 行/秒")
+
+
 def main():
     """主函数"""
     # 输入输出路径
@@ -767,6 +804,10 @@ def main():
         print(f"错误: 找不到输入文件 {input_path}")
         return
     
+    if '--benchmark' in sys.argv:
+        run_benchmark(input_path)
+        return
+    
     # 创建提取器
     extractor = MarkdownKnowledgeExtractor()
     
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+考点内容模块提取工具
+====================
+解析 shuju/执业药师西药二考点/ 下的 c{章}.{节}.{考点}*.txt 文件，
+每个文件分为三个阶段（第一/二/三阶段），阶段内由
+【考点 c1.1.1｜M02｜本页定位】 这样的标记分隔为 M02-M06 模块。
+
+  - 多进程并行解析，输出 (考点 code, 阶段, 模块, 标题, 正文) 记录；
+  - 按内容哈希缓存：文件大小与修改时间不变时直接跳过，变化时再比对 SHA256，
+    内容未变的文件不重新解析、不进入导入文件；
+  - 缓存分两层：生成载荷后只记为"待确认"，执行导入后运行 --applied 才记为已同步；
+    未确认前重复运行仍以上次已同步的状态为基准，载荷不会因重跑而丢失变化；
+  - 生成一个 COPY 载荷，写入 knowledge_point_content_files / knowledge_point_content_blocks
+    （migrations/010-point-content-blocks.sql），只包含新增、变化和已删除的考点。
+
+使用方法：
+  python extract_point_blocks.py
+  python extract_point_blocks.py --full                  # 忽略缓存，全部重新生成
+  psql "$DATABASE_URL" -f shuju/考点内容模块_导入.sql
+  python extract_point_blocks.py --applied               # 导入成功后确认，更新已同步状态
+
+输出：shuju/考点内容模块_导入.sql，缓存 shuju/考点内容模块_cache.json
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, TextIO, Tuple
+
+from pg_copy import copy_text
+
+
+# 解析规则变化时递增，使缓存失效并写入 parsed_version
+PARSER_VERSION = 1
+
+DEFAULT_POINT_DIR = 'shuju/执业药师西药二考点'
+DEFAULT_OUTPUT = 'shuju/考点内容模块_导入.sql'
+DEFAULT_CACHE = 'shuju/考点内容模块_cache.json'
+BLOCK_SOURCE = 'file'
+
+# 少量文件时串行处理，避免进程池启动开销
+MIN_PARALLEL_FILES = 32
+
+CODE_PATTERN = re.compile(r'^([cC]\d+\.\d+\.\d+)')
+STAGE_PATTERN = re.compile(r'^\s*第([一二三123])阶段(?:[：:\s]|$)')
+MODULE_PATTERN = re.compile(r'【考点\s*([^｜|]+)[｜|]\s*([Mm]0[2-6])\s*[｜|]\s*([^】]+)】')
+STAGE_IDS = {'一': 'stage1', '1': 'stage1', '二': 'stage2', '2': 'stage2', '三': 'stage3', '3': 'stage3'}
+
+
+@dataclass
+class PointBlock:
+    """考点文件中的一个模块"""
+    code: str
+    stage: str
+    module: str
+    title: str
+    content: str
+
+
+def code_from_filename(filename: str) -> Optional[str]:
+    """c5.1.1药物分类.txt -> C5.1.1"""
+    match = CODE_PATTERN.match(filename)
+    return match.group(1).upper() if match else None
+
+
+def parse_point_text(text: str, code: str) -> Tuple[List[PointBlock], List[str]]:
+    """按阶段与模块标记拆分文件内容，返回 (模块列表, 问题列表)
+
+    模块正文保持原样（含空行），只去掉首尾空行；阶段标题与第一个模块之间的引导语不计入模块。
+    """
+    blocks: Dict[Tuple[str, str], PointBlock] = {}
+    issues = []
+    stage = None
+    current: Optional[PointBlock] = None
+    lines: List[str] = []
+
+    def close_module():
+        if current is not None:
+            current.content = '\n'.join(lines).strip('\n')
+            key = (current.stage, current.module)
+            if key in blocks:
+                issues.append(f"{current.stage}/{current.module} 重复，保留后一个")
+            blocks[key] = current
+
+    for line in text.replace('\r\n', '\n').replace('\r', '\n').split('\n'):
+        stage_match = STAGE_PATTERN.match(line)
+        if stage_match:
+            close_module()
+            current, lines = None, []
+            stage = STAGE_IDS[stage_match.group(1)]
+            continue
+
+        module_match = MODULE_PATTERN.search(line)
+        if module_match:
+            close_module()
+            lines = []
+            header_code = module_match.group(1).strip().upper()
+            if header_code != code:
+                issues.append(f"模块标记中的考点 {header_code} 与文件名 {code} 不一致")
+            if stage is None:
+                issues.append(f"{module_match.group(2)} 出现在任何阶段之前，已跳过")
+                current = None
+                continue
+            current = PointBlock(code, stage, module_match.group(2).upper(), module_match.group(3).strip(), '')
+            continue
+
+        if current is not None:
+            lines.append(line)
+
+    close_module()
+
+    if stage is None:
+        issues.append('未找到阶段标题')
+    elif not blocks:
+        issues.append('未找到模块')
+    return list(blocks.values()), list(dict.fromkeys(issues))
+
+
+def file_signature(path: str) -> Dict:
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def parse_point_file(path: str) -> Dict:
+    """读取并解析单个考点文件（在子进程中执行）"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    text = data.decode('utf-8-sig')
+    filename = os.path.basename(path)
+    code = code_from_filename(filename)
+    blocks, issues = parse_point_text(text, code) if code else ([], ['文件名中没有考点 code'])
+    return {
+        'file_name': filename,
+        'code': code,
+        'sha256': hashlib.sha256(data).hexdigest(),
+        'raw_content': text,
+        'blocks': [asdict(block) for block in blocks],
+        'issues': issues,
+        **file_signature(path),
+    }
+
+
+def load_cache(path: str) -> Tuple[Dict[str, Dict], Optional[Dict[str, Dict]]]:
+    """返回 (已导入数据库的文件状态, 已生成载荷但尚未确认导入的文件状态)"""
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('parser_version') == PARSER_VERSION:
+            return cache.get('files', {}), cache.get('pending')
+    return {}, None
+
+
+def save_cache(path: str, applied: Dict[str, Dict], pending: Optional[Dict[str, Dict]]):
+    def strip(files):
+        return {name: {k: v for k, v in entry.items() if k != 'raw_content'}
+                for name, entry in sorted(files.items())}
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'parser_version': PARSER_VERSION, 'files': strip(applied),
+                   'pending': strip(pending) if pending is not None else None}, f, ensure_ascii=False)
+
+
+def confirm_applied(path: str) -> Optional[int]:
+    """载荷导入成功后调用：待确认状态转为已同步，返回文件数（没有待确认时返回 None）"""
+    applied, pending = load_cache(path)
+    if pending is None:
+        return None
+    save_cache(path, pending, None)
+    return len(pending)
+
+
+def scan_changes(point_dir: str, cache: Dict[str, Dict]) -> Tuple[List[str], Dict[str, Dict], List[str]]:
+    """比对缓存：返回 (需要重新读取的文件, 大小与修改时间未变的缓存记录, 已删除的文件名)"""
+    paths = sorted(glob.glob(os.path.join(point_dir, '*.txt')))
+    to_read = []
+    unchanged = {}
+    for path in paths:
+        name = os.path.basename(path)
+        entry = cache.get(name)
+        if entry and all(entry.get(k) == v for k, v in file_signature(path).items()):
+            unchanged[name] = entry
+        else:
+            to_read.append(path)
+    present = {os.path.basename(p) for p in paths}
+    removed = sorted(name for name in cache if name not in present)
+    return to_read, unchanged, removed
+
+
+def parse_files(paths: List[str], workers: int) -> List[Dict]:
+    if len(paths) < MIN_PARALLEL_FILES or workers <= 1:
+        return [parse_point_file(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(parse_point_file, paths, chunksize=8))
+
+
+FILE_COLUMNS = ['code', 'file_name', 'file_hash', 'raw_content']
+BLOCK_COLUMNS = ['code', 'stage', 'module', 'title', 'content', 'file_name', 'file_hash']
+
+
+def write_copy(out: TextIO, table: str, columns: List[str], rows: List[List]):
+    out.write(f"COPY {table} ({', '.join(columns)}) FROM stdin;\n")
+    for row in rows:
+        out.write('\t'.join(copy_text(v) for v in row))
+        out.write('\n')
+    out.write("\\.\n\n")
+
+
+def write_payload(output_path: str, changed: List[Dict], removed_codes: List[str]):
+    """变化的考点整体替换（先删后插），已删除文件对应的考点一并清理"""
+    file_rows = [[e['code'], e['file_name'], e['sha256'], e['raw_content']] for e in changed]
+    block_rows = [[b['code'], b['stage'], b['module'], b['title'], b['content'], e['file_name'], e['sha256']]
+                  for e in changed for b in e['blocks']]
+
+    with open(output_path, 'w', encoding='utf-8') as out:
+        out.write("-- 考点内容模块导入 - 由 extract_point_blocks.py 生成\n")
+        out.write(f"-- 变化考点 {len(file_rows)} 个，模块 {len(block_rows)} 个，删除考点 {len(removed_codes)} 个\n\n")
+        out.write("BEGIN;\n\n")
+        out.write("CREATE TEMP TABLE point_files_import "
+                  "(code TEXT, file_name TEXT, file_hash TEXT, raw_content TEXT) ON COMMIT DROP;\n")
+        out.write("CREATE TEMP TABLE point_blocks_import "
+                  "(code TEXT, stage TEXT, module TEXT, title TEXT, content TEXT, "
+                  "file_name TEXT, file_hash TEXT) ON COMMIT DROP;\n\n")
+        write_copy(out, 'point_files_import', FILE_COLUMNS, file_rows)
+        write_copy(out, 'point_blocks_import', BLOCK_COLUMNS, block_rows)
+
+        out.write("INSERT INTO knowledge_point_content_files (code, file_name, file_hash, raw_content, updated_at)\n"
+                  "SELECT code, file_name, file_hash, raw_content, now() FROM point_files_import\n"
+                  "ON CONFLICT (code) DO UPDATE SET\n"
+                  "  file_name = EXCLUDED.file_name,\n"
+                  "  file_hash = EXCLUDED.file_hash,\n"
+                  "  raw_content = EXCLUDED.raw_content,\n"
+                  "  updated_at = now();\n\n")
+        out.write(f"DELETE FROM knowledge_point_content_blocks b USING point_files_import f\n"
+                  f"WHERE b.code = f.code AND b.source = '{BLOCK_SOURCE}';\n\n")
+        out.write("INSERT INTO knowledge_point_content_blocks\n"
+                  "  (code, stage, module, title, content, source, file_name, file_hash, parsed_version, updated_at)\n"
+                  f"SELECT code, stage, module, title, content, '{BLOCK_SOURCE}', file_name, file_hash, "
+                  f"{PARSER_VERSION}, now()\n"
+                  "FROM point_blocks_import;\n\n")
+
+        if removed_codes:
+            codes = ', '.join("'" + code + "'" for code in removed_codes)
+            out.write(f"DELETE FROM knowledge_point_content_blocks "
+                      f"WHERE source = '{BLOCK_SOURCE}' AND code IN ({codes});\n")
+            out.write(f"DELETE FROM knowledge_point_content_files WHERE code IN ({codes});\n\n")
+
+        out.write("COMMIT;\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='考点文件模块解析（并行 + 内容哈希增量）')
+    parser.add_argument('--dir', default=DEFAULT_POINT_DIR, help='考点文件目录')
+    parser.add_argument('--output', '-o', default=DEFAULT_OUTPUT, help='输出 COPY 载荷文件')
+    parser.add_argument('--cache', default=DEFAULT_CACHE, help='哈希缓存文件')
+    parser.add_argument('--full', action='store_true', help='忽略缓存，全部重新解析并导出')
+    parser.add_argument('--applied', action='store_true', help='确认上次生成的载荷已导入，更新已同步状态')
+    parser.add_argument('--workers', '-w', type=int, default=os.cpu_count() or 1, help='并行进程数')
+
+    args = parser.parse_args()
+
+    print("=== 考点内容模块提取 ===\n")
+
+    if not os.path.isdir(args.dir):
+        print(f"❌ 目录不存在：{args.dir}")
+        return
+
+    if args.applied:
+        confirmed = confirm_applied(args.cache)
+        if confirmed is None:
+            print("⚠️ 没有待确认的载荷（先生成并导入 COPY 载荷）")
+        else:
+            print(f"✅ 已确认导入，{confirmed} 个考点文件记为已同步")
+        return
+
+    started = time.time()
+    applied, _ = load_cache(args.cache)
+    # 变化检测始终以已确认导入的状态为基准，未确认的载荷重跑时会再次包含
+    cache = {} if args.full else applied
+    to_read, unchanged, removed = scan_changes(args.dir, cache)
+    parsed = parse_files(to_read, args.workers)
+
+    changed = []
+    files = dict(unchanged)
+    for entry in parsed:
+        previous = cache.get(entry['file_name'])
+        files[entry['file_name']] = entry
+        if previous and previous.get('sha256') == entry['sha256']:
+            continue   # 只是修改时间变化，内容相同
+        changed.append(entry)
+
+    # 同一考点 code 只能对应一个文件
+    owners: Dict[str, str] = {}
+    issues: List[str] = []
+    for name, entry in sorted(files.items()):
+        for issue in entry['issues']:
+            issues.append(f"{name}: {issue}")
+        code = entry['code']
+        if code and code in owners:
+            issues.append(f"{name}: 考点 {code} 已由 {owners[code]} 提供，已跳过")
+            changed = [e for e in changed if e['file_name'] != name]
+            continue
+        if code:
+            owners[code] = name
+    changed = [e for e in changed if e['code'] and e['blocks']]
+
+    removed_codes = sorted({cache[name]['code'] for name in removed if cache[name].get('code')}
+                           - set(owners))
+
+    write_payload(args.output, changed, removed_codes)
+    save_cache(args.cache, applied, files)
+    elapsed = time.time() - started
+
+    total_blocks = sum(len(entry['blocks']) for entry in files.values())
+    print(f"📁 考点文件 {len(files)} 个，模块 {total_blocks} 个")
+    print(f"   - 重新读取: {len(to_read)}（内容变化 {len(changed)}）")
+    print(f"   - 未变化跳过: {len(files) - len(to_read)}")
+    if removed:
+        print(f"   - 已删除: {len(removed)}")
+    if issues:
+        print(f"⚠️ {len(issues)} 个问题:")
+        for issue in issues[:10]:
+            print(f"   - {issue}")
+        if len(issues) > 10:
+            print(f"   ... 还有 {len(issues) - 10} 个问题")
+
+    print(f"\n⏱️  耗时 {elapsed:.2f} 秒")
+    print(f"✅ COPY 载荷: {args.output}")
+    print("   导入成功后运行 python extract_point_blocks.py --applied 确认")
+
+
+if __name__ == '__main__':
+    main()
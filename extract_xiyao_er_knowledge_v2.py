@@ -11,54 +11,84 @@
 
 使用方法：
 python extract_xiyao_er_knowledge_v2.py
+python extract_xiyao_er_knowledge_v2.py --memory-report   # 同时输出记录内存占用报告
+python extract_xiyao_er_knowledge_v2.py --jsonl           # 同时边提取边输出 JSON Lines
+python extract_xiyao_er_knowledge_v2.py --exam-index      # 同时输出考频索引及回填 knowledge_points 的 SQL
 
 输入：shuju/layout.json, shuju/images/
 输出：shuju/西药药二_知识点_完整版.json
+      shuju/西药药二_知识点_完整版.jsonl（--jsonl，每行一条 drug/exam_point/table/image_ref 记录）
+      shuju/西药药二_知识点_完整版_考频索引.json/.sql（--exam-index，按 subject/C{n}/C{n}.{m}/考点名 回填）
 """
 
 import json
 import re
 import os
-from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass, field, asdict
-from collections import defaultdict
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Any
+from dataclasses import MISSING, dataclass, field, fields, make_dataclass, asdict
+from collections import Counter, defaultdict
 from pathlib import Path
 from bs4 import BeautifulSoup
 import html
 
+from cn_numerals import cn_to_num
+from pg_copy import DEFAULT_SUBJECT_CODE
 
-@dataclass
-class DrugCharacteristics:
+
+class LeanRecord:
+    """紧凑记录基类：子类使用 __slots__，列表/字典字段在首次写入时才分配，未写入时为 None"""
+    __slots__ = ()
+    
+    def add(self, name: str, value: Any, unique: bool = False):
+        """向列表字段追加元素，unique=True 时跳过已存在的元素"""
+        items = getattr(self, name)
+        if items is None:
+            setattr(self, name, [value])
+        elif not (unique and value in items):
+            items.append(value)
+    
+    def put(self, name: str, key: str, value: Any):
+        """向字典字段写入键值"""
+        mapping = getattr(self, name)
+        if mapping is None:
+            setattr(self, name, {key: value})
+        else:
+            mapping[key] = value
+
+
+@dataclass(slots=True)
+class DrugCharacteristics(LeanRecord):
     """药物作用特点"""
-    mechanism: List[str] = field(default_factory=list)  # 作用机制
+    mechanism: Optional[List[str]] = None  # 作用机制
     selectivity: str = ""  # 选择性
-    indications: List[str] = field(default_factory=list)  # 适应证
-    pharmacokinetics: Dict[str, str] = field(default_factory=dict)  # 药动学特点
-    special_features: List[str] = field(default_factory=list)  # 特殊作用特点
+    indications: Optional[List[str]] = None  # 适应证
+    pharmacokinetics: Optional[Dict[str, str]] = None  # 药动学特点
+    special_features: Optional[List[str]] = None  # 特殊作用特点
 
 
-@dataclass
-class AdverseReactions:
+@dataclass(slots=True)
+class AdverseReactions(LeanRecord):
     """不良反应（按严重程度和类型分级）"""
-    severe: List[str] = field(default_factory=list)      # 严重不良反应
-    moderate: List[str] = field(default_factory=list)    # 中度不良反应
-    mild: List[str] = field(default_factory=list)        # 轻度不良反应
-    common: List[str] = field(default_factory=list)      # 常见不良反应
-    typical: List[str] = field(default_factory=list)     # 典型不良反应
+    severe: Optional[List[str]] = None      # 严重不良反应
+    moderate: Optional[List[str]] = None    # 中度不良反应
+    mild: Optional[List[str]] = None        # 轻度不良反应
+    common: Optional[List[str]] = None      # 常见不良反应
+    typical: Optional[List[str]] = None     # 典型不良反应
 
 
-@dataclass
-class DrugInteractions:
+@dataclass(slots=True)
+class DrugInteractions(LeanRecord):
     """药物相互作用"""
-    synergistic: List[str] = field(default_factory=list)  # 协同作用
-    antagonistic: List[str] = field(default_factory=list)  # 拮抗作用
-    contraindicated: List[str] = field(default_factory=list)  # 禁忌合用
-    caution: List[str] = field(default_factory=list)  # 慎重合用
-    general: List[str] = field(default_factory=list)  # 一般相互作用
+    synergistic: Optional[List[str]] = None  # 协同作用
+    antagonistic: Optional[List[str]] = None  # 拮抗作用
+    contraindicated: Optional[List[str]] = None  # 禁忌合用
+    caution: Optional[List[str]] = None  # 慎重合用
+    general: Optional[List[str]] = None  # 一般相互作用
 
 
-@dataclass
-class DrugInfo:
+@dataclass(slots=True)
+class DrugInfo(LeanRecord):
     """药物完整信息"""
     name: str
     category: str = ""  # 药物分类
@@ -66,36 +96,153 @@ class DrugInfo:
     characteristics: DrugCharacteristics = field(default_factory=DrugCharacteristics)
     adverse_reactions: AdverseReactions = field(default_factory=AdverseReactions)
     interactions: DrugInteractions = field(default_factory=DrugInteractions)
-    contraindications: List[str] = field(default_factory=list)  # 禁忌证
-    precautions: List[str] = field(default_factory=list)  # 注意事项
-    dosage: Dict[str, str] = field(default_factory=dict)  # 用法用量
-    clinical_use: List[str] = field(default_factory=list)  # 临床应用
-    special_populations: Dict[str, str] = field(default_factory=dict)  # 特殊人群用药
-    exam_points: List[str] = field(default_factory=list)  # 考点标记
-    related_images: List[str] = field(default_factory=list)  # 相关图片路径
+    contraindications: Optional[List[str]] = None  # 禁忌证
+    precautions: Optional[List[str]] = None  # 注意事项
+    dosage: Optional[Dict[str, str]] = None  # 用法用量
+    clinical_use: Optional[List[str]] = None  # 临床应用
+    special_populations: Optional[Dict[str, str]] = None  # 特殊人群用药
+    exam_points: Optional[List[str]] = None  # 考点标记
+    related_images: Optional[List[str]] = None  # 相关图片路径
+    
+    def __post_init__(self):
+        self.category = sys.intern(self.category)
+        self.subcategory = sys.intern(self.subcategory)
 
 
-@dataclass
-class TableData:
+@dataclass(slots=True)
+class TableData(LeanRecord):
     """表格数据"""
     title: str = ""
-    headers: List[str] = field(default_factory=list)
-    rows: List[Dict[str, str]] = field(default_factory=list)
+    headers: Optional[List[str]] = None
+    rows: Optional[List[Dict[str, str]]] = None
     source_image: str = ""
     page_idx: int = 0
 
 
-@dataclass
-class ExamPoint:
+@dataclass(slots=True)
+class ExamPoint(LeanRecord):
     """考点信息"""
     name: str
     chapter: str
     section: str
-    exam_years: List[str] = field(default_factory=list)
+    exam_years: Optional[List[str]] = None
     content: str = ""
-    related_drugs: List[str] = field(default_factory=list)
-    tables: List[TableData] = field(default_factory=list)
-    images: List[str] = field(default_factory=list)
+    related_drugs: Optional[List[str]] = None
+    tables: Optional[List[TableData]] = None
+    images: Optional[List[str]] = None
+    
+    def __post_init__(self):
+        self.chapter = sys.intern(self.chapter)
+        self.section = sys.intern(self.section)
+
+
+@dataclass
+class ExamYearIndex:
+    """考频倒排索引（解析过程中增量构建）
+    
+    year_points: 年份 -> 考点序号（self.exam_points 下标）
+    drug_years: 药物 -> 涉及该药物的考点的考查年份
+    point_years: 考点序号 -> 考查年份（频次即年份数）
+    """
+    year_points: Dict[int, List[int]] = field(default_factory=lambda: defaultdict(list))
+    drug_years: Dict[str, set] = field(default_factory=lambda: defaultdict(set))
+    point_years: List[List[int]] = field(default_factory=list)
+    
+    def add_point(self, years: Iterable[int], drugs: Iterable[str]) -> int:
+        """登记一个考点，返回其序号"""
+        point_idx = len(self.point_years)
+        years = sorted(set(years))
+        self.point_years.append(years)
+        for year in years:
+            self.year_points[year].append(point_idx)
+        for drug in drugs:
+            self.drug_years[drug].update(years)
+        return point_idx
+    
+    def frequency(self, point_idx: int) -> int:
+        return len(self.point_years[point_idx])
+
+
+def _deep_sizeof(obj: Any, seen: set) -> int:
+    """递归统计对象占用字节数，同一对象（如驻留字符串）只计一次"""
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(_deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, '__dict__'):
+        size += _deep_sizeof(vars(obj), seen)
+    elif isinstance(obj, LeanRecord):
+        size += sum(_deep_sizeof(getattr(obj, f.name), seen) for f in fields(obj))
+    
+    return size
+
+
+_LEGACY_CLASSES: Dict[type, type] = {}
+
+
+def _legacy_class(cls: type) -> type:
+    """改动前的数据类：同名同字段的普通 @dataclass（有 __dict__），列表/字典字段用 default_factory 预先分配"""
+    if cls not in _LEGACY_CLASSES:
+        specs = []
+        for f in fields(cls):
+            if f.default is None:
+                factory = dict if 'Dict' in str(f.type) else list
+                specs.append((f.name, f.type, field(default_factory=factory)))
+            elif f.default is not MISSING or f.default_factory is not MISSING:
+                specs.append((f.name, f.type, field(default=f.default, default_factory=f.default_factory)))
+            else:
+                specs.append((f.name, f.type))
+        _LEGACY_CLASSES[cls] = make_dataclass(cls.__name__, specs)
+    return _LEGACY_CLASSES[cls]
+
+
+def _legacy_layout(record: Any) -> Any:
+    """把紧凑记录复制为改动前数据类的实例，用于对比内存占用"""
+    if not isinstance(record, LeanRecord):
+        return record
+    
+    values = {}
+    for f in fields(record):
+        value = getattr(record, f.name)
+        if isinstance(value, list):
+            value = [_legacy_layout(item) for item in value]
+        elif value is not None:
+            value = _legacy_layout(value)
+        if value is not None:
+            values[f.name] = value
+    return _legacy_class(type(record))(**values)
+
+
+# JSON Lines 记录类型
+JSONL_RECORD_TYPES = ('drug', 'exam_point', 'table', 'image_ref')
+
+
+def _jsonl_line(record_type: str, data: Any) -> str:
+    """序列化一条 JSON Lines 记录，type 固定在行首以便按前缀过滤"""
+    return json.dumps({'type': record_type, 'data': data},
+                      ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def load_jsonl_records(path: str, record_types: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+    """逐行读取 JSON Lines 输出，可按记录类型过滤
+    
+    过滤通过行首前缀完成，不匹配的行不会被解析。
+    """
+    prefixes = None
+    if record_types is not None:
+        prefixes = tuple('{"type":%s,' % json.dumps(t, ensure_ascii=False) for t in record_types)
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if prefixes is not None and not line.startswith(prefixes):
+                continue
+            if line.strip():
+                yield json.loads(line)
 
 
 class EnhancedKnowledgeExtractor:
@@ -106,13 +253,6 @@ class EnhancedKnowledgeExtractor:
     SECTION_PATTERN = re.compile(r'^第([一二三四五六七八九十]+)节\s*(.+?)(?:\s*\.{2,}|\s+)?\d*$')
     EXAM_POINT_PATTERN = re.compile(r'^考点\s*(\d+)\s*(.+)$')
     
-    # 中文数字映射
-    CN_NUM_MAP = {
-        '一': 1, '二': 2, '三': 3, '四': 4, '五': 5,
-        '六': 6, '七': 7, '八': 8, '九': 9, '十': 10,
-        '十一': 11, '十二': 12, '十三': 13, '十四': 14, '十五': 15
-    }
-    
     # 药物名称识别 - 扩展列表
     KNOWN_DRUGS = [
         # 镇静催眠药
@@ -181,6 +321,16 @@ class EnhancedKnowledgeExtractor:
         'precautions': ['注意事项', '慎用', '注意'],
     }
     
+    # 考查年份
+    YEAR_PATTERN = re.compile(r'20[12]\d')
+    POINT_PREFIX_PATTERN = re.compile(r'^考点\s*\d+\s*')
+    
+    # 页眉页脚检测：页面上下边缘区域占页高比例、纵向位置分桶粒度、最少出现页占比
+    FURNITURE_MARGIN_RATIO = 0.1
+    FURNITURE_BAND_RATIO = 0.02
+    FURNITURE_MIN_PAGE_RATIO = 0.2
+    FURNITURE_MIN_PAGES = 3
+    
     # 严重程度关键词
     SEVERITY_KEYWORDS = {
         'severe': ['呼吸抑制', '过敏性休克', '骨髓抑制', '肝毒性', '肾毒性', '肝损伤',
@@ -206,6 +356,10 @@ class EnhancedKnowledgeExtractor:
         self.exam_points: List[ExamPoint] = []
         self.tables: List[TableData] = []
         self.image_references: Dict[str, Dict] = {}  # 图片路径 -> 相关信息
+        self._jsonl_file = None  # JSON Lines 输出（可选）
+        self._furniture_lines = set()  # 页眉页脚行（行对象 id）
+        self.exam_year_index = ExamYearIndex()
+        self._section_year_rows: Dict[Tuple[str, str], Dict[str, set]] = defaultdict(dict)
         
     def load_data(self):
         """加载 layout.json 数据"""
@@ -214,10 +368,74 @@ class EnhancedKnowledgeExtractor:
             data = json.load(f)
         self.pages = data.get('pdf_info', [])
         print(f"共加载 {len(self.pages)} 页")
+    
+    def _furniture_key(self, line: dict, page_height: float) -> Optional[Tuple[str, str, int]]:
+        """页边缘文本行的特征键 (归一化文本, 上/下边缘, 纵向位置桶)，非边缘行返回 None"""
+        bbox = line.get('bbox')
+        if not bbox or len(bbox) < 4 or page_height <= 0:
+            return None
+        
+        margin = page_height * self.FURNITURE_MARGIN_RATIO
+        if bbox[3] <= margin:
+            zone, offset = 'top', bbox[1]
+        elif bbox[1] >= page_height - margin:
+            zone, offset = 'bottom', page_height - bbox[3]
+        else:
+            return None
+        
+        parts = []
+        for span in line.get('spans', []):
+            if span.get('type', 'text') not in ('text', 'inline_equation'):
+                return None
+            parts.append(span.get('content', ''))
+        # 数字归一化，使逐页递增的页码落到同一个键上
+        text = re.sub(r'\d+', '#', re.sub(r'\s+', '', ''.join(parts)))
+        if not text:
+            return None
+        return text, zone, int(offset / (page_height * self.FURNITURE_BAND_RATIO))
+    
+    def _iter_page_lines(self, page: dict, keys: Tuple[str, ...]) -> Iterator[dict]:
+        """遍历页面指定块列表（含子块）中的所有文本行"""
+        for key in keys:
+            for block in page.get(key, []):
+                yield from block.get('lines', [])
+                for sub_block in block.get('blocks', []):
+                    yield from sub_block.get('lines', [])
+    
+    def detect_page_furniture(self):
+        """统计识别页眉页脚
+        
+        在页面上下边缘相近位置、跨多页重复出现的文本行视为页眉页脚（含页码）。
+        MinerU 已丢弃的 discarded_blocks 一并参与统计，作为已知样本；
+        只有正文块中命中的行会在解析前被剔除。
+        """
+        pages_by_key: Dict[Tuple[str, str, int], set] = defaultdict(set)
+        candidates = []
+        
+        for page in self.pages:
+            page_size = page.get('page_size') or [0, 0]
+            page_height = page_size[1] if len(page_size) > 1 else 0
+            page_idx = page.get('page_idx', 0)
+            
+            for line in self._iter_page_lines(page, ('para_blocks', 'discarded_blocks')):
+                key = self._furniture_key(line, page_height)
+                if key:
+                    pages_by_key[key].add(page_idx)
+            for line in self._iter_page_lines(page, ('para_blocks',)):
+                key = self._furniture_key(line, page_height)
+                if key:
+                    candidates.append((key, line))
+        
+        min_pages = max(self.FURNITURE_MIN_PAGES,
+                        int(len(self.pages) * self.FURNITURE_MIN_PAGE_RATIO))
+        furniture = {key for key, page_set in pages_by_key.items() if len(page_set) >= min_pages}
+        self._furniture_lines = {id(line) for key, line in candidates if key in furniture}
+        
+        print(f"识别页眉页脚模式 {len(furniture)} 种，正文中剔除 {len(self._furniture_lines)} 行")
         
     def cn_to_num(self, cn: str) -> int:
         """中文数字转阿拉伯数字"""
-        return self.CN_NUM_MAP.get(cn, 1)
+        return cn_to_num(cn, default=1)
 
     def parse_html_table(self, html_content: str, image_path: str = "", page_idx: int = 0) -> TableData:
         """解析HTML表格内容"""
@@ -249,8 +467,8 @@ class EnhancedKnowledgeExtractor:
                     data_rows.append(row_data)
             
             return TableData(
-                headers=headers,
-                rows=data_rows,
+                headers=headers or None,
+                rows=data_rows or None,
                 source_image=image_path,
                 page_idx=page_idx
             )
@@ -268,8 +486,20 @@ class EnhancedKnowledgeExtractor:
             'images': [],
             'chapter': None,
             'section': None,
+            'table_text_pos': [],  # 每个表格之前已出现的文本条数，用于按原顺序交错处理
+            'image_text_pos': [],
         }
         
+        # 正文中没有章标题，奇数页页眉（MinerU 放在 discarded_blocks）才是当前章
+        for block in page.get('discarded_blocks', []):
+            if block.get('type') != 'header':
+                continue
+            header = ''.join(span.get('content', '') for line in block.get('lines', [])
+                             for span in line.get('spans', [])).strip()
+            chapter_match = self.CHAPTER_PATTERN.match(header)
+            if chapter_match:
+                result['chapter'] = f"第{chapter_match.group(1)}章 {chapter_match.group(2).strip()}"
+        
         para_blocks = page.get('para_blocks', [])
         
         for block in para_blocks:
@@ -282,6 +512,8 @@ class EnhancedKnowledgeExtractor:
             # 处理普通文本块
             elif 'lines' in block:
                 for line in block['lines']:
+                    if id(line) in self._furniture_lines:
+                        continue
                     for span in line.get('spans', []):
                         span_type = span.get('type', 'text')
                         content = span.get('content', '').strip()
@@ -294,16 +526,13 @@ class EnhancedKnowledgeExtractor:
                                 page_idx
                             )
                             if table_data:
-                                result['tables'].append(table_data)
-                                self.tables.append(table_data)
+                                self._add_table(table_data, result)
                         elif span_type == 'image' and 'image_path' in span:
                             # 记录图片引用
-                            img_path = span['image_path']
-                            result['images'].append(img_path)
-                            self.image_references[img_path] = {
+                            self._add_image(span['image_path'], result, {
                                 'page_idx': page_idx,
                                 'context': content
-                            }
+                            })
                         elif content:
                             result['texts'].append({
                                 'type': block_type,
@@ -317,6 +546,33 @@ class EnhancedKnowledgeExtractor:
         
         return result
     
+    def _add_table(self, table_data: TableData, result: dict):
+        """记录解析出的表格，并写出 JSON Lines 记录"""
+        result['tables'].append(table_data)
+        result['table_text_pos'].append(len(result['texts']))
+        self.tables.append(table_data)
+        self._emit('table', self._table_to_dict(table_data))
+    
+    def _add_image(self, img_path: str, result: dict, info: dict):
+        """记录图片引用及其在页面文本中的位置"""
+        result['images'].append(img_path)
+        result['image_text_pos'].append(len(result['texts']))
+        self.image_references[img_path] = info
+    
+    def _link_image(self, img_path: str, section: str, exam_point: str):
+        """把图片关联到所在小节与考点"""
+        info = self.image_references.get(img_path)
+        if info is not None:
+            if section:
+                info['section'] = section
+            if exam_point:
+                info['exam_point'] = exam_point
+    
+    def _emit(self, record_type: str, data: Any):
+        """写出一条 JSON Lines 记录（未开启 JSON Lines 输出时忽略）"""
+        if self._jsonl_file is not None:
+            self._jsonl_file.write(_jsonl_line(record_type, data))
+    
     def _process_image_block(self, block: dict, result: dict, page_idx: int):
         """处理图片块"""
         if 'blocks' in block:
@@ -327,12 +583,10 @@ class EnhancedKnowledgeExtractor:
                     for line in sub_block['lines']:
                         for span in line.get('spans', []):
                             if span.get('type') == 'image' and 'image_path' in span:
-                                img_path = span['image_path']
-                                result['images'].append(img_path)
-                                self.image_references[img_path] = {
+                                self._add_image(span['image_path'], result, {
                                     'page_idx': page_idx,
                                     'type': 'image_body'
-                                }
+                                })
                             elif span.get('type') == 'table' and 'html' in span:
                                 table_data = self.parse_html_table(
                                     span['html'],
@@ -340,8 +594,7 @@ class EnhancedKnowledgeExtractor:
                                     page_idx
                                 )
                                 if table_data:
-                                    result['tables'].append(table_data)
-                                    self.tables.append(table_data)
+                                    self._add_table(table_data, result)
                 
                 elif sub_type == 'image_caption' and 'lines' in sub_block:
                     for line in sub_block['lines']:
@@ -357,6 +610,8 @@ class EnhancedKnowledgeExtractor:
         """处理子块"""
         if 'lines' in sub_block:
             for line in sub_block['lines']:
+                if id(line) in self._furniture_lines:
+                    continue
                 for span in line.get('spans', []):
                     span_type = span.get('type', 'text')
                     content = span.get('content', '').strip()
@@ -368,15 +623,12 @@ class EnhancedKnowledgeExtractor:
                             page_idx
                         )
                         if table_data:
-                            result['tables'].append(table_data)
-                            self.tables.append(table_data)
+                            self._add_table(table_data, result)
                     elif span_type == 'image' and 'image_path' in span:
-                        img_path = span['image_path']
-                        result['images'].append(img_path)
-                        self.image_references[img_path] = {
+                        self._add_image(span['image_path'], result, {
                             'page_idx': page_idx,
                             'context': content
-                        }
+                        })
                     elif content:
                         result['texts'].append({
                             'type': sub_block.get('type', 'text'),
@@ -411,13 +663,14 @@ class EnhancedKnowledgeExtractor:
         drug_info = {}
         
         # 检查表头，确定表格类型
-        headers_lower = [h.lower() for h in table.headers]
+        headers = table.headers or []
+        rows = table.rows or []
         
         # 药物分类表
-        if '分类' in table.headers and '代表药品' in table.headers:
+        if '分类' in headers and '代表药品' in headers:
             drug_info['type'] = 'classification'
             drug_info['data'] = []
-            for row in table.rows:
+            for row in rows:
                 category = row.get('分类', '')
                 drugs = row.get('代表药品', '')
                 drug_info['data'].append({
@@ -426,10 +679,10 @@ class EnhancedKnowledgeExtractor:
                 })
         
         # 作用特点/不良反应表
-        elif '项目' in table.headers and '具体内容' in table.headers:
+        elif '项目' in headers and '具体内容' in headers:
             drug_info['type'] = 'details'
             drug_info['data'] = {}
-            for row in table.rows:
+            for row in rows:
                 item = row.get('项目', '')
                 content = row.get('具体内容', '')
                 
@@ -447,10 +700,10 @@ class EnhancedKnowledgeExtractor:
                     drug_info['data']['pharmacokinetics'] = content
         
         # 类别/作用特点/典型不良反应表
-        elif '类别' in table.headers and '作用特点' in table.headers:
+        elif '类别' in headers and '作用特点' in headers:
             drug_info['type'] = 'category_details'
             drug_info['data'] = []
-            for row in table.rows:
+            for row in rows:
                 drug_info['data'].append({
                     'category': row.get('类别', ''),
                     'characteristics': row.get('作用特点', ''),
@@ -458,10 +711,10 @@ class EnhancedKnowledgeExtractor:
                 })
         
         # 考点/考查年份表
-        elif '考点' in table.headers and '考查年份' in table.headers:
+        elif '考点' in headers and '考查年份' in headers:
             drug_info['type'] = 'exam_points'
             drug_info['data'] = []
-            for row in table.rows:
+            for row in rows:
                 drug_info['data'].append({
                     'point': row.get('考点', ''),
                     'years': row.get('考查年份', '')
@@ -484,26 +737,44 @@ class EnhancedKnowledgeExtractor:
             page_data = self.extract_from_page(page)
             page_idx = page_data['page_idx']
             
+            # 页眉换章：目录页之后的章只能从页眉得知，否则所有考点都会记在目录最后一章下
+            if page_data['chapter'] and page_data['chapter'] != current_chapter:
+                if current_exam_point:
+                    self._save_exam_point(current_chapter, current_section,
+                                         current_exam_point, current_content)
+                current_exam_point, current_content = "", []
+                current_chapter = page_data['chapter']
+                current_section = ""
+                print(f"  发现章节: {current_chapter}（页眉）")
+            
             # 处理表格数据
             for table in page_data['tables']:
                 drug_info = self.extract_drug_info_from_table(table)
                 if drug_info:
                     self._process_table_drug_info(drug_info, current_chapter, current_section)
             
+            # 考点梳理表（考点/考查年份）按其在页面中的位置归入当时的小节
+            year_tables = [(pos, table) for pos, table in zip(page_data['table_text_pos'], page_data['tables'])
+                           if self._year_columns(table)]
+            images = list(zip(page_data['image_text_pos'], page_data['images']))
+            
             # 处理文本内容
-            for text_item in page_data['texts']:
+            for text_idx, text_item in enumerate(page_data['texts']):
+                while year_tables and year_tables[0][0] <= text_idx:
+                    self._index_year_table(year_tables.pop(0)[1], current_chapter, current_section)
+                while images and images[0][0] <= text_idx:
+                    self._link_image(images.pop(0)[1], current_section, current_exam_point)
+                
                 content = text_item['content']
                 text_type = text_item['type']
                 
-                # 跳过页眉页脚
-                if '百万大学生' in content or '微信' in content:
-                    continue
-                if content.isdigit() and len(content) <= 3:
-                    continue
-                
                 # 识别章节
                 chapter_match = self.CHAPTER_PATTERN.match(content)
                 if chapter_match:
+                    if current_exam_point:
+                        self._save_exam_point(current_chapter, current_section,
+                                             current_exam_point, current_content)
+                    current_exam_point, current_content = "", []
                     cn_num = chapter_match.group(1)
                     title = chapter_match.group(2).strip()
                     current_chapter = f"第{cn_num}章 {title}"
@@ -513,6 +784,11 @@ class EnhancedKnowledgeExtractor:
                 
                 section_match = self.SECTION_PATTERN.match(content)
                 if section_match:
+                    # 小节切换时先保存上一小节的最后一个考点（内容可能只在表格中），避免被记到新小节下
+                    if current_exam_point:
+                        self._save_exam_point(current_chapter, current_section,
+                                             current_exam_point, current_content)
+                    current_exam_point, current_content = "", []
                     cn_num = section_match.group(1)
                     title = section_match.group(2).strip()
                     current_section = f"第{cn_num}节 {title}"
@@ -560,6 +836,11 @@ class EnhancedKnowledgeExtractor:
                 # 收集考点内容
                 if current_exam_point:
                     current_content.append(content)
+            
+            for _, table in year_tables:
+                self._index_year_table(table, current_chapter, current_section)
+            for _, img_path in images:
+                self._link_image(img_path, current_section, current_exam_point)
         
         # 保存最后一个考点
         if current_exam_point and current_content:
@@ -592,7 +873,7 @@ class EnhancedKnowledgeExtractor:
                                 subcategory=category
                             )
                         else:
-                            self.drugs[drug_name].subcategory = category
+                            self.drugs[drug_name].subcategory = sys.intern(category)
         
         elif info_type == 'details':
             # 详细信息表 - 解析并关联到具体药物
@@ -619,9 +900,9 @@ class EnhancedKnowledgeExtractor:
                         
                         drug = self.drugs[drug_name]
                         if characteristics:
-                            drug.characteristics.special_features.append(characteristics)
+                            drug.characteristics.add('special_features', characteristics)
                         if adverse:
-                            drug.adverse_reactions.typical.append(adverse)
+                            drug.adverse_reactions.add('typical', adverse)
     
     def _parse_and_assign_drug_content(self, content_type: str, content: str, section: str):
         """解析表格内容并分配到具体药物"""
@@ -636,7 +917,7 @@ class EnhancedKnowledgeExtractor:
                 if drug_name in content:
                     if drug_name not in self.drugs:
                         self.drugs[drug_name] = DrugInfo(name=drug_name, category=section)
-                    self.drugs[drug_name].characteristics.mechanism.append(content)
+                    self.drugs[drug_name].characteristics.add('mechanism', content)
         
         elif content_type == 'characteristics':
             # 作用特点 - 解析具体药物信息
@@ -681,28 +962,21 @@ class EnhancedKnowledgeExtractor:
                 drug = self.drugs[drug_name]
                 
                 if info_type == 'characteristics':
-                    if part not in drug.characteristics.special_features:
-                        drug.characteristics.special_features.append(part)
+                    drug.characteristics.add('special_features', part, unique=True)
                 elif info_type == 'adverse_reactions':
                     severity = self.classify_adverse_severity(part)
                     if severity == 'severe':
-                        if part not in drug.adverse_reactions.severe:
-                            drug.adverse_reactions.severe.append(part)
+                        drug.adverse_reactions.add('severe', part, unique=True)
                     elif severity == 'moderate':
-                        if part not in drug.adverse_reactions.moderate:
-                            drug.adverse_reactions.moderate.append(part)
+                        drug.adverse_reactions.add('moderate', part, unique=True)
                     else:
-                        if part not in drug.adverse_reactions.mild:
-                            drug.adverse_reactions.mild.append(part)
+                        drug.adverse_reactions.add('mild', part, unique=True)
                     # 同时添加到典型不良反应
-                    if part not in drug.adverse_reactions.typical:
-                        drug.adverse_reactions.typical.append(part)
+                    drug.adverse_reactions.add('typical', part, unique=True)
                 elif info_type == 'interactions':
-                    if part not in drug.interactions.general:
-                        drug.interactions.general.append(part)
+                    drug.interactions.add('general', part, unique=True)
                 elif info_type == 'contraindications':
-                    if part not in drug.contraindications:
-                        drug.contraindications.append(part)
+                    drug.add('contraindications', part, unique=True)
     
     def _add_content_to_drug(self, drug: DrugInfo, content: str, content_type: Optional[str]):
         """将内容添加到药物信息中"""
@@ -710,49 +984,65 @@ class EnhancedKnowledgeExtractor:
             return
         
         if content_type == 'mechanism':
-            drug.characteristics.mechanism.append(content)
+            drug.characteristics.add('mechanism', content)
         elif content_type == 'characteristics':
-            drug.characteristics.special_features.append(content)
+            drug.characteristics.add('special_features', content)
         elif content_type == 'pharmacokinetics':
             # 解析药动学参数
             if '半衰期' in content:
-                drug.characteristics.pharmacokinetics['半衰期'] = content
+                drug.characteristics.put('pharmacokinetics', '半衰期', content)
             elif '代谢' in content:
-                drug.characteristics.pharmacokinetics['代谢'] = content
+                drug.characteristics.put('pharmacokinetics', '代谢', content)
             elif '吸收' in content:
-                drug.characteristics.pharmacokinetics['吸收'] = content
+                drug.characteristics.put('pharmacokinetics', '吸收', content)
             else:
-                drug.characteristics.pharmacokinetics['其他'] = content
+                drug.characteristics.put('pharmacokinetics', '其他', content)
         elif content_type == 'adverse_reactions':
             severity = self.classify_adverse_severity(content)
             if severity == 'severe':
-                drug.adverse_reactions.severe.append(content)
+                drug.adverse_reactions.add('severe', content)
             elif severity == 'moderate':
-                drug.adverse_reactions.moderate.append(content)
+                drug.adverse_reactions.add('moderate', content)
             else:
-                drug.adverse_reactions.mild.append(content)
+                drug.adverse_reactions.add('mild', content)
         elif content_type == 'contraindications':
-            drug.contraindications.append(content)
+            drug.add('contraindications', content)
         elif content_type == 'interactions':
-            drug.interactions.general.append(content)
+            drug.interactions.add('general', content)
         elif content_type == 'indications':
-            drug.clinical_use.append(content)
+            drug.add('clinical_use', content)
         elif content_type == 'precautions':
-            drug.precautions.append(content)
+            drug.add('precautions', content)
+    
+    def _year_columns(self, table: TableData) -> Optional[Tuple[str, str]]:
+        """考点梳理表的 (考点列, 年份列)，不是此类表格时返回 None"""
+        headers = table.headers or []
+        point_col = next((h for h in headers if '考点' in h), None)
+        year_col = next((h for h in headers if '年份' in h), None)
+        return (point_col, year_col) if point_col and year_col else None
+    
+    def _point_key(self, point_name: str) -> str:
+        """考点名称归一化：去掉“考点N”前缀与空白"""
+        return re.sub(r'\s+', '', self.POINT_PREFIX_PATTERN.sub('', point_name))
+    
+    def _index_year_table(self, table: TableData, chapter: str, section: str):
+        """登记考点梳理表中各考点的考查年份（跨页续表合并）"""
+        point_col, year_col = self._year_columns(table)
+        section_rows = self._section_year_rows[(chapter, section)]
+        for row in table.rows or []:
+            name = row.get(point_col, '')
+            years = self.YEAR_PATTERN.findall(row.get(year_col, ''))
+            if name and years:
+                section_rows.setdefault(self._point_key(name), set()).update(years)
     
     def _save_exam_point(self, chapter: str, section: str, point_name: str, content: List[str]):
-        """保存考点信息"""
-        # 提取考试年份
-        exam_years = []
-        year_pattern = re.compile(r'20[12]\d')
-        for text in content:
-            years = year_pattern.findall(text)
-            exam_years.extend(years)
-        exam_years = list(set(exam_years))
-        
-        # 提取相关药物
+        """保存考点信息，同时更新考频倒排索引"""
+        # 一次遍历内容，同时提取考试年份与相关药物
+        exam_years = set(self._section_year_rows.get((chapter, section), {})
+                         .get(self._point_key(point_name), ()))
         related_drugs = []
         for text in content:
+            exam_years.update(self.YEAR_PATTERN.findall(text))
             for drug in self.KNOWN_DRUGS:
                 if drug in text and drug not in related_drugs:
                     related_drugs.append(drug)
@@ -761,16 +1051,95 @@ class EnhancedKnowledgeExtractor:
             name=point_name,
             chapter=chapter,
             section=section,
-            exam_years=sorted(exam_years),
+            exam_years=sorted(exam_years) or None,
             content='\n'.join(content),
-            related_drugs=related_drugs
+            related_drugs=related_drugs or None
         )
         self.exam_points.append(exam_point)
+        self.exam_year_index.add_point((int(y) for y in exam_years), related_drugs)
+        self._emit('exam_point', self._exam_point_to_dict(exam_point))
     
-    def extract(self):
-        """执行提取"""
+    def extract(self, jsonl_path: Optional[str] = None):
+        """执行提取
+        
+        指定 jsonl_path 时，考点和表格在解析过程中即写出，
+        药物和图片引用在全部页面解析完成后写出（解析中仍会被补充）。
+        """
         self.load_data()
-        self.parse_all_pages()
+        self.detect_page_furniture()
+        
+        if jsonl_path is None:
+            self.parse_all_pages()
+            return
+        
+        with open(jsonl_path, 'w', encoding='utf-8') as f:
+            self._jsonl_file = f
+            try:
+                self.parse_all_pages()
+                for drug in self.drugs.values():
+                    self._emit('drug', self._drug_to_dict(drug))
+                for img_path, info in self.image_references.items():
+                    self._emit('image_ref', dict(info, path=img_path))
+            finally:
+                self._jsonl_file = None
+        print(f"JSON Lines 已写出: {jsonl_path}")
+    
+    def _drug_to_dict(self, drug: DrugInfo) -> dict:
+        """药物记录转字典"""
+        return {
+            "名称": drug.name,
+            "分类": drug.category,
+            "亚类": drug.subcategory,
+            "作用特点": {
+                "作用机制": drug.characteristics.mechanism or [],
+                "选择性": drug.characteristics.selectivity,
+                "适应证": drug.characteristics.indications or [],
+                "药动学": drug.characteristics.pharmacokinetics or {},
+                "特殊特点": drug.characteristics.special_features or []
+            },
+            "不良反应": {
+                "严重": drug.adverse_reactions.severe or [],
+                "中度": drug.adverse_reactions.moderate or [],
+                "轻度": drug.adverse_reactions.mild or [],
+                "常见": drug.adverse_reactions.common or [],
+                "典型": drug.adverse_reactions.typical or []
+            },
+            "药物相互作用": {
+                "协同": drug.interactions.synergistic or [],
+                "拮抗": drug.interactions.antagonistic or [],
+                "禁忌合用": drug.interactions.contraindicated or [],
+                "慎重合用": drug.interactions.caution or [],
+                "一般": drug.interactions.general or []
+            },
+            "禁忌证": drug.contraindications or [],
+            "注意事项": drug.precautions or [],
+            "用法用量": drug.dosage or {},
+            "临床应用": drug.clinical_use or [],
+            "特殊人群用药": drug.special_populations or {},
+            "考点标记": drug.exam_points or [],
+            "相关图片": drug.related_images or []
+        }
+    
+    def _exam_point_to_dict(self, point: ExamPoint) -> dict:
+        """考点记录转字典"""
+        return {
+            "名称": point.name,
+            "章节": point.chapter,
+            "小节": point.section,
+            "考试年份": point.exam_years or [],
+            "相关药物": point.related_drugs or [],
+            "内容": point.content
+        }
+    
+    def _table_to_dict(self, table: TableData) -> dict:
+        """表格记录转字典"""
+        return {
+            "标题": table.title,
+            "表头": table.headers or [],
+            "数据行": table.rows or [],
+            "来源图片": table.source_image,
+            "页码": table.page_idx
+        }
     
     def to_dict(self) -> dict:
         """转换为字典格式"""
@@ -784,64 +1153,13 @@ class EnhancedKnowledgeExtractor:
         }
         
         # 药物信息
-        drugs_data = {}
-        for name, drug in self.drugs.items():
-            drugs_data[name] = {
-                "名称": drug.name,
-                "分类": drug.category,
-                "亚类": drug.subcategory,
-                "作用特点": {
-                    "作用机制": drug.characteristics.mechanism,
-                    "选择性": drug.characteristics.selectivity,
-                    "适应证": drug.characteristics.indications,
-                    "药动学": drug.characteristics.pharmacokinetics,
-                    "特殊特点": drug.characteristics.special_features
-                },
-                "不良反应": {
-                    "严重": drug.adverse_reactions.severe,
-                    "中度": drug.adverse_reactions.moderate,
-                    "轻度": drug.adverse_reactions.mild,
-                    "常见": drug.adverse_reactions.common,
-                    "典型": drug.adverse_reactions.typical
-                },
-                "药物相互作用": {
-                    "协同": drug.interactions.synergistic,
-                    "拮抗": drug.interactions.antagonistic,
-                    "禁忌合用": drug.interactions.contraindicated,
-                    "慎重合用": drug.interactions.caution,
-                    "一般": drug.interactions.general
-                },
-                "禁忌证": drug.contraindications,
-                "注意事项": drug.precautions,
-                "用法用量": drug.dosage,
-                "临床应用": drug.clinical_use,
-                "特殊人群用药": drug.special_populations,
-                "考点标记": drug.exam_points,
-                "相关图片": drug.related_images
-            }
+        drugs_data = {name: self._drug_to_dict(drug) for name, drug in self.drugs.items()}
         
         # 考点列表
-        exam_points_data = []
-        for point in self.exam_points:
-            exam_points_data.append({
-                "名称": point.name,
-                "章节": point.chapter,
-                "小节": point.section,
-                "考试年份": point.exam_years,
-                "相关药物": point.related_drugs,
-                "内容": point.content
-            })
+        exam_points_data = [self._exam_point_to_dict(point) for point in self.exam_points]
         
         # 表格数据
-        tables_data = []
-        for table in self.tables:
-            tables_data.append({
-                "标题": table.title,
-                "表头": table.headers,
-                "数据行": table.rows,
-                "来源图片": table.source_image,
-                "页码": table.page_idx
-            })
+        tables_data = [self._table_to_dict(table) for table in self.tables]
         
         # 图片引用
         images_data = {}
@@ -856,6 +1174,92 @@ class EnhancedKnowledgeExtractor:
             "图片引用": images_data
         }
     
+    def exam_year_index_dict(self) -> dict:
+        """导出考频倒排索引（年份索引中的序号指向“考点频次”列表）"""
+        index = self.exam_year_index
+        points = self.exam_points
+        return {
+            "年份索引": {str(year): idxs for year, idxs in sorted(index.year_points.items())},
+            "药物年份": {drug: sorted(years) for drug, years in sorted(index.drug_years.items()) if years},
+            "考点频次": [
+                {
+                    "chapter": point.chapter,
+                    "section": point.section,
+                    "point_name": point.name,
+                    "exam_years": index.point_years[i],
+                    "frequency": index.frequency(i),
+                }
+                for i, point in enumerate(points)
+            ],
+        }
+    
+    def knowledge_point_key(self, chapter: str, section: str, point_name: str) -> Optional[Tuple[str, str, str]]:
+        """章节标题 -> knowledge_points 的 (chapter, section, point_name)：C13 / C13.2 / 去掉“考点N”前缀的考点名"""
+        chapter_match = self.CHAPTER_PATTERN.match(chapter or '')
+        section_match = self.SECTION_PATTERN.match(section or '')
+        if not chapter_match or not section_match:
+            return None
+        chapter_code = f"C{cn_to_num(chapter_match.group(1))}"
+        return (chapter_code, f"{chapter_code}.{cn_to_num(section_match.group(1))}",
+                self.POINT_PREFIX_PATTERN.sub('', point_name).strip())
+    
+    def export_exam_year_index(self, json_path: str, sql_path: str,
+                               subject: str = DEFAULT_SUBJECT_CODE):
+        """写出考频索引 JSON 及批量回填 knowledge_points.exam_years / frequency 的 SQL
+        
+        键与 scripts/import-supplement-points.ts 写入的行一致（subject 代码、C{n}、C{n}.{m}）；
+        同一键出现多次时合并年份。SQL 执行后返回预计行数与实际更新行数，便于核对。
+        """
+        data = self.exam_year_index_dict()
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        
+        merged: Dict[Tuple[str, str, str], set] = {}
+        skipped = 0
+        for p in data["考点频次"]:
+            key = self.knowledge_point_key(p['chapter'], p['section'], p['point_name'])
+            if not key:
+                skipped += 1
+                continue
+            merged.setdefault(key, set()).update(p['exam_years'])
+        
+        def quote(value: str) -> str:
+            return "'" + value.replace("'", "''") + "'"
+        
+        rows = [
+            f"  ({quote(chapter)}, {quote(section)}, {quote(point_name)}, "
+            f"'{{{','.join(map(str, sorted(years)))}}}'::integer[], {len(years)})"
+            for (chapter, section, point_name), years in merged.items()
+        ]
+        per_chapter = Counter(chapter for chapter, _, _ in merged)
+        with open(sql_path, 'w', encoding='utf-8') as f:
+            f.write("-- 考频索引回填：knowledge_points.exam_years / frequency\n")
+            f.write(f"-- 考点数：{len(rows)}（缺少章/节无法定位而跳过 {skipped}）\n")
+            f.write(f"-- 预计更新行数：{len(rows)}（"
+                    + "，".join(f"{code} {n}" for code, n in sorted(per_chapter.items(), key=lambda kv: int(kv[0][1:])))
+                    + "）\n\n")
+            if rows:
+                f.write("WITH v(chapter, section, point_name, exam_years, frequency) AS (VALUES\n")
+                f.write(",\n".join(rows))
+                f.write("\n), updated AS (\n"
+                        "  UPDATE knowledge_points AS kp\n"
+                        "  SET exam_years = v.exam_years, frequency = v.frequency, updated_at = NOW()\n"
+                        "  FROM v\n"
+                        f"  WHERE kp.subject = {quote(subject)}\n"
+                        "    AND kp.chapter = v.chapter\n"
+                        "    AND kp.section = v.section\n"
+                        "    AND kp.point_name = v.point_name\n"
+                        "  RETURNING kp.chapter\n"
+                        ")\n"
+                        "SELECT (SELECT COUNT(*) FROM v) AS expected_rows, COUNT(*) AS updated_rows FROM updated;\n")
+        
+        print(f"考频索引已写出: {json_path}, {sql_path}")
+        print(f"  - 预计更新 knowledge_points 行数: {len(rows)}（subject={subject}）")
+        for code, n in sorted(per_chapter.items(), key=lambda kv: int(kv[0][1:])):
+            print(f"    {code}: {n}")
+        if skipped:
+            print(f"  ⚠️ {skipped} 个考点缺少章/节，无法定位，未写入 SQL")
+    
     def save(self, output_path: str):
         """保存结果"""
         result = self.to_dict()
@@ -863,6 +1267,43 @@ class EnhancedKnowledgeExtractor:
             json.dump(result, f, ensure_ascii=False, indent=2)
         print(f"\n结果已保存到: {output_path}")
     
+    def memory_report(self) -> Dict[str, Dict[str, float]]:
+        """统计药物与考点记录的内存占用（紧凑布局 vs 旧版 __dict__ 布局）"""
+        report = {}
+        groups = {
+            'drug': list(self.drugs.values()),
+            'exam_point': self.exam_points,
+            'table': self.tables,
+        }
+        
+        for name, records in groups.items():
+            if not records:
+                continue
+            seen_lean, seen_legacy = set(), set()
+            lean_bytes = sum(_deep_sizeof(r, seen_lean) for r in records)
+            # 先保留全部副本，避免临时对象被回收后 id 复用导致漏计
+            legacy_records = [_legacy_layout(r) for r in records]
+            legacy_bytes = sum(_deep_sizeof(r, seen_legacy) for r in legacy_records)
+            report[name] = {
+                'count': len(records),
+                'legacy_bytes_per_record': legacy_bytes / len(records),
+                'lean_bytes_per_record': lean_bytes / len(records),
+            }
+        
+        return report
+    
+    def print_memory_report(self):
+        """打印内存占用报告"""
+        labels = {'drug': '药物', 'exam_point': '考点', 'table': '表格'}
+        print("\n" + "=" * 70)
+        print("🧮 记录内存占用（字节/条，含引用的字符串与列表）")
+        print("=" * 70)
+        for name, item in self.memory_report().items():
+            saved = 1 - item['lean_bytes_per_record'] / item['legacy_bytes_per_record']
+            print(f"  - {labels[name]}（{item['count']}条）: "
+                  f"旧版 {item['legacy_bytes_per_record']:.0f} → 紧凑版 {item['lean_bytes_per_record']:.0f}"
+                  f"（节省 {saved:.1%}）")
+    
     def print_summary(self):
         """打印摘要"""
         print("\n" + "=" * 70)
@@ -877,12 +1318,12 @@ class EnhancedKnowledgeExtractor:
         
         print(f"\n💊 药物列表（前30个）:")
         for i, (name, drug) in enumerate(list(self.drugs.items())[:30]):
-            features_count = len(drug.characteristics.special_features)
-            adverse_count = (len(drug.adverse_reactions.severe) + 
-                           len(drug.adverse_reactions.moderate) + 
-                           len(drug.adverse_reactions.mild) +
-                           len(drug.adverse_reactions.typical))
-            interactions_count = len(drug.interactions.general)
+            features_count = len(drug.characteristics.special_features or [])
+            adverse_count = (len(drug.adverse_reactions.severe or []) + 
+                           len(drug.adverse_reactions.moderate or []) + 
+                           len(drug.adverse_reactions.mild or []) +
+                           len(drug.adverse_reactions.typical or []))
+            interactions_count = len(drug.interactions.general or [])
             
             print(f"  {i+1}. {name}")
             print(f"      分类: {drug.category}")
@@ -892,8 +1333,8 @@ class EnhancedKnowledgeExtractor:
         
         print(f"\n📋 表格数据预览（前10个）:")
         for i, table in enumerate(self.tables[:10]):
-            print(f"  {i+1}. 表头: {table.headers}")
-            print(f"      数据行数: {len(table.rows)}")
+            print(f"  {i+1}. 表头: {table.headers or []}")
+            print(f"      数据行数: {len(table.rows or [])}")
             if table.source_image:
                 print(f"      来源图片: {table.source_image}")
         
@@ -917,9 +1358,15 @@ def main():
     
     # 创建提取器并执行
     extractor = EnhancedKnowledgeExtractor(input_path, images_dir)
-    extractor.extract()
+    jsonl_path = os.path.splitext(output_path)[0] + '.jsonl' if '--jsonl' in sys.argv else None
+    extractor.extract(jsonl_path)
     extractor.print_summary()
+    if '--memory-report' in sys.argv:
+        extractor.print_memory_report()
     extractor.save(output_path)
+    if '--exam-index' in sys.argv:
+        index_base = os.path.splitext(output_path)[0] + '_考频索引'
+        extractor.export_exam_year_index(index_base + '.json', index_base + '.sql')
     
     print("\n✅ 提取完成!")
     print(f"  - 输出文件: {output_path}")
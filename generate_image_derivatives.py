@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+真题图片衍生图生成工具
+======================
+药一真题图片目前原样复制到 public/，移动端会下载整张原图。
+本工具为每张图片生成多档宽度的缩略图，并输出 WebP / AVIF（环境支持时）及 JPEG 兜底版本：
+
+  - 多进程并行处理；
+  - 按源文件内容哈希跳过未变化的图片（清单中记录哈希与生成参数）；
+  - 输出 manifest.json，前端按需要的显示宽度与浏览器支持的格式选择最小的合适资源；
+    只处理部分目录时保留清单中其他目录的记录，单张图片失败不影响其余图片写入清单。
+
+使用方法：
+  python generate_image_derivatives.py
+  python generate_image_derivatives.py shuju/2024年执业药师中药药一历年真题 --widths 160 480 960
+  python generate_image_derivatives.py --force --workers 4
+
+输入：shuju/*年*药一* 目录中的图片
+输出：public/shuju/derived/（衍生图与 manifest.json）
+"""
+
+import argparse
+import glob
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    print("❌ 需要安装 Pillow")
+    print("   运行：pip install Pillow")
+    exit(1)
+
+from image_catalog import DEFAULT_QUESTION_DIR_PATTERN, describe_image, list_images
+
+
+# 生成参数变化时递增，使旧清单中的记录失效
+MANIFEST_VERSION = 1
+
+DEFAULT_OUTPUT_DIR = 'public/shuju/derived'
+DEFAULT_URL_PREFIX = '/shuju/derived'
+DEFAULT_SOURCE_ROOT = 'shuju'
+DEFAULT_WIDTHS = [160, 480, 960]
+
+# 格式 -> (Pillow 格式名, 扩展名, 保存参数)
+FORMATS = {
+    'avif': ('AVIF', '.avif', {'quality': 55}),
+    'webp': ('WEBP', '.webp', {'quality': 78, 'method': 6}),
+    'jpeg': ('JPEG', '.jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def available_formats() -> List[str]:
+    """当前 Pillow 支持的输出格式（AVIF 需要 Pillow 11.3+ 或 pillow-avif-plugin）"""
+    formats = []
+    for name in FORMATS:
+        if name == 'webp' and not features.check('webp'):
+            continue
+        if name == 'avif' and not features.check('avif'):
+            try:
+                import pillow_avif  # noqa: F401  注册 AVIF 编码器
+            except ImportError:
+                continue
+        formats.append(name)
+    return formats
+
+
+def target_widths(width: int, widths: List[int]) -> List[int]:
+    """不放大：只保留小于原图的档位，并始终包含原始宽度"""
+    return sorted({w for w in widths if w < width} | {width})
+
+
+def render_derivatives(task: Tuple[str, str, str, List[int], List[str]]) -> List[Dict]:
+    """生成单张图片的全部衍生图（在子进程中执行）"""
+    source, sha256, output_dir, widths, formats = task
+    variants = []
+
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+        for width in target_widths(image.width, widths):
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+
+            for fmt in formats:
+                pil_format, ext, options = FORMATS[fmt]
+                frame = resized.convert('RGB') if fmt == 'jpeg' and has_alpha else resized
+                filename = f"{sha256[:16]}-{width}{ext}"
+                path = os.path.join(output_dir, filename)
+                frame.save(path, pil_format, **options)
+                variants.append({
+                    'file': filename,
+                    'format': fmt,
+                    'width': width,
+                    'height': height,
+                    'bytes': os.path.getsize(path),
+                })
+
+    variants.sort(key=lambda v: (v['width'], v['bytes']))
+    return variants
+
+
+def render_safely(task: Tuple[str, str, str, List[int], List[str]]) -> Tuple[List[Dict], str]:
+    """render_derivatives 的包装：返回 (衍生图, 错误信息)，单张图片损坏不会中断整个进程池"""
+    try:
+        return render_derivatives(task), ''
+    except Exception as e:
+        return [], f"{type(e).__name__}: {e}"
+
+
+def load_manifest(path: str) -> Dict:
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == MANIFEST_VERSION:
+            return manifest
+    return {}
+
+
+def is_up_to_date(entry: Dict, sha256: str, settings: Dict, output_dir: str) -> bool:
+    """源文件哈希与生成参数都未变化，且衍生图仍在磁盘上"""
+    return (entry.get('sha256') == sha256
+            and entry.get('settings') == settings
+            and all(os.path.exists(os.path.join(output_dir, v['file'])) for v in entry.get('variants', [])))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='真题图片缩略图与 WebP/AVIF 衍生图生成')
+    parser.add_argument('dirs', nargs='*', help='图片目录，默认匹配 shuju/*年*药一*')
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help='衍生图输出目录')
+    parser.add_argument('--source-root', default=DEFAULT_SOURCE_ROOT, help='清单中源图片路径的相对根目录')
+    parser.add_argument('--url-prefix', default=DEFAULT_URL_PREFIX, help='衍生图在前端的 URL 前缀')
+    parser.add_argument('--widths', nargs='+', type=int, default=DEFAULT_WIDTHS, help='目标宽度档位')
+    parser.add_argument('--force', action='store_true', help='忽略哈希，全部重新生成')
+    parser.add_argument('--workers', '-w', type=int, default=os.cpu_count() or 1, help='并行进程数')
+
+    args = parser.parse_args()
+
+    print("=== 真题图片衍生图生成 ===\n")
+
+    formats = available_formats()
+    if 'avif' not in formats:
+        print("⚠️ 当前 Pillow 不支持 AVIF，仅生成 WebP/JPEG")
+    settings = {'widths': sorted(args.widths), 'formats': formats}
+
+    dirs = args.dirs or sorted(d for d in glob.glob(DEFAULT_QUESTION_DIR_PATTERN) if os.path.isdir(d))
+    os.makedirs(args.output_dir, exist_ok=True)
+    manifest_path = os.path.join(args.output_dir, 'manifest.json')
+    previous = load_manifest(manifest_path).get('images', {})
+
+    # 本次未处理的目录沿用旧清单中的记录，避免只传一个目录时清掉其他目录
+    prefixes = tuple(os.path.relpath(d, args.source_root).replace(os.sep, '/').rstrip('/') + '/' for d in dirs)
+    images: Dict[str, Dict] = {key: entry for key, entry in previous.items() if not key.startswith(prefixes)}
+    kept = len(images)
+    tasks = []
+    skipped = 0
+    for directory in dirs:
+        for source in list_images(directory):
+            key = os.path.relpath(source, args.source_root).replace(os.sep, '/')
+            info = describe_image(source)
+            entry = previous.get(key, {})
+            if not args.force and is_up_to_date(entry, info['sha256'], settings, args.output_dir):
+                images[key] = entry
+                skipped += 1
+                continue
+            images[key] = {
+                'sha256': info['sha256'],
+                'width': info['width'],
+                'height': info['height'],
+                'bytes': info['bytes'],
+                'settings': settings,
+            }
+            tasks.append((key, (source, info['sha256'], args.output_dir, settings['widths'], formats)))
+
+    print(f"📁 图片 {len(images) - kept} 张：需生成 {len(tasks)}，未变化跳过 {skipped}"
+          f"（其他目录沿用 {kept} 条记录）")
+
+    failed = []
+    if tasks:
+        with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            results = pool.map(render_safely, [task for _, task in tasks])
+            for (key, _), (variants, error) in zip(tasks, results):
+                if error:
+                    # 生成失败：保留旧记录（旧衍生图仍可用），没有旧记录则不写入清单
+                    failed.append(key)
+                    if previous.get(key, {}).get('variants'):
+                        images[key] = previous[key]
+                    else:
+                        del images[key]
+                    print(f"   ❌ {key}: {error}")
+                    continue
+                for variant in variants:
+                    variant['url'] = f"{args.url_prefix}/{variant['file']}"
+                images[key]['variants'] = variants
+                print(f"   ✅ {key} -> {len(variants)} 个衍生图")
+
+    original_bytes = sum(entry['bytes'] for entry in images.values())
+    smallest_bytes = sum(min((v['bytes'] for v in entry['variants']), default=entry['bytes'])
+                         for entry in images.values())
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'generated_at': datetime.now().isoformat(),
+        'formats': formats,
+        'widths': settings['widths'],
+        'images': dict(sorted(images.items())),
+    }
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    print(f"\n📊 原图合计 {original_bytes:,} 字节，最小衍生图合计 {smallest_bytes:,} 字节")
+    if failed:
+        print(f"⚠️ 生成失败 {len(failed)} 张，已跳过")
+    print(f"✅ 清单已写出: {manifest_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图片目录生成工具
+================
+汇总版面提取图片（shuju/images）与历年真题图片（shuju/*药一* 目录），
+对每个文件计算内容哈希、字节数与宽高，按哈希去重，
+并把每张图片关联到页码、考点（来自提取结果）或题号/选项（来自文件名）。
+
+上传脚本只需推送 images 中的唯一文件（storage_key 按内容寻址），
+前端可依据宽高与字节数选择合适尺寸的资源。
+
+使用方法：
+  python image_catalog.py
+  python image_catalog.py --extraction shuju/西药药二_知识点_完整版.json --output shuju/image_catalog.json
+
+输入：提取结果 JSON（图片引用/表格数据）、图片目录
+输出：shuju/image_catalog.json
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import struct
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+DEFAULT_EXTRACTION = 'shuju/西药药二_知识点_完整版.json'
+DEFAULT_IMAGES_DIR = 'shuju/images'
+DEFAULT_QUESTION_DIR_PATTERN = 'shuju/*年*药一*'
+DEFAULT_OUTPUT = 'shuju/image_catalog.json'
+
+IMAGE_EXTS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp'}
+
+# 真题图片文件名：37_A.jpg、37-E.jpg、52-53-A .jpeg（共用题干的题号区间）
+QUESTION_IMAGE_PATTERN = re.compile(r'^(\d+)(?:-(\d+))?\s*[-_]\s*([A-Ea-e])\s*$')
+YEAR_PATTERN = re.compile(r'(20\d{2})年')
+
+# JPEG 帧头标记（SOF0-SOF15，除去 DHT/JPG/DAC）
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+                    0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def image_dimensions(data: bytes) -> Optional[Tuple[int, int]]:
+    """从文件头解析图片宽高（JPEG/PNG/GIF/WebP/BMP），无法识别返回 None"""
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and len(data) >= 24:
+        return struct.unpack('>II', data[16:24])
+
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return struct.unpack('<HH', data[6:10])
+
+    if data[:2] == b'BM' and len(data) >= 26:
+        width, height = struct.unpack('<ii', data[18:26])
+        return width, abs(height)
+
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        chunk = data[12:16]
+        if chunk == b'VP8 ' and len(data) >= 30:
+            width, height = struct.unpack('<HH', data[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        if chunk == b'VP8L' and len(data) >= 25:
+            bits = int.from_bytes(data[21:25], 'little')
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b'VP8X' and len(data) >= 30:
+            return (int.from_bytes(data[24:27], 'little') + 1,
+                    int.from_bytes(data[27:30], 'little') + 1)
+        return None
+
+    if data[:2] == b'\xff\xd8':
+        pos = 2
+        while pos + 9 < len(data):
+            if data[pos] != 0xFF:
+                pos += 1
+                continue
+            marker = data[pos + 1]
+            if marker == 0xFF:
+                pos += 1
+                continue
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+                pos += 2
+                continue
+            length = struct.unpack('>H', data[pos + 2:pos + 4])[0]
+            if marker in JPEG_SOF_MARKERS:
+                height, width = struct.unpack('>HH', data[pos + 5:pos + 9])
+                return width, height
+            pos += 2 + length
+    return None
+
+
+def describe_image(path: str) -> Dict:
+    """读取一次文件，得到哈希、字节数、格式与宽高"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    dims = image_dimensions(data)
+    ext = os.path.splitext(path)[1].lower().strip()
+    return {
+        'sha256': hashlib.sha256(data).hexdigest(),
+        'bytes': len(data),
+        'format': 'jpeg' if ext in ('.jpg', '.jpeg') else ext.lstrip('.'),
+        'width': dims[0] if dims else None,
+        'height': dims[1] if dims else None,
+    }
+
+
+def list_images(directory: str) -> List[str]:
+    """递归列出目录下的图片文件"""
+    paths = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if os.path.splitext(name)[1].lower().strip() in IMAGE_EXTS:
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def layout_references(extraction_path: str, images_dir: str) -> Dict[str, List[Dict]]:
+    """从提取结果读取版面图片的页码/小节/考点关联"""
+    refs: Dict[str, List[Dict]] = defaultdict(list)
+    if not extraction_path or not os.path.exists(extraction_path):
+        return refs
+
+    with open(extraction_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    for img_path, info in data.get('图片引用', {}).items():
+        ref = {'kind': 'layout', 'page_idx': info.get('page_idx')}
+        for key in ('section', 'exam_point'):
+            if info.get(key):
+                ref[key] = info[key]
+        refs[os.path.join(images_dir, img_path)].append(ref)
+
+    for table in data.get('表格数据', []):
+        if table.get('来源图片'):
+            refs[os.path.join(images_dir, table['来源图片'])].append({
+                'kind': 'table', 'page_idx': table.get('页码'), 'title': table.get('标题', '')
+            })
+
+    return refs
+
+
+def question_references(directory: str) -> Dict[str, List[Dict]]:
+    """按文件名把真题图片关联到年份/题号/选项"""
+    refs: Dict[str, List[Dict]] = defaultdict(list)
+    year_match = YEAR_PATTERN.search(os.path.basename(directory))
+    question_files = sorted(glob.glob(os.path.join(directory, '*.json')))
+    question_file = question_files[0] if len(question_files) == 1 else None
+
+    known_numbers = None
+    if question_file:
+        with open(question_file, 'r', encoding='utf-8') as f:
+            known_numbers = {q.get('number') for q in json.load(f) if isinstance(q, dict)}
+
+    for path in list_images(directory):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        match = QUESTION_IMAGE_PATTERN.match(stem.strip())
+        if not match:
+            continue
+        first = int(match.group(1))
+        last = int(match.group(2) or first)
+        for number in range(first, last + 1):
+            ref = {
+                'kind': 'question',
+                'year': int(year_match.group(1)) if year_match else None,
+                'question_number': number,
+                'option': match.group(3).upper(),
+            }
+            if question_file:
+                ref['question_file'] = question_file
+                ref['question_found'] = number in known_numbers
+            refs[path].append(ref)
+
+    return refs
+
+
+def build_catalog(images_dir: str, question_dirs: List[str], extraction_path: Optional[str]) -> Dict:
+    """扫描图片、按内容哈希去重并汇总关联信息"""
+    references: Dict[str, List[Dict]] = layout_references(extraction_path, images_dir)
+    paths = list_images(images_dir) if os.path.isdir(images_dir) else []
+    for directory in question_dirs:
+        for path, refs in question_references(directory).items():
+            references[path].extend(refs)
+        paths.extend(list_images(directory))
+
+    missing = sorted(path for path in references if not os.path.exists(path))
+
+    entries: Dict[str, Dict] = {}
+    total_bytes = 0
+    for path in sorted(set(paths)):
+        info = describe_image(path)
+        total_bytes += info['bytes']
+        entry = entries.get(info['sha256'])
+        if entry is None:
+            ext = '.jpg' if info['format'] == 'jpeg' else f".{info['format']}"
+            entry = entries[info['sha256']] = dict(
+                info,
+                storage_key=f"{info['sha256'][:2]}/{info['sha256']}{ext}",
+                paths=[],
+                references=[],
+            )
+        entry['paths'].append(path)
+        entry['references'].extend(references.get(path, []))
+
+    unique_bytes = sum(entry['bytes'] for entry in entries.values())
+    images = sorted(entries.values(), key=lambda e: e['paths'][0])
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'statistics': {
+            'files': len(set(paths)),
+            'unique_images': len(entries),
+            'duplicate_files': len(set(paths)) - len(entries),
+            'total_bytes': total_bytes,
+            'unique_bytes': unique_bytes,
+            'unreferenced_images': sum(1 for e in images if not e['references']),
+            'missing_references': missing,
+        },
+        'images': images,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='图片目录：哈希去重、尺寸与页码/考点/题目关联')
+    parser.add_argument('--extraction', default=DEFAULT_EXTRACTION, help='提取结果 JSON（含图片引用）')
+    parser.add_argument('--images-dir', default=DEFAULT_IMAGES_DIR, help='版面图片目录')
+    parser.add_argument('--question-dirs', nargs='*', help='真题图片目录，默认匹配 shuju/*年*药一*')
+    parser.add_argument('--output', '-o', default=DEFAULT_OUTPUT, help='输出文件')
+
+    args = parser.parse_args()
+
+    print("=== 图片目录生成 ===\n")
+    question_dirs = args.question_dirs
+    if question_dirs is None:
+        question_dirs = sorted(d for d in glob.glob(DEFAULT_QUESTION_DIR_PATTERN) if os.path.isdir(d))
+
+    catalog = build_catalog(args.images_dir, question_dirs, args.extraction)
+    stats = catalog['statistics']
+
+    print("📊 统计:")
+    print(f"   - 图片文件: {stats['files']}")
+    print(f"   - 唯一图片: {stats['unique_images']} (重复 {stats['duplicate_files']})")
+    print(f"   - 总字节: {stats['total_bytes']:,} -> 去重后 {stats['unique_bytes']:,}")
+    print(f"   - 未被引用: {stats['unreferenced_images']}")
+    if stats['missing_references']:
+        print(f"   ⚠️  引用但不存在: {len(stats['missing_references'])}")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(catalog, f, ensure_ascii=False, indent=2)
+
+    print(f"\n✅ 已写出: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+章节练习题库导入工具
+====================
+把 shuju/执业药师西药二1200题原.json 这类按章节整理的题库
+（chapter/section/qtype/qno/stem/options{A..E}/answer/explanation）导入 questions 表：
+
+  - 逐题流式读取（复用 normalize_layout.JsonStreamReader），不一次性载入整个文件；
+  - 章节号与小节号映射到提取脚本生成的知识树节点 id（{subject_code}_{章}.{节}），
+    先按编号、编号对不上时按小节标题在知识树中查找，结果写入 knowledge_points；
+  - 以题库中稳定的 question_id 作为 questions.id，输出 psql 可直接执行的 COPY 载荷：
+    COPY 到临时表后一次性 INSERT ... ON CONFLICT (id) DO UPDATE，重复导入不会产生重复题。
+
+使用方法：
+  python import_chapter_questions.py
+  python import_chapter_questions.py shuju/执业药师西药二1200题原.json --tree shuju/西药药二_合并完整版.json
+  psql "$DATABASE_URL" -f shuju/西药药二1200题_导入.sql
+  python import_chapter_questions.py --execute          # 需要环境变量 DATABASE_URL
+
+输出：shuju/西药药二1200题_导入.sql（COPY 载荷）
+"""
+
+import argparse
+import io
+import json
+import os
+import re
+import time
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+from cn_numerals import CN_NUMERAL_CHARS, cn_to_num
+from normalize_layout import JsonStreamReader, detect_encoding
+from pg_copy import DEFAULT_SUBJECT_CODE, copy_text, pg_text_array
+
+
+DEFAULT_INPUT = 'shuju/执业药师西药二1200题原.json'
+DEFAULT_TREE = 'shuju/西药药二_合并完整版.json'
+DEFAULT_OUTPUT = 'shuju/西药药二1200题_导入.sql'
+DEFAULT_SUBJECT = '药学专业知识（二）'
+
+EXAM_TYPE = '执业药师'
+SOURCE_TYPE = '章节练习'
+DEFAULT_DIFFICULTY = 2
+
+QTYPE_MAP = {
+    '单项选择题': 'single',
+    '最佳选择题': 'single',
+    '配伍选择题': 'single',
+    '综合分析题': 'single',
+    '多项选择题': 'multiple',
+}
+
+COLUMNS = ['id', 'exam_type', 'subject', 'chapter', 'question_type', 'question_number',
+           'content', 'options', 'correct_answer', 'explanation', 'difficulty',
+           'knowledge_points', 'source_type', 'is_published']
+
+CHAPTER_NUM_PATTERN = re.compile(rf'第([{CN_NUMERAL_CHARS}\d]+)章')
+SECTION_NUM_PATTERN = re.compile(rf'第([{CN_NUMERAL_CHARS}\d]+)节')
+# OCR 中希腊字母可能丢失或写成 LaTeX（\beta），比对时一并去掉
+TITLE_NOISE = re.compile(r'\\beta|β|[\s、，,．.·：:（）()]')
+
+
+def normalize_title(title: str) -> str:
+    """去掉章节编号、空白与标点，用于标题比对"""
+    title = SECTION_NUM_PATTERN.sub('', CHAPTER_NUM_PATTERN.sub('', title or ''))
+    return TITLE_NOISE.sub('', title)
+
+
+class KnowledgeTreeIndex:
+    """知识树章/节索引：编号 -> 标题，小节标题 -> 编号"""
+
+    def __init__(self, subject_code: str = DEFAULT_SUBJECT_CODE):
+        self.subject_code = subject_code
+        self.chapters: Dict[str, str] = {}
+        self.sections: Dict[str, str] = {}
+        self.section_by_title: Dict[str, str] = {}
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> 'KnowledgeTreeIndex':
+        """读取提取脚本输出的知识树（chapters[].id/title 或合并版 chapter_number/chapter_title）"""
+        if not path or not os.path.exists(path):
+            return cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            tree = json.load(f)
+
+        subject_code = (tree.get('subject_code')
+                        or tree.get('metadata', {}).get('subject_code')
+                        or DEFAULT_SUBJECT_CODE)
+        index = cls(subject_code)
+        for chapter in tree.get('chapters', []):
+            chapter_code = str(chapter.get('id') or cn_to_num(chapter.get('chapter_number', '')))
+            index.chapters[chapter_code] = chapter.get('title') or chapter.get('chapter_title', '')
+            for section in chapter.get('sections', []):
+                if section.get('id'):
+                    section_code = str(section['id'])
+                else:
+                    section_code = f"{chapter_code}.{cn_to_num(section.get('section_number', ''))}"
+                title = section.get('title') or section.get('section_title', '')
+                index.sections[section_code] = title
+                index.section_by_title.setdefault(normalize_title(title), section_code)
+        return index
+
+    def node_id(self, code: str) -> str:
+        return f"{self.subject_code}_{code}"
+
+    def resolve(self, chapter_code: str, section_no: int, section_title: str) -> Tuple[List[str], str]:
+        """返回 (知识树节点 id 列表, 匹配方式)"""
+        code = f"{chapter_code}.{section_no}"
+        wanted = normalize_title(section_title)
+        if not self.sections:
+            return [self.node_id(chapter_code), self.node_id(code)], 'code'
+
+        if code in self.sections and normalize_title(self.sections[code]) == wanted:
+            return [self.node_id(chapter_code), self.node_id(code)], 'code'
+
+        by_title = self.section_by_title.get(wanted)
+        if by_title and by_title.split('.')[0] == chapter_code:
+            return [self.node_id(chapter_code), self.node_id(by_title)], 'title'
+
+        if code in self.sections:
+            return [self.node_id(chapter_code), self.node_id(code)], 'code_title_mismatch'
+        if chapter_code in self.chapters:
+            return [self.node_id(chapter_code)], 'chapter_only'
+        return [], 'unmatched'
+
+
+def iter_questions(path: str) -> Iterator[Dict]:
+    """流式逐题读取题库数组"""
+    with open(path, 'r', encoding=detect_encoding(path)) as f:
+        reader = JsonStreamReader(f)
+        yield from reader.iter_array()
+
+
+def normalize_answer(answer: str, question_type: str) -> str:
+    letters = ''.join(ch for ch in (answer or '').upper() if 'A' <= ch <= 'E')
+    return ''.join(sorted(set(letters))) if question_type == 'multiple' else letters[:1]
+
+
+def question_section(q: Dict) -> Tuple[str, int, str]:
+    """题目所在 (章编号, 小节号, 小节标题)，编号无法识别时为 '0' / 0"""
+    chapter_match = CHAPTER_NUM_PATTERN.search(q.get('chapter', ''))
+    chapter_code = str(cn_to_num(chapter_match.group(1))) if chapter_match else '0'
+    section_no = q.get('section_no')
+    if not section_no:
+        section_match = SECTION_NUM_PATTERN.search(q.get('section', ''))
+        section_no = cn_to_num(section_match.group(1)) if section_match else 0
+    return chapter_code, int(section_no), q.get('section_title') or q.get('section', '')
+
+
+def build_row(q: Dict, tree: KnowledgeTreeIndex, subject: str) -> Tuple[List, str]:
+    """单题 -> (COPY 行字段, 知识树匹配方式)"""
+    node_ids, match_kind = tree.resolve(*question_section(q))
+
+    question_type = QTYPE_MAP.get(q.get('qtype', ''), 'single')
+    if len(normalize_answer(q.get('answer', ''), 'multiple')) > 1:
+        question_type = 'multiple'   # 自动改判题型时遗漏的多选答案
+    options = [{'key': k, 'value': str(v).strip()} for k, v in sorted((q.get('options') or {}).items())]
+
+    row = [
+        q.get('question_id') or None,
+        EXAM_TYPE,
+        subject,
+        (q.get('chapter') or '').strip(),
+        question_type,
+        q.get('qno'),
+        (q.get('stem') or '').strip(),
+        json.dumps(options, ensure_ascii=False),
+        normalize_answer(q.get('answer', ''), question_type),
+        (q.get('explanation') or '').strip(),
+        DEFAULT_DIFFICULTY,
+        pg_text_array(node_ids),
+        SOURCE_TYPE,
+        True,
+    ]
+    return row, match_kind
+
+
+def write_copy_rows(path: str, tree: KnowledgeTreeIndex, subject: str, out: TextIO) -> Dict:
+    """流式转换并写出 COPY 数据行，返回统计"""
+    stats = {'questions': 0, 'match': Counter(), 'qtype': Counter(), 'missing_id': 0, 'no_answer': 0}
+    seen_ids = set()
+    for q in iter_questions(path):
+        row, match_kind = build_row(q, tree, subject)
+        if row[0] is None or row[0] in seen_ids:
+            stats['missing_id'] += 1
+            continue
+        seen_ids.add(row[0])
+        if not row[8]:
+            stats['no_answer'] += 1
+        stats['questions'] += 1
+        stats['match'][match_kind] += 1
+        stats['qtype'][q.get('qtype', '')] += 1
+        out.write('\t'.join(copy_text(v) for v in row))
+        out.write('\n')
+    return stats
+
+
+def upsert_sql(staging: str) -> str:
+    columns = ', '.join(COLUMNS)
+    updates = ',\n  '.join(f"{c} = EXCLUDED.{c}" for c in COLUMNS if c != 'id')
+    return (f"INSERT INTO questions ({columns})\n"
+            f"SELECT {columns} FROM {staging}\n"
+            f"ON CONFLICT (id) DO UPDATE SET\n  {updates},\n  updated_at = now();\n")
+
+
+STAGING_TABLE = 'questions_chapter_import'
+STAGING_DDL = (f"CREATE TEMP TABLE {STAGING_TABLE} (LIKE questions INCLUDING DEFAULTS) ON COMMIT DROP;\n")
+
+
+def write_payload(input_path: str, output_path: str, tree: KnowledgeTreeIndex, subject: str) -> Dict:
+    """生成 psql 可执行的 COPY 载荷"""
+    with open(output_path, 'w', encoding='utf-8') as out:
+        out.write("-- 章节练习题库导入 - 由 import_chapter_questions.py 生成\n")
+        out.write(f"-- 数据来源：{input_path}\n")
+        out.write(f"-- 知识树：{tree.subject_code}（{len(tree.sections)} 个小节）\n\n")
+        out.write("BEGIN;\n\n")
+        out.write(STAGING_DDL)
+        out.write(f"COPY {STAGING_TABLE} ({', '.join(COLUMNS)}) FROM stdin;\n")
+        stats = write_copy_rows(input_path, tree, subject, out)
+        out.write("\\.\n\n")
+        out.write(upsert_sql(STAGING_TABLE))
+        out.write("\nCOMMIT;\n")
+    return stats
+
+
+def execute_copy(input_path: str, tree: KnowledgeTreeIndex, subject: str, database_url: str) -> Dict:
+    """通过 psycopg2 copy_expert 在一个事务中写入"""
+    try:
+        import psycopg2
+    except ImportError:
+        print("❌ 需要安装 psycopg2")
+        print("   运行：pip install psycopg2-binary")
+        exit(1)
+
+    buffer = io.StringIO()
+    stats = write_copy_rows(input_path, tree, subject, buffer)
+    buffer.seek(0)
+
+    conn = psycopg2.connect(database_url)
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(STAGING_DDL)
+                cur.copy_expert(f"COPY {STAGING_TABLE} ({', '.join(COLUMNS)}) FROM STDIN", buffer)
+                cur.execute(upsert_sql(STAGING_TABLE))
+                stats['upserted'] = cur.rowcount
+    finally:
+        conn.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='章节练习题库导入（知识树关联 + COPY 载荷）')
+    parser.add_argument('input', nargs='?', default=DEFAULT_INPUT, help='题库 JSON 文件')
+    parser.add_argument('--tree', default=DEFAULT_TREE, help='提取脚本生成的知识树 JSON')
+    parser.add_argument('--subject', default=DEFAULT_SUBJECT, help='科目名称')
+    parser.add_argument('--output', '-o', default=DEFAULT_OUTPUT, help='输出 COPY 载荷文件')
+    parser.add_argument('--execute', action='store_true', help='直接写入数据库（读取环境变量 DATABASE_URL）')
+
+    args = parser.parse_args()
+
+    print("=== 章节练习题库导入 ===\n")
+
+    if not os.path.exists(args.input):
+        print(f"❌ 文件不存在：{args.input}")
+        return
+
+    tree = KnowledgeTreeIndex.load(args.tree)
+    if not tree.sections:
+        print(f"⚠️ 未加载知识树（{args.tree}），按章节编号生成节点 id")
+    else:
+        print(f"🌳 知识树: {len(tree.chapters)} 章 {len(tree.sections)} 节")
+
+    started = time.time()
+    if args.execute:
+        database_url = os.environ.get('DATABASE_URL')
+        if not database_url:
+            print("❌ 未设置环境变量 DATABASE_URL")
+            return
+        stats = execute_copy(args.input, tree, args.subject, database_url)
+    else:
+        stats = write_payload(args.input, args.output, tree, args.subject)
+    elapsed = time.time() - started
+
+    print(f"📖 题目 {stats['questions']} 道（{elapsed:.2f} 秒）")
+    for qtype, count in stats['qtype'].most_common():
+        print(f"   - {qtype}: {count}")
+    print("🔗 知识树关联:")
+    for kind, count in stats['match'].most_common():
+        print(f"   - {kind}: {count}")
+    if stats['missing_id']:
+        print(f"⚠️ 缺少或重复 question_id 已跳过: {stats['missing_id']}")
+    if stats['no_answer']:
+        print(f"⚠️ 缺少答案: {stats['no_answer']}")
+
+    if args.execute:
+        print(f"\n✅ 已写入数据库 {stats.get('upserted', 0)} 道")
+    else:
+        print(f"\n✅ COPY 载荷: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+历年真题批量导入工具
+====================
+shuju/ 下的历年真题 JSON（2022-2024 年法规/中药/西药…）统一使用 number/question/options/answer/analysis 结构，
+此前每个文件都要单独运行一个 prisma/import-*-FIXED.ts 脚本逐题写库。
+
+本工具一次完成全部文件：
+  1. 自动发现题目文件，从文件名推断考试类型、科目与年份；
+  2. 把 "A.xxx" / "A. xxx" 选项规范为 [{key, value}]，截掉混入的下一组选项；
+  3. 配伍/综合分析题组的共用选项、合并答案（"C,D,B"）拆回到组内各题，
+     混入解析的答案提取出选项字母；
+  4. 生成单个事务的 SQL（先删除涉及的 科目+年份，再多行 INSERT），
+     或通过 --execute 直接在一个事务中写入数据库。
+
+药一图片题目录（shuju/20*年*药一*/）不在处理范围内：其中的选项是按选项配图的占位，
+图片链接写在 ai_explanation 中，仍由 prisma/import-*-yaoxue-yiyao*.ts 导入，
+本工具即使被显式传入也会跳过，避免删除重导后丢失图片关联。
+
+使用方法：
+  python import_exam_history.py
+  python import_exam_history.py shuju/2024年执业药师法规历年真题.json -o import-2024-fagui.sql
+  python import_exam_history.py --execute          # 需要环境变量 DATABASE_URL
+
+输出：shuju/历年真题_导入.sql
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+DEFAULT_PATTERNS = ['shuju/20*年*.json']
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+DEFAULT_OUTPUT = 'shuju/历年真题_导入.sql'
+
+EXAM_TYPE = '执业药师'
+SOURCE_TYPE = '历年真题'
+DEFAULT_DIFFICULTY = 2
+INSERT_BATCH_SIZE = 500
+
+REQUIRED_KEYS = {'number', 'question', 'options', 'answer'}
+
+# 文件名 -> 科目（按顺序匹配，综合/法规优先于药一/药二）
+SUBJECT_RULES = [
+    (re.compile(r'法规'), '药事管理与法规'),
+    (re.compile(r'中药.*综合'), '中药学综合知识与技能'),
+    (re.compile(r'西药.*综合'), '药学综合知识与技能'),
+    (re.compile(r'中药.*(药一|（一）)'), '中药学专业知识（一）'),
+    (re.compile(r'中药.*(药二|（二）)'), '中药学专业知识（二）'),
+    (re.compile(r'(药一|（一）)'), '药学专业知识（一）'),
+    (re.compile(r'(药二|（二）)'), '药学专业知识（二）'),
+]
+YEAR_PATTERN = re.compile(r'(20\d{2})年')
+
+# 题号区间 -> (章节, 题型)；配伍与综合分析题按组共用选项
+STANDARD_SECTIONS = [
+    (1, 40, '一、最佳选择题', 'single'),
+    (41, 90, '二、配伍选择题', 'single'),
+    (91, 110, '三、综合分析题', 'single'),
+    (111, 120, '四、多项选择题', 'multiple'),
+]
+FAGUI_SECTIONS = [
+    (1, 40, '一、最佳选择题', 'single'),
+    (41, 110, '二、配伍选择题', 'single'),
+    (111, 120, '三、多项选择题', 'multiple'),
+]
+SECTION_LAYOUTS = {'药事管理与法规': FAGUI_SECTIONS}
+GROUPED_SECTIONS = ('配伍选择题', '综合分析题')
+
+OPTION_PATTERN = re.compile(r'^\s*([A-Ea-e])\s*[\.．、:：]\s*(.*)$', re.S)
+ANSWER_PATTERN = re.compile(r'^[A-E](?:[\s,，、]*[A-E])*$')
+ANSWER_IN_TEXT = re.compile(r'(?:正确)?答案(?:是|为|应为|选择|选)?[：:\s]*([A-E]+)')
+LEADING_ANSWER = re.compile(r'^([A-E]+)(?![A-Za-z])')
+ANSWER_SEPARATORS = re.compile(r'[\s,，、]+')
+
+
+@dataclass
+class ExamSource:
+    """一个历年真题文件及其推断出的元数据"""
+    path: str
+    subject: str
+    year: int
+    questions: List[Dict] = field(default_factory=list)
+
+
+def infer_subject(filename: str) -> Optional[str]:
+    for pattern, subject in SUBJECT_RULES:
+        if pattern.search(filename):
+            return subject
+    return None
+
+
+def infer_source(path: str) -> Optional[ExamSource]:
+    """从文件名（或所在目录名）推断科目与年份，无法推断返回 None"""
+    name = os.path.basename(path)
+    parent = os.path.basename(os.path.dirname(path))
+    subject = infer_subject(name) or infer_subject(parent)
+    year_match = YEAR_PATTERN.search(name) or YEAR_PATTERN.search(parent)
+    if not subject or not year_match:
+        return None
+    return ExamSource(path=path, subject=subject, year=int(year_match.group(1)))
+
+
+def is_image_question_dir(path: str) -> bool:
+    """题目文件所在目录（或其 img/ 子目录）带有选项配图：药一图片题目录"""
+    folder = os.path.dirname(path)
+    for directory in (folder, os.path.join(folder, 'img')):
+        if os.path.isdir(directory) and any(name.lower().endswith(IMAGE_EXTENSIONS)
+                                            for name in os.listdir(directory)):
+            return True
+    return False
+
+
+def load_questions(path: str) -> Optional[List[Dict]]:
+    """读取题目数组；不是 number/question/options/answer 结构的文件返回 None"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, list) or not data:
+        return None
+    if not all(isinstance(q, dict) and REQUIRED_KEYS <= q.keys() for q in data):
+        return None
+    return data
+
+
+def discover_sources(inputs: List[str]) -> Tuple[List[ExamSource], List[str]]:
+    """发现题目文件，返回 (可导入的文件, 跳过说明)"""
+    paths = inputs or sorted({p for pattern in DEFAULT_PATTERNS for p in glob.glob(pattern)})
+    sources = []
+    skipped = []
+    for path in paths:
+        if is_image_question_dir(path):
+            skipped.append(f"{path}（药一图片题目录，图片与选项需用 prisma/import-*-yaoxue-yiyao*.ts 导入）")
+            continue
+        source = infer_source(path)
+        if source is None:
+            skipped.append(f"{path}（无法从文件名推断科目/年份）")
+            continue
+        questions = load_questions(path)
+        if questions is None:
+            skipped.append(f"{path}（不是历年真题题目结构）")
+            continue
+        source.questions = questions
+        sources.append(source)
+    return sources, skipped
+
+
+def section_for(number: int, subject: str) -> Tuple[str, str]:
+    for start, end, chapter, question_type in SECTION_LAYOUTS.get(subject, STANDARD_SECTIONS):
+        if start <= number <= end:
+            return chapter, question_type
+    return '未分类', 'single'
+
+
+def parse_options(raw) -> List[Dict[str, str]]:
+    """选项统一为 [{key, value}]；字母重新从 A 开始时视为混入的下一组选项并截断"""
+    if isinstance(raw, dict):
+        return [{'key': str(k).upper(), 'value': str(v).strip()} for k, v in raw.items()]
+
+    options = []
+    seen = set()
+    for idx, item in enumerate(raw or []):
+        if isinstance(item, dict):
+            key, value = str(item.get('key', '')).upper(), str(item.get('value', ''))
+        else:
+            match = OPTION_PATTERN.match(str(item))
+            if match:
+                key, value = match.group(1).upper(), match.group(2)
+            else:
+                key, value = chr(ord('A') + idx), str(item)
+        if key in seen:
+            break
+        seen.add(key)
+        options.append({'key': key, 'value': value.strip()})
+    return options
+
+
+def parse_answer(raw: str) -> Tuple[List[str], str]:
+    """拆分答案，返回 (按题拆开的答案列表, 混入答案字段的解析文字)
+
+    "C" -> ["C"]；"C,D,B" -> ["C", "D", "B"]；"ACD" -> ["ACD"]；
+    "……故正确答案A。" -> ["A"]，原文作为解析返回。
+    """
+    text = (raw or '').strip()
+    if not text:
+        return [], ''
+    if ANSWER_PATTERN.match(text):
+        parts = [p for p in ANSWER_SEPARATORS.split(text) if p]
+        return parts, ''
+    match = ANSWER_IN_TEXT.search(text) or LEADING_ANSWER.match(text)
+    return ([match.group(1)] if match else []), text
+
+
+def normalize_answer(answer: str, question_type: str) -> str:
+    if question_type == 'multiple':
+        return ''.join(sorted(set(answer)))
+    return answer[:1]
+
+
+def normalize_source(source: ExamSource) -> Tuple[List[Dict], List[str]]:
+    """把一个文件的题目转换为 questions 表记录，返回 (记录, 问题列表)"""
+    rows = []
+    issues = []
+    pending: List[Dict] = []   # 题组中答案在组末题上的前序题
+    pending_chapter = None
+
+    for q in sorted(source.questions, key=lambda item: item.get('number') or 0):
+        number = int(q.get('number') or 0)
+        chapter, question_type = section_for(number, source.subject)
+        options = parse_options(q.get('options'))
+        answers, answer_text = parse_answer(str(q.get('answer') or ''))
+        explanation = (q.get('analysis') or '').strip() or answer_text
+
+        row = {
+            'question_number': number,
+            'chapter': chapter,
+            'question_type': question_type,
+            'content': (q.get('question') or '').strip(),
+            'options': options,
+            'correct_answer': '',
+            'explanation': explanation,
+        }
+        rows.append(row)
+
+        if chapter != pending_chapter:
+            pending.clear()
+        grouped = chapter.endswith(GROUPED_SECTIONS)
+        if grouped and not answers:
+            pending.append(row)
+            pending_chapter = chapter
+            continue
+
+        # 组末题："C,D,B" 依次对应组内最后几题，共用选项补给没有选项的前序题
+        group = pending + [row]
+        if 1 < len(answers) <= len(group) and question_type != 'multiple':
+            for member, answer in zip(group[-len(answers):], answers):
+                member['correct_answer'] = normalize_answer(answer, question_type)
+        elif answers:
+            row['correct_answer'] = normalize_answer(''.join(answers), question_type)
+        for member in pending:
+            member['options'] = member['options'] or options
+            member['explanation'] = member['explanation'] or explanation
+        pending.clear()
+
+    for row in rows:
+        if not row['options']:
+            issues.append(f"第{row['question_number']}题缺少选项")
+        if not row['correct_answer']:
+            issues.append(f"第{row['question_number']}题缺少答案")
+
+    for row in rows:
+        row.update({
+            'exam_type': EXAM_TYPE,
+            'subject': source.subject,
+            'source_year': source.year,
+        })
+    return rows, issues
+
+
+COLUMNS = ['exam_type', 'subject', 'chapter', 'question_type', 'question_number', 'content',
+           'options', 'correct_answer', 'explanation', 'difficulty', 'knowledge_points',
+           'source_type', 'source_year', 'is_published']
+
+
+def sql_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def row_values_sql(row: Dict) -> str:
+    options_json = json.dumps(row['options'], ensure_ascii=False)
+    return (f"({sql_literal(row['exam_type'])}, {sql_literal(row['subject'])}, "
+            f"{sql_literal(row['chapter'])}, {sql_literal(row['question_type'])}, "
+            f"{row['question_number']}, {sql_literal(row['content'])}, "
+            f"{sql_literal(options_json)}::jsonb, {sql_literal(row['correct_answer'])}, "
+            f"{sql_literal(row['explanation'])}, {DEFAULT_DIFFICULTY}, '{{}}'::text[], "
+            f"{sql_literal(SOURCE_TYPE)}, {row['source_year']}, true)")
+
+
+def delete_sql(keys: List[Tuple[str, int]]) -> str:
+    pairs = ',\n  '.join(f"({sql_literal(subject)}, {year})" for subject, year in keys)
+    return (f"DELETE FROM questions\n"
+            f"WHERE exam_type = {sql_literal(EXAM_TYPE)}\n"
+            f"  AND (subject, source_year) IN (VALUES\n  {pairs}\n);\n")
+
+
+def build_sql(rows: List[Dict], keys: List[Tuple[str, int]], sources: List[ExamSource]) -> str:
+    """单个事务：先删除涉及的 科目+年份，再分批多行 INSERT"""
+    parts = [
+        "-- ================================================================",
+        "-- 历年真题批量导入 - 由 import_exam_history.py 生成",
+        "-- ================================================================",
+        f"-- 题目总数：{len(rows)} 道，文件 {len(sources)} 个",
+        f"-- 生成时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+    ]
+    parts += [f"--   {s.year} {s.subject}: {s.path}" for s in sources]
+    parts += ["-- ================================================================", "", "BEGIN;", "",
+              delete_sql(keys)]
+
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        batch = rows[start:start + INSERT_BATCH_SIZE]
+        parts.append(f"INSERT INTO questions ({', '.join(COLUMNS)}) VALUES")
+        parts.append(',\n'.join(row_values_sql(row) for row in batch) + ';\n')
+
+    parts += ["COMMIT;", ""]
+    return '\n'.join(parts)
+
+
+def execute_import(rows: List[Dict], keys: List[Tuple[str, int]], database_url: str) -> int:
+    """在一个事务中删除旧数据并批量写入，返回删除的旧记录数"""
+    try:
+        import psycopg2
+        from psycopg2.extras import execute_values
+    except ImportError:
+        print("❌ 需要安装 psycopg2")
+        print("   运行：pip install psycopg2-binary")
+        exit(1)
+
+    values = [
+        (row['exam_type'], row['subject'], row['chapter'], row['question_type'],
+         row['question_number'], row['content'], json.dumps(row['options'], ensure_ascii=False),
+         row['correct_answer'], row['explanation'], DEFAULT_DIFFICULTY, [],
+         SOURCE_TYPE, row['source_year'], True)
+        for row in rows
+    ]
+    template = '(%s, %s, %s, %s, %s, %s, %s::jsonb, %s, %s, %s, %s::text[], %s, %s, %s)'
+
+    conn = psycopg2.connect(database_url)
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                placeholders = ', '.join(['(%s, %s)'] * len(keys))
+                cur.execute(
+                    f"DELETE FROM questions WHERE exam_type = %s "
+                    f"AND (subject, source_year) IN ({placeholders})",
+                    [EXAM_TYPE] + [v for key in keys for v in key],
+                )
+                deleted = cur.rowcount
+                execute_values(
+                    cur,
+                    f"INSERT INTO questions ({', '.join(COLUMNS)}) VALUES %s",
+                    values,
+                    template=template,
+                    page_size=INSERT_BATCH_SIZE,
+                )
+    finally:
+        conn.close()
+    return deleted
+
+
+def main():
+    parser = argparse.ArgumentParser(description='历年真题 JSON 批量导入（单事务）')
+    parser.add_argument('inputs', nargs='*', help='题目 JSON 文件，默认自动发现 shuju/ 下的历年真题')
+    parser.add_argument('--output', '-o', default=DEFAULT_OUTPUT, help='输出 SQL 文件')
+    parser.add_argument('--execute', action='store_true', help='直接写入数据库（读取环境变量 DATABASE_URL）')
+
+    args = parser.parse_args()
+
+    print("=== 历年真题批量导入 ===\n")
+
+    sources, skipped = discover_sources(args.inputs)
+    for note in skipped:
+        print(f"⚠️ 跳过: {note}")
+    if not sources:
+        print("❌ 没有找到可导入的历年真题文件")
+        return
+
+    keys_seen = Counter((s.subject, s.year) for s in sources)
+    for (subject, year), count in keys_seen.items():
+        if count > 1:
+            print(f"❌ {year} {subject} 对应 {count} 个文件，请只保留一个或显式指定输入文件")
+            return
+
+    rows: List[Dict] = []
+    issue_counts: Dict[str, List[str]] = defaultdict(list)
+    for source in sources:
+        source_rows, issues = normalize_source(source)
+        rows.extend(source_rows)
+        issue_counts[source.path] = issues
+        flag = f"，⚠️ {len(issues)} 个问题" if issues else ''
+        print(f"📖 {source.year} {source.subject}: {len(source_rows)} 道{flag}")
+        for issue in issues[:3]:
+            print(f"   - {issue}")
+        if len(issues) > 3:
+            print(f"   ... 还有 {len(issues) - 3} 个问题")
+
+    keys = sorted(keys_seen)
+    type_count = Counter(row['question_type'] for row in rows)
+    print(f"\n📊 合计 {len(rows)} 道（{len(sources)} 个文件，"
+          f"{', '.join(f'{t} {n}' for t, n in sorted(type_count.items()))}）")
+
+    if args.execute:
+        database_url = os.environ.get('DATABASE_URL')
+        if not database_url:
+            print("❌ 未设置环境变量 DATABASE_URL")
+            return
+        deleted = execute_import(rows, keys, database_url)
+        print(f"✅ 已在一个事务中删除旧数据 {deleted} 条并写入 {len(rows)} 道")
+        return
+
+    sql = build_sql(rows, keys, sources)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write(sql)
+    print(f"✅ SQL文件: {args.output} ({len(sql) / 1024:.1f} KB)")
+
+
+if __name__ == '__main__':
+    main()
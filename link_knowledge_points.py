@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+题目-考点批量关联工具
+====================
+question_parser.py 等解析器里的 _extract_knowledge_points 只返回 ['综合知识'] 之类的占位，
+本工具用倒排索引把整个题库一次性关联到具体考点：
+
+  - 考点语料：shuju/执业药师西药二考点/*.txt（文件名给出 code 与标题，正文为各阶段模块），
+    以及 西药药二_知识点_完整版.json 中的药物名；
+  - 索引词：中文按二元组（bigram）切分，英文/数字按词；标题词与药物名单独加权，
+    正文用 BM25 归一化，出现在过多考点里的泛用词直接剔除；
+  - 打分：每道题的题干 + 解析只查一次倒排表，累加得分；与题目同一小节 / 同一章的考点额外加权；
+  - 写回：questions.knowledge_points = [章节点, 小节节点, 考点节点...]，
+    knowledge_points.related_questions = 关联题目 id（按 subject+chapter+section+point_name upsert，
+    只写有关联题目的考点，不会把已有行的 related_questions 清空）。
+
+question_parser*.py 的占位保持不变：它们解析的是中药历年真题，而考点语料只覆盖西药二，
+直接接入只会产生错误关联；其输出应经 import_exam_history.py 入库后再按对应科目的考点语料关联。
+
+使用方法：
+  python link_knowledge_points.py
+  python link_knowledge_points.py shuju/执业药师西药二1200题原.json --top-k 3
+  psql "$DATABASE_URL" -f shuju/题目考点关联_导入.sql
+  python link_knowledge_points.py --execute          # 需要环境变量 DATABASE_URL
+
+输出：shuju/题目考点关联_导入.sql（COPY 载荷）、shuju/题目考点关联报告.json
+"""
+
+import argparse
+import glob
+import io
+import json
+import math
+import os
+import re
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, TextIO, Tuple
+
+from extract_point_blocks import DEFAULT_POINT_DIR, code_from_filename, parse_point_text
+from import_chapter_questions import (DEFAULT_INPUT, DEFAULT_TREE, EXAM_TYPE, KnowledgeTreeIndex,
+                                      iter_questions, question_section)
+from normalize_layout import normalize_text
+from pg_copy import DEFAULT_SUBJECT_CODE, copy_text, pg_text_array
+
+
+DEFAULT_DRUGS = 'shuju/西药药二_知识点_完整版.json'
+DEFAULT_OUTPUT = 'shuju/题目考点关联_导入.sql'
+DEFAULT_REPORT = 'shuju/题目考点关联报告.json'
+
+TOP_K = 3
+MIN_SCORE = 8.0
+RELATIVE_SCORE = 0.6       # 低于最高分该比例的考点不再关联
+MAX_DF_RATIO = 0.3         # 出现在超过 30% 考点中的词视为泛用词
+
+TITLE_BOOST = 3.0
+DRUG_BOOST = 4.0
+SECTION_PRIOR = 1.6
+CHAPTER_PRIOR = 1.2
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+CJK_RUN = re.compile(r'[一-鿿]+')
+ASCII_WORD = re.compile(r'[a-z][a-z0-9\-]+|\d+[a-z]+[a-z0-9]*')
+
+
+@dataclass
+class KnowledgePoint:
+    """一个考点（对应一个考点文件）"""
+    code: str                 # C13.2.2
+    title: str
+    body: str
+    drugs: Set[str] = field(default_factory=set)
+
+    @property
+    def chapter(self) -> str:
+        return self.code.split('.')[0]
+
+    @property
+    def section(self) -> str:
+        return '.'.join(self.code.split('.')[:2])
+
+
+def tokenize(text: str) -> List[str]:
+    """中文二元组 + 英文/数字词（单字片段保留为一元组）"""
+    text = normalize_text(text or '').lower()
+    tokens = []
+    for run in CJK_RUN.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    tokens.extend(ASCII_WORD.findall(text))
+    return tokens
+
+
+def title_from_filename(filename: str) -> str:
+    """c1.2.3苯妥英钠的临床用药评价.txt -> 苯妥英钠的临床用药评价"""
+    stem = os.path.splitext(filename)[0]
+    match = re.match(r'^[cC]\d+\.\d+\.\d+', stem)
+    return stem[match.end():].strip() if match else stem.strip()
+
+
+def load_points(point_dir: str) -> List[KnowledgePoint]:
+    points: Dict[str, KnowledgePoint] = {}
+    for path in sorted(glob.glob(os.path.join(point_dir, '*.txt'))):
+        filename = os.path.basename(path)
+        code = code_from_filename(filename)
+        if not code:
+            continue
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            text = f.read()
+        blocks, _ = parse_point_text(text, code)
+        body = '\n'.join(block.content for block in blocks) if blocks else text
+        points[code] = KnowledgePoint(code, title_from_filename(filename), body)
+    return list(points.values())
+
+
+def load_drug_names(path: str) -> List[str]:
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    names = data.get('药物信息', {}) if isinstance(data, dict) else {}
+    return sorted({name.strip() for name in names if len(name.strip()) >= 2}, key=len, reverse=True)
+
+
+class PointIndex:
+    """考点倒排索引：词 -> [(考点下标, 权重)]，权重已含 idf"""
+
+    def __init__(self, points: List[KnowledgePoint], drug_names: List[str]):
+        self.points = points
+        self.postings: Dict[str, List[Tuple[int, float]]] = {}
+        self.drug_pattern = re.compile('|'.join(map(re.escape, drug_names))) if drug_names else None
+        self.dropped_terms = 0
+        self._build()
+
+    def drugs_in(self, text: str) -> Set[str]:
+        return set(self.drug_pattern.findall(text)) if self.drug_pattern else set()
+
+    def _build(self):
+        n = len(self.points)
+        body_tf: List[Counter] = []
+        title_terms: List[Set[str]] = []
+        for point in self.points:
+            point.drugs = self.drugs_in(point.title + point.body)
+            body_tf.append(Counter(tokenize(point.body)))
+            title_terms.append(set(tokenize(point.title)) | {f"药:{d}" for d in self.drugs_in(point.title)})
+
+        df = Counter()
+        for tf, title, point in zip(body_tf, title_terms, self.points):
+            df.update(set(tf) | title | {f"药:{d}" for d in point.drugs})
+
+        avg_len = sum(sum(tf.values()) for tf in body_tf) / max(1, n)
+        postings = defaultdict(list)
+        for idx, (tf, title, point) in enumerate(zip(body_tf, title_terms, self.points)):
+            length_norm = BM25_K1 * (1 - BM25_B + BM25_B * sum(tf.values()) / max(1.0, avg_len))
+            weights = {term: count * (BM25_K1 + 1) / (count + length_norm) for term, count in tf.items()}
+            for term in title:
+                weights[term] = weights.get(term, 0.0) + TITLE_BOOST
+            for drug in point.drugs:
+                key = f"药:{drug}"
+                weights[key] = weights.get(key, 0.0) + DRUG_BOOST
+            for term, weight in weights.items():
+                postings[term].append((idx, weight))
+
+        max_df = max(2, int(n * MAX_DF_RATIO))
+        for term, plist in postings.items():
+            if df[term] > max_df:
+                self.dropped_terms += 1
+                continue
+            idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+            self.postings[term] = [(idx, weight * idf) for idx, weight in plist]
+
+    def query_terms(self, text: str) -> Set[str]:
+        return set(tokenize(text)) | {f"药:{d}" for d in self.drugs_in(text)}
+
+    def score(self, text: str) -> Dict[int, float]:
+        scores: Dict[int, float] = defaultdict(float)
+        for term in self.query_terms(text):
+            for idx, weight in self.postings.get(term, ()):
+                scores[idx] += weight
+        return scores
+
+
+def link_question(index: PointIndex, q: Dict, top_k: int) -> Tuple[List[Tuple[int, float]], str]:
+    """返回 ([(考点下标, 得分)], 题目所在小节 code)"""
+    chapter_code, section_no, _ = question_section(q)
+    chapter = f"C{chapter_code}"
+    section = f"{chapter}.{section_no}"
+    scores = index.score(f"{q.get('stem', '')}\n{q.get('explanation', '')}")
+    for idx in scores:
+        point = index.points[idx]
+        if point.section == section:
+            scores[idx] *= SECTION_PRIOR
+        elif point.chapter == chapter:
+            scores[idx] *= CHAPTER_PRIOR
+
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+    if not ranked or ranked[0][1] < MIN_SCORE:
+        return [], section
+    best = ranked[0][1]
+    return [(idx, score) for idx, score in ranked if score >= best * RELATIVE_SCORE], section
+
+
+def point_node_id(tree: KnowledgeTreeIndex, code: str) -> str:
+    """C13.2.2 -> {subject_code}_13.2.2，与章/小节节点 id 同一套编号"""
+    return tree.node_id(code.lstrip('Cc'))
+
+
+def link_bank(paths: List[str], index: PointIndex, tree: KnowledgeTreeIndex, top_k: int) -> Dict:
+    question_rows = []
+    related: Dict[int, List[Tuple[float, str]]] = defaultdict(list)
+    stats = {'questions': 0, 'linked': 0, 'unlinked': 0, 'in_section': 0, 'links': 0}
+    unlinked = []
+
+    for path in paths:
+        for q in iter_questions(path):
+            qid = q.get('question_id')
+            if not qid:
+                continue
+            stats['questions'] += 1
+            links, section = link_question(index, q, top_k)
+            node_ids, _ = tree.resolve(*question_section(q))
+            node_ids = node_ids + [point_node_id(tree, index.points[idx].code) for idx, _ in links]
+            question_rows.append([qid, pg_text_array(node_ids)])
+            if not links:
+                stats['unlinked'] += 1
+                unlinked.append({'id': qid, 'section': section, 'stem': (q.get('stem') or '')[:60]})
+                continue
+            stats['linked'] += 1
+            stats['links'] += len(links)
+            stats['in_section'] += index.points[links[0][0]].section == section
+            for idx, score in links:
+                related[idx].append((score, qid))
+
+    # 没有关联题目的考点不写：否则 upsert 会用空数组覆盖库中已有的 related_questions
+    point_rows = []
+    for idx, point in enumerate(index.points):
+        if not related.get(idx):
+            continue
+        qids = [qid for _, qid in sorted(related[idx], reverse=True)]
+        point_rows.append([point.chapter, point.section, point.title, pg_text_array(qids)])
+    stats['points_with_questions'] = len(point_rows)
+
+    return {'question_rows': question_rows, 'point_rows': point_rows, 'stats': stats, 'unlinked': unlinked,
+            'related': {index.points[idx].code: [qid for _, qid in sorted(v, reverse=True)]
+                        for idx, v in related.items()}}
+
+
+QUESTION_STAGING = 'question_links_import'
+POINT_STAGING = 'point_links_import'
+QUESTION_COLUMNS = ['id', 'knowledge_points']
+POINT_COLUMNS = ['chapter', 'section', 'point_name', 'related_questions']
+
+STAGING_DDL = (
+    f"CREATE TEMP TABLE {QUESTION_STAGING} (id TEXT PRIMARY KEY, knowledge_points TEXT[]) ON COMMIT DROP;\n"
+    f"CREATE TEMP TABLE {POINT_STAGING} (chapter TEXT, section TEXT, point_name TEXT, "
+    f"related_questions TEXT[]) ON COMMIT DROP;\n"
+)
+
+
+def apply_sql(subject_code: str) -> str:
+    return (
+        f"UPDATE questions q SET knowledge_points = s.knowledge_points, updated_at = now()\n"
+        f"FROM {QUESTION_STAGING} s WHERE q.id = s.id;\n\n"
+        f"INSERT INTO knowledge_points (exam_type, subject, chapter, section, point_name, related_questions)\n"
+        f"SELECT '{EXAM_TYPE}', '{subject_code}', chapter, section, point_name, related_questions FROM {POINT_STAGING}\n"
+        f"ON CONFLICT (subject, chapter, section, point_name) DO UPDATE SET\n"
+        f"  related_questions = EXCLUDED.related_questions,\n"
+        f"  updated_at = now();\n"
+    )
+
+
+def write_rows(out: TextIO, rows: List[List]):
+    for row in rows:
+        out.write('\t'.join(copy_text(v) for v in row))
+        out.write('\n')
+
+
+def write_payload(output_path: str, result: Dict, subject_code: str):
+    with open(output_path, 'w', encoding='utf-8') as out:
+        out.write("-- 题目-考点关联 - 由 link_knowledge_points.py 生成\n\n")
+        out.write("BEGIN;\n\n")
+        out.write(STAGING_DDL)
+        out.write(f"\nCOPY {QUESTION_STAGING} ({', '.join(QUESTION_COLUMNS)}) FROM stdin;\n")
+        write_rows(out, result['question_rows'])
+        out.write("\\.\n")
+        out.write(f"\nCOPY {POINT_STAGING} ({', '.join(POINT_COLUMNS)}) FROM stdin;\n")
+        write_rows(out, result['point_rows'])
+        out.write("\\.\n\n")
+        out.write(apply_sql(subject_code))
+        out.write("\nCOMMIT;\n")
+
+
+def execute_links(result: Dict, subject_code: str, database_url: str) -> Dict:
+    """通过 psycopg2 copy_expert 在一个事务中写入"""
+    try:
+        import psycopg2
+    except ImportError:
+        print("❌ 需要安装 psycopg2")
+        print("   运行：pip install psycopg2-binary")
+        exit(1)
+
+    conn = psycopg2.connect(database_url)
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(STAGING_DDL)
+                for table, columns, rows in ((QUESTION_STAGING, QUESTION_COLUMNS, result['question_rows']),
+                                             (POINT_STAGING, POINT_COLUMNS, result['point_rows'])):
+                    buffer = io.StringIO()
+                    write_rows(buffer, rows)
+                    buffer.seek(0)
+                    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+                cur.execute(apply_sql(subject_code))
+    finally:
+        conn.close()
+    return result['stats']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='题目-考点批量关联（倒排索引）')
+    parser.add_argument('inputs', nargs='*', default=[DEFAULT_INPUT], help='章节练习题库 JSON')
+    parser.add_argument('--points', default=DEFAULT_POINT_DIR, help='考点文件目录')
+    parser.add_argument('--drugs', default=DEFAULT_DRUGS, help='含“药物信息”的知识点 JSON（药物名词表）')
+    parser.add_argument('--tree', default=DEFAULT_TREE, help='知识树 JSON（章/小节节点 id）')
+    parser.add_argument('--top-k', type=int, default=TOP_K, help='每题最多关联的考点数')
+    parser.add_argument('--output', '-o', default=DEFAULT_OUTPUT, help='输出 COPY 载荷文件')
+    parser.add_argument('--report', default=DEFAULT_REPORT, help='关联报告')
+    parser.add_argument('--execute', action='store_true', help='直接写入数据库（读取环境变量 DATABASE_URL）')
+
+    args = parser.parse_args()
+
+    print("=== 题目-考点批量关联 ===\n")
+
+    missing = [p for p in args.inputs if not os.path.exists(p)]
+    if missing:
+        print(f"❌ 文件不存在：{', '.join(missing)}")
+        return
+
+    started = time.time()
+    points = load_points(args.points)
+    if not points:
+        print(f"❌ 未找到考点文件：{args.points}")
+        return
+    index = PointIndex(points, load_drug_names(args.drugs))
+    tree = KnowledgeTreeIndex.load(args.tree)
+    subject_code = tree.subject_code or DEFAULT_SUBJECT_CODE
+    print(f"📚 考点 {len(points)} 个，索引词 {len(index.postings)}（剔除泛用词 {index.dropped_terms}），"
+          f"{time.time() - started:.2f} 秒")
+
+    started = time.time()
+    result = link_bank(args.inputs, index, tree, args.top_k)
+    stats = result['stats']
+    print(f"🔗 题目 {stats['questions']} 道，关联 {stats['linked']} 道（共 {stats['links']} 条），"
+          f"{time.time() - started:.2f} 秒")
+    if stats['linked']:
+        print(f"   - 首选考点位于题目所在小节: {stats['in_section'] / stats['linked']:.1%}")
+    print(f"   - 有关联题目的考点: {stats['points_with_questions']}/{len(points)}")
+    if stats['unlinked']:
+        print(f"   ⚠️ 未找到足够匹配的题目: {stats['unlinked']}")
+
+    if args.execute:
+        database_url = os.environ.get('DATABASE_URL')
+        if not database_url:
+            print("❌ 未设置环境变量 DATABASE_URL")
+            return
+        execute_links(result, subject_code, database_url)
+        print("\n✅ 已写入数据库")
+    else:
+        write_payload(args.output, result, subject_code)
+        print(f"\n✅ COPY 载荷: {args.output}")
+
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump({'statistics': stats, 'related_questions': result['related'], 'unlinked': result['unlinked']},
+                  f, ensure_ascii=False, indent=2)
+    print(f"✅ 关联报告: {args.report}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+西药药二分块JSON增量提取与合并工具
+==================================
+西药药二按页码拆成多个分块文件（1-50页、50-100页……201-222页、补充），
+本脚本逐个分块独立提取为中间结果，按文件内容哈希缓存，再按章节顺序合并，
+跨分块边界的同一章/节会被拼接而不是丢弃。
+
+只有内容变化的分块才会重新提取，未缓存的分块可以并行处理。
+
+使用方法：
+  python merge_xiyao_er_chunks.py
+  python merge_xiyao_er_chunks.py --workers 4
+  python merge_xiyao_er_chunks.py --no-cache --output shuju/西药药二_合并完整版.json
+
+输入：shuju/执业药师西药二*.json 分块文件
+输出：shuju/西药药二_合并完整版.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from cn_numerals import cn_to_num
+
+
+# 中间结果格式版本，提取逻辑变化时递增以使旧缓存失效
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_DIR = 'shuju/.chunk_cache'
+
+# 分块文件（按页码顺序）
+DEFAULT_CHUNKS = [
+    'shuju/执业药师西药二1-50页修改版.json',
+    'shuju/执业药师西药二50-100页.json',
+    'shuju/执业药师西药二101-150页.json',
+    'shuju/执业药师西药二151-200页.json',
+    'shuju/执业药师药二201-222页.json',
+    'shuju/执业药师西药二补充.normalized.json',
+]
+
+# 参与统计的部分
+COUNTED_PARTS = ['考点梳理', '考点透析', '重点强化']
+
+CHAPTER_PATTERN = re.compile(r'第\s*([一二三四五六七八九十]+)\s*章\s*(.*)')
+SECTION_PATTERN = re.compile(r'第\s*([一二三四五六七八九十]+)\s*节\s*(.*)')
+
+
+def file_hash(path: str) -> str:
+    """计算文件内容的SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _empty_part() -> Dict:
+    return {'general_content': [], 'knowledge_points': []}
+
+
+def _convert_supplement(entries: List[Dict]) -> List[Dict]:
+    """将补充文件的 chapter/section/points 结构转换为分块章节结构"""
+    chapters = []
+    for entry in entries:
+        chapter_match = CHAPTER_PATTERN.search(entry.get('chapter', ''))
+        section_match = SECTION_PATTERN.search(entry.get('section', ''))
+        if not chapter_match or not section_match:
+            continue
+
+        part = _empty_part()
+        for number, point in enumerate(entry.get('points', []), 1):
+            part['knowledge_points'].append({
+                'number': number,
+                'title': point.get('title', ''),
+                'content': [{'type': 'text', 'content': point.get('content', ''),
+                             'images': [], 'ocr_text': ''}]
+            })
+
+        chapters.append({
+            'chapter_number': chapter_match.group(1),
+            'chapter_title': chapter_match.group(2).strip(),
+            'sections': [{
+                'section_number': section_match.group(1),
+                'section_title': section_match.group(2).strip(),
+                'parts': {'考点梳理': part}
+            }]
+        })
+    return chapters
+
+
+def extract_chunk(path: str) -> Dict:
+    """提取单个分块为中间结果
+
+    返回 {'source', 'entries'}，entries 中每条为一个 (章, 节) 片段，
+    章/节号缺失的片段标记为 None，合并时接续上一分块最后的章/节。
+    """
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        data = json.load(f)
+
+    if not isinstance(data, list):
+        raise ValueError(f"不支持的分块格式（需要章节列表）: {path}")
+
+    if data and 'chapter' in data[0] and 'chapter_number' not in data[0]:
+        data = _convert_supplement(data)
+
+    entries = []
+    for chapter in data:
+        chapter_num = cn_to_num(chapter.get('chapter_number', '')) or None
+        chapter_title = (chapter.get('chapter_title') or '').strip()
+        sections = chapter.get('sections', [])
+
+        if not sections:
+            # 只有章标题的续接条目，保留章标题信息
+            entries.append({
+                'chapter_num': chapter_num,
+                'chapter_number': chapter.get('chapter_number', ''),
+                'chapter_title': chapter_title,
+                'section_num': None,
+            })
+            continue
+
+        for section in sections:
+            entries.append({
+                'chapter_num': chapter_num,
+                'chapter_number': chapter.get('chapter_number', ''),
+                'chapter_title': chapter_title,
+                'section_num': cn_to_num(section.get('section_number', '')) or None,
+                'section_number': section.get('section_number', ''),
+                'section_title': (section.get('section_title') or '').strip(),
+                'parts': section.get('parts', {}),
+            })
+
+    return {'source': path, 'entries': entries}
+
+
+def load_or_extract(paths: List[str], cache_dir: Optional[str], workers: int) -> List[Dict]:
+    """按内容哈希读取缓存，未命中的分块并行提取后写回缓存"""
+    results: Dict[str, Dict] = {}
+    pending: List[Tuple[str, str]] = []
+
+    for path in paths:
+        digest = file_hash(path)
+        cache_file = os.path.join(cache_dir, f"v{CACHE_VERSION}-{digest}.json") if cache_dir else None
+        if cache_file and os.path.exists(cache_file):
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            cached['source'] = path
+            results[path] = cached
+            print(f"   ♻️  命中缓存: {path}")
+        else:
+            pending.append((path, cache_file))
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+            extracted = pool.map(extract_chunk, [path for path, _ in pending])
+            for (path, cache_file), chunk in zip(pending, extracted):
+                results[path] = chunk
+                print(f"   ✅ 已提取: {path} ({len(chunk['entries'])} 个片段)")
+                if cache_file:
+                    os.makedirs(cache_dir, exist_ok=True)
+                    with open(cache_file, 'w', encoding='utf-8') as f:
+                        json.dump(chunk, f, ensure_ascii=False)
+
+    return [results[path] for path in paths]
+
+
+def _merge_part(target: Dict, part: Dict):
+    """合并同名部分：通用内容追加，同编号考点拼接内容"""
+    target['general_content'].extend(part.get('general_content', []))
+
+    existing = {(p.get('number'), p.get('title')): p for p in target['knowledge_points']}
+    for point in part.get('knowledge_points', []):
+        key = (point.get('number'), point.get('title'))
+        if key in existing:
+            existing[key]['content'].extend(point.get('content', []))
+        else:
+            merged = dict(point)
+            merged['content'] = list(point.get('content', []))
+            target['knowledge_points'].append(merged)
+            existing[key] = merged
+
+
+def merge_chunks(chunks: List[Dict]) -> List[Dict]:
+    """按分块顺序合并片段，保持跨分块的章/节连续性"""
+    chapters: Dict[int, Dict] = {}
+    last_chapter: Optional[int] = None
+    last_section: Optional[int] = None
+
+    for chunk in chunks:
+        for entry in chunk['entries']:
+            chapter_num = entry['chapter_num'] or last_chapter
+            if chapter_num is None:
+                print(f"   ⚠️  无法确定章节，跳过片段: {chunk['source']}")
+                continue
+
+            chapter = chapters.setdefault(chapter_num, {
+                'chapter_number': entry['chapter_number'],
+                'chapter_title': entry['chapter_title'],
+                'sections': {}
+            })
+            if not chapter['chapter_title']:
+                chapter['chapter_title'] = entry['chapter_title']
+
+            if chapter_num != last_chapter:
+                last_section = None
+            last_chapter = chapter_num
+
+            if 'parts' not in entry:
+                continue
+
+            section_num = entry['section_num'] or last_section
+            if section_num is None:
+                print(f"   ⚠️  无法确定小节，跳过片段: {chunk['source']}")
+                continue
+            last_section = section_num
+
+            section = chapter['sections'].setdefault(section_num, {
+                'section_number': entry['section_number'],
+                'section_title': entry['section_title'],
+                'parts': {}
+            })
+            if not section['section_title']:
+                section['section_title'] = entry['section_title']
+
+            for part_name, part in entry['parts'].items():
+                _merge_part(section['parts'].setdefault(part_name, _empty_part()), part)
+
+    merged = []
+    for chapter_num in sorted(chapters):
+        chapter = chapters[chapter_num]
+        chapter['sections'] = [chapter['sections'][n] for n in sorted(chapter['sections'])]
+        merged.append(chapter)
+    return merged
+
+
+def calculate_statistics(chapters: List[Dict], source_files: List[str]) -> Dict:
+    """计算统计信息"""
+    total_sections = 0
+    total_points = 0
+    total_general = 0
+
+    for chapter in chapters:
+        total_sections += len(chapter['sections'])
+        for section in chapter['sections']:
+            parts = section.get('parts', {})
+            for name in COUNTED_PARTS:
+                if name in parts:
+                    total_points += len(parts[name].get('knowledge_points', []))
+                    total_general += len(parts[name].get('general_content', []))
+
+    return {
+        'totalChapters': len(chapters),
+        'totalSections': total_sections,
+        'totalPoints': total_points,
+        'totalGeneralContent': total_general,
+        'sourceFiles': source_files
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='西药药二分块增量提取与合并')
+    parser.add_argument('chunks', nargs='*', help='分块文件（按页码顺序），默认使用内置列表')
+    parser.add_argument('--output', '-o', default='shuju/西药药二_合并完整版.json', help='输出文件')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='中间结果缓存目录')
+    parser.add_argument('--no-cache', action='store_true', help='不读写缓存，全部重新提取')
+    parser.add_argument('--workers', '-w', type=int, default=os.cpu_count() or 1, help='并行进程数')
+
+    args = parser.parse_args()
+
+    print("=== 西药药二分块增量合并 ===\n")
+
+    paths = []
+    for path in args.chunks or DEFAULT_CHUNKS:
+        if os.path.exists(path):
+            paths.append(path)
+        else:
+            print(f"⚠️ 文件不存在，跳过: {path}")
+
+    chunks = load_or_extract(paths, None if args.no_cache else args.cache_dir, args.workers)
+
+    print("\n🔄 正在合并章节...")
+    chapters = merge_chunks(chunks)
+    stats = calculate_statistics(chapters, paths)
+
+    print("\n📈 合并统计:")
+    print(f"   - 章节数: {stats['totalChapters']}")
+    print(f"   - 小节数: {stats['totalSections']}")
+    print(f"   - 知识点数: {stats['totalPoints']}")
+    print(f"   - 通用内容数: {stats['totalGeneralContent']}")
+
+    output = {
+        'metadata': {
+            'title': '西药药二知识图谱完整版',
+            'subject_code': 'xiyao_yaoxue_er',
+            'created_at': datetime.now().isoformat(),
+            'statistics': stats
+        },
+        'chapters': chapters
+    }
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+
+    print(f"\n✅ 合并完成！输出文件: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+版面/分块 JSON 规范化工具
+========================
+shuju/ 下的 MinerU 版面 JSON 与分块 JSON 来源不一：有的带 BOM、有的是 GBK，
+有的被 ```json 代码块包裹、由多个 JSON 片段拼接而成，文本中还混有全角标点与各种空白。
+
+本工具在提取之前统一处理：
+  1. 检测编码（BOM / UTF-8 / GB18030），统一输出 UTF-8；
+  2. 对所有字符串值应用预先构建的 str.translate 转换表：
+     全角字母数字与符号转半角（保留中文句读 ，！？；（）），各类空白统一为半角空格并合并；
+  3. 逐页/逐元素流式读写，不一次性载入整个文件。
+
+用法：
+  python normalize_layout.py shuju/layout.json
+  python normalize_layout.py shuju/执业药师西药二补充.json -o shuju/执业药师西药二补充.clean.json
+  python normalize_layout.py shuju/layout.json --force     # 覆盖已有输出
+
+输出默认写到同目录的 <原文件名>.clean.json（<原文件名>.normalized.json 由
+scripts/normalize-supplement.ts 生成并被 merge_xiyao_er_chunks.py 读取，不能占用）；
+输出文件已存在时不覆盖，除非指定 --force。
+代码块包裹或多片段拼接的源文件输出为片段数组。
+"""
+
+import argparse
+import codecs
+import json
+import os
+import re
+from typing import Any, Iterator, Optional, TextIO
+
+
+# 中文句读保留全角，其余全角 ASCII 区字符（！～ U+FF01-U+FF5E）转半角
+KEEP_FULLWIDTH = '，！？；（）'
+
+FULLWIDTH_TABLE = {
+    code: code - 0xFEE0
+    for code in range(0xFF01, 0xFF5F)
+    if chr(code) not in KEEP_FULLWIDTH
+}
+
+# 各类空白统一为半角空格，零宽字符与 BOM 删除；换行保留
+WHITESPACE_TABLE = {
+    ord(ch): ' ' for ch in '\t\u00a0\u2000\u2001\u2002\u2003\u2004\u2005\u2006'
+                           '\u2007\u2008\u2009\u200a\u202f\u205f\u3000'
+}
+WHITESPACE_TABLE.update({ord(ch): None for ch in '\u200b\u200c\u200d\u2060\ufeff'})
+
+NORMALIZE_TABLE = {**FULLWIDTH_TABLE, **WHITESPACE_TABLE}
+
+MULTI_SPACE = re.compile(r' {2,}')
+
+BOM_ENCODINGS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+CHUNK_SIZE = 1 << 20
+
+
+def detect_encoding(path: str, sample_size: int = 1 << 16) -> str:
+    """检测文件编码：优先 BOM，其次 UTF-8 严格解码采样，失败则视为 GB18030"""
+    with open(path, 'rb') as f:
+        sample = f.read(sample_size)
+
+    for bom, encoding in BOM_ENCODINGS:
+        if sample.startswith(bom):
+            return encoding
+
+    # 增量解码器容忍采样末尾被截断的多字节字符
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'gb18030'
+
+
+def normalize_text(text: str) -> str:
+    """全角转半角、空白统一并合并"""
+    text = text.translate(NORMALIZE_TABLE)
+    if '  ' in text:
+        text = MULTI_SPACE.sub(' ', text)
+    return text
+
+
+def normalize_value(value: Any) -> Any:
+    """递归规范化 JSON 值中的所有字符串（键名不变）"""
+    if isinstance(value, str):
+        return normalize_text(value)
+    if isinstance(value, list):
+        return [normalize_value(v) for v in value]
+    if isinstance(value, dict):
+        return {k: normalize_value(v) for k, v in value.items()}
+    return value
+
+
+class JsonStreamReader:
+    """基于 raw_decode 的增量 JSON 读取器
+
+    只在缓冲区中保留尚未消费的文本，数组与对象的成员可以逐个读取，
+    单个值不完整时自动补读。
+    """
+
+    def __init__(self, fp: TextIO, chunk_size: int = CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, size: Optional[int] = None) -> bool:
+        if self.eof:
+            return False
+        chunk = self.fp.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """跳过空白，返回下一个字符（文件结束返回空串）"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, ch: str):
+        if self.peek() != ch:
+            raise ValueError(f"JSON 格式错误：期望 {ch!r}，实际 {self.peek()!r}")
+        self.pos += 1
+
+    def skip_line(self):
+        """跳过当前行（用于代码块标记 ```json）"""
+        while True:
+            end = self.buf.find('\n', self.pos)
+            if end >= 0:
+                self.pos = end + 1
+                return
+            self.pos = len(self.buf)
+            if not self._fill():
+                return
+
+    def read_value(self) -> Any:
+        """读取一个完整的 JSON 值"""
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # 数字等标量可能恰好被缓冲区截断
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill(size)
+            size *= 2
+
+    def iter_array(self) -> Iterator[Any]:
+        """逐个读取数组元素（当前位置应为 '['）"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.read_value()
+            ch = self.peek()
+            self.pos += 1
+            if ch == ']':
+                return
+            if ch != ',':
+                raise ValueError(f"JSON 格式错误：数组中出现 {ch!r}")
+
+    def iter_object(self) -> Iterator[str]:
+        """逐个读取对象键名，调用方负责在每次迭代后读取对应的值（当前位置应为 '{'）"""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self.expect(':')
+            yield key
+            ch = self.peek()
+            self.pos += 1
+            if ch == '}':
+                return
+            if ch != ',':
+                raise ValueError(f"JSON 格式错误：对象中出现 {ch!r}")
+
+
+def _dump(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _write_streamed(reader: JsonStreamReader, out: TextIO, depth: int = 0):
+    """规范化并写出一个值；顶层对象/数组及其下一层数组逐元素流式处理"""
+    ch = reader.peek()
+    if depth < 2 and ch == '[':
+        out.write('[')
+        for i, item in enumerate(reader.iter_array()):
+            out.write(',\n' if i else '\n')
+            out.write(_dump(normalize_value(item)))
+        out.write('\n]')
+    elif depth < 1 and ch == '{':
+        out.write('{')
+        for i, key in enumerate(reader.iter_object()):
+            out.write(',\n' if i else '\n')
+            out.write(_dump(key) + ': ')
+            _write_streamed(reader, out, depth + 1)
+        out.write('\n}')
+    else:
+        out.write(_dump(normalize_value(reader.read_value())))
+
+
+def normalize_file(input_path: str, output_path: str) -> dict:
+    """流式规范化一个 JSON 文件，返回统计信息"""
+    encoding = detect_encoding(input_path)
+
+    with open(input_path, 'r', encoding=encoding, newline='') as src, \
+            open(output_path, 'w', encoding='utf-8') as out:
+        reader = JsonStreamReader(src)
+        fenced = reader.peek() == '`'
+        blocks = 0
+        skipped = 0
+
+        if fenced:
+            # 代码块包裹 / 多片段拼接：输出为片段数组，残缺片段跳过到下一行继续
+            out.write('[')
+            while True:
+                ch = reader.peek()
+                if not ch:
+                    break
+                if ch not in '{[':
+                    reader.skip_line()
+                    continue
+                try:
+                    block = reader.read_value()
+                except json.JSONDecodeError:
+                    skipped += 1
+                    reader.skip_line()
+                    continue
+                out.write(',\n' if blocks else '\n')
+                out.write(_dump(normalize_value(block)))
+                blocks += 1
+            out.write('\n]\n')
+        else:
+            _write_streamed(reader, out)
+            out.write('\n')
+            blocks = 1
+
+    return {'encoding': encoding, 'fenced': fenced, 'blocks': blocks, 'skipped': skipped,
+            'input_size': os.path.getsize(input_path),
+            'output_size': os.path.getsize(output_path)}
+
+
+def default_output_path(input_path: str) -> str:
+    root, ext = os.path.splitext(input_path)
+    return f"{root}.clean{ext or '.json'}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='版面/分块 JSON 编码检测与文本规范化')
+    parser.add_argument('inputs', nargs='+', help='输入 JSON 文件')
+    parser.add_argument('--output', '-o', help='输出文件（仅单个输入时可用）')
+    parser.add_argument('--force', action='store_true', help='输出文件已存在时覆盖')
+
+    args = parser.parse_args()
+    if args.output and len(args.inputs) > 1:
+        parser.error('多个输入文件时不能指定 --output')
+
+    print("=== JSON 规范化 ===\n")
+    for input_path in args.inputs:
+        if not os.path.exists(input_path):
+            print(f"⚠️ 文件不存在，跳过: {input_path}")
+            continue
+        output_path = args.output or default_output_path(input_path)
+        if os.path.exists(output_path) and not args.force:
+            print(f"⚠️ 输出文件已存在，跳过（--force 覆盖）: {output_path}")
+            continue
+        stats = normalize_file(input_path, output_path)
+        fenced = f"，代码块片段 {stats['blocks']} 个" if stats['fenced'] else ''
+        if stats['skipped']:
+            fenced += f"，残缺片段 {stats['skipped']} 个已跳过"
+        print(f"✅ {input_path} [{stats['encoding']}{fenced}]")
+        print(f"   -> {output_path} ({stats['input_size']:,} -> {stats['output_size']:,} 字节)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""
+PostgreSQL COPY 载荷公共部分
+============================
+各提取 / 对比脚本生成 COPY 载荷时共用的科目代码与文本转义，
+放在这里而不是导入脚本中，提取脚本不必依赖数据库导入模块。
+
+    from pg_copy import DEFAULT_SUBJECT_CODE, copy_text, pg_text_array
+    copy_text('a\tb')            # 'a\\tb'
+    copy_text(None)              # '\\N'
+    pg_text_array(['C1', 'C2'])  # '{"C1","C2"}'
+"""
+
+from typing import List
+
+# knowledge_points / knowledge_tree 中西药药二的科目代码
+DEFAULT_SUBJECT_CODE = 'xiyao_yaoxue_er'
+
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def copy_text(value) -> str:
+    """COPY 文本格式转义（NULL 为 \\N）"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return str(value).translate(COPY_ESCAPES)
+
+
+def pg_text_array(values: List[str]) -> str:
+    return '{' + ','.join('"' + v.replace('\\', '\\\\').replace('"', '\\"') + '"' for v in values) + '}'
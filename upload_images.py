@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图片并发上传工具
+================
+读取 image_catalog.py 生成的图片目录，通过 S3 兼容接口
+（Supabase Storage 的 /storage/v1/s3 端点，或本地 MinIO / moto_server）上传唯一图片：
+
+  - 对象键为目录中按内容寻址的 storage_key，远端已存在（同键同大小）的对象直接跳过；
+  - 有界线程池并发上传，失败按指数退避重试；
+  - --test 模式连接本地 S3 兼容服务并自动创建存储桶，用于演练与回归。
+
+使用方法：
+  python upload_images.py
+  python upload_images.py --catalog shuju/image_catalog.json --workers 16
+  python upload_images.py --test                       # 本地 http://127.0.0.1:9000
+
+连接参数从环境变量读取：
+  S3_ENDPOINT_URL        如 https://<project>.supabase.co/storage/v1/s3
+  S3_ACCESS_KEY_ID / S3_SECRET_ACCESS_KEY / S3_REGION
+  STORAGE_PUBLIC_URL     公开访问前缀，如 https://<project>.supabase.co/storage/v1/object/public
+
+输出：上传报告（远端已存在对象的 storage_key -> 公开 URL；--dry-run 时另列待上传键）
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import boto3
+    from botocore.config import Config
+    from botocore.exceptions import BotoCoreError, ClientError
+except ImportError:
+    print("❌ 需要安装 boto3")
+    print("   运行：pip install boto3")
+    exit(1)
+
+
+DEFAULT_CATALOG = 'shuju/image_catalog.json'
+DEFAULT_BUCKET = 'question-images'
+DEFAULT_PREFIX = 'catalog'
+DEFAULT_REPORT = 'shuju/image_upload_report.json'
+
+TEST_ENDPOINT = 'http://127.0.0.1:9000'
+TEST_CREDENTIALS = ('minioadmin', 'minioadmin')
+
+CONTENT_TYPES = {
+    'jpeg': 'image/jpeg', 'png': 'image/png', 'gif': 'image/gif',
+    'webp': 'image/webp', 'bmp': 'image/bmp', 'avif': 'image/avif',
+}
+
+# 不可重试的客户端错误
+FATAL_ERROR_CODES = {'AccessDenied', 'InvalidAccessKeyId', 'SignatureDoesNotMatch', 'NoSuchBucket'}
+
+
+def create_client(endpoint_url: Optional[str], access_key: Optional[str],
+                  secret_key: Optional[str], region: str, pool_size: int):
+    """创建 S3 客户端（连接池与并发数一致，重试由本工具自行控制）"""
+    config = Config(
+        max_pool_connections=pool_size,
+        retries={'max_attempts': 1},
+        s3={'addressing_style': 'path'},
+    )
+    return boto3.client(
+        's3',
+        endpoint_url=endpoint_url,
+        aws_access_key_id=access_key,
+        aws_secret_access_key=secret_key,
+        region_name=region,
+        config=config,
+    )
+
+
+def ensure_bucket(client, bucket: str):
+    """测试模式下自动创建存储桶"""
+    try:
+        client.head_bucket(Bucket=bucket)
+    except ClientError:
+        client.create_bucket(Bucket=bucket)
+        print(f"   📦 已创建存储桶: {bucket}")
+
+
+def list_remote_objects(client, bucket: str, prefix: str) -> Dict[str, int]:
+    """一次分页列举前缀下的对象，返回 键 -> 字节数"""
+    remote = {}
+    paginator = client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get('Contents', []):
+            remote[obj['Key']] = obj['Size']
+    return remote
+
+
+def upload_with_retry(client, bucket: str, key: str, entry: Dict,
+                      attempts: int, base_delay: float) -> Tuple[str, int, Optional[str]]:
+    """上传单个对象，可重试错误按指数退避（带抖动）重试；返回 (键, 尝试次数, 错误信息)"""
+    path = entry['paths'][0]
+    for attempt in range(1, attempts + 1):
+        try:
+            with open(path, 'rb') as f:
+                client.put_object(
+                    Bucket=bucket,
+                    Key=key,
+                    Body=f,
+                    ContentType=CONTENT_TYPES.get(entry.get('format'), 'application/octet-stream'),
+                    CacheControl='public, max-age=31536000, immutable',
+                    Metadata={'sha256': entry['sha256']},
+                )
+            return key, attempt, None
+        except ClientError as e:
+            code = e.response.get('Error', {}).get('Code', '')
+            if code in FATAL_ERROR_CODES or attempt == attempts:
+                return key, attempt, f"{code}: {e}"
+        except (BotoCoreError, OSError) as e:
+            if attempt == attempts:
+                return key, attempt, str(e)
+        time.sleep(base_delay * (2 ** (attempt - 1)) * (1 + random.random()))
+    return key, attempts, 'unreachable'
+
+
+def plan_uploads(images: List[Dict], remote: Dict[str, int], prefix: str) -> Tuple[List[Tuple[str, Dict]], int]:
+    """按内容寻址键比对远端，返回待上传列表与跳过数"""
+    pending = []
+    skipped = 0
+    for entry in images:
+        key = f"{prefix}/{entry['storage_key']}" if prefix else entry['storage_key']
+        if remote.get(key) == entry['bytes']:
+            skipped += 1
+        else:
+            pending.append((key, entry))
+    return pending, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description='按图片目录并发上传到 S3 兼容存储（跳过已存在对象）')
+    parser.add_argument('--catalog', default=DEFAULT_CATALOG, help='image_catalog.py 生成的目录文件')
+    parser.add_argument('--bucket', default=DEFAULT_BUCKET, help='存储桶')
+    parser.add_argument('--prefix', default=DEFAULT_PREFIX, help='对象键前缀')
+    parser.add_argument('--workers', '-w', type=int, default=8, help='并发上传数')
+    parser.add_argument('--retries', type=int, default=4, help='单个对象最多尝试次数')
+    parser.add_argument('--retry-delay', type=float, default=0.5, help='首次重试等待秒数')
+    parser.add_argument('--report', default=DEFAULT_REPORT, help='上传报告输出文件')
+    parser.add_argument('--dry-run', action='store_true', help='只比对远端，不上传')
+    parser.add_argument('--test', action='store_true', help=f'连接本地 S3 兼容服务（默认 {TEST_ENDPOINT}）')
+
+    args = parser.parse_args()
+
+    print("=== 图片并发上传 ===\n")
+
+    if not os.path.exists(args.catalog):
+        print(f"❌ 找不到图片目录文件: {args.catalog}（先运行 python image_catalog.py）")
+        return
+
+    with open(args.catalog, 'r', encoding='utf-8') as f:
+        images = json.load(f).get('images', [])
+
+    endpoint = os.environ.get('S3_ENDPOINT_URL')
+    access_key = os.environ.get('S3_ACCESS_KEY_ID')
+    secret_key = os.environ.get('S3_SECRET_ACCESS_KEY')
+    if args.test:
+        endpoint = endpoint or TEST_ENDPOINT
+        access_key = access_key or TEST_CREDENTIALS[0]
+        secret_key = secret_key or TEST_CREDENTIALS[1]
+    elif not endpoint:
+        print("❌ 未设置 S3_ENDPOINT_URL（或使用 --test 连接本地服务）")
+        return
+
+    client = create_client(endpoint, access_key, secret_key,
+                           os.environ.get('S3_REGION', 'us-east-1'), args.workers)
+    print(f"🔗 端点: {endpoint}  存储桶: {args.bucket}")
+    if args.test:
+        ensure_bucket(client, args.bucket)
+
+    remote = list_remote_objects(client, args.bucket, args.prefix)
+    pending, skipped = plan_uploads(images, remote, args.prefix)
+    pending_bytes = sum(entry['bytes'] for _, entry in pending)
+    print(f"📊 唯一图片 {len(images)} 张：远端已存在 {skipped}，待上传 {len(pending)} ({pending_bytes:,} 字节)")
+
+    failures = []
+    retried = 0
+    if pending and not args.dry_run:
+        started = time.time()
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            futures = [pool.submit(upload_with_retry, client, args.bucket, key, entry,
+                                   args.retries, args.retry_delay)
+                       for key, entry in pending]
+            for done, future in enumerate(as_completed(futures), 1):
+                key, attempts, error = future.result()
+                retried += attempts > 1
+                if error:
+                    failures.append({'key': key, 'error': error})
+                    print(f"   ❌ {key}: {error}")
+                elif done % 50 == 0 or done == len(futures):
+                    print(f"   ✅ [{done}/{len(futures)}]")
+        elapsed = time.time() - started
+        print(f"\n⏱️  上传耗时 {elapsed:.2f} 秒，重试 {retried} 个，失败 {len(failures)} 个")
+
+    # 只列出远端确实存在的对象：已存在的，加上本次上传成功的（--dry-run 不上传）
+    public_base = os.environ.get('STORAGE_PUBLIC_URL', f"{endpoint.rstrip('/')}")
+    failed_keys = {f['key'] for f in failures}
+    pending_keys = {key for key, _ in pending}
+    not_uploaded = pending_keys if args.dry_run else failed_keys
+    urls = {}
+    for entry in images:
+        key = f"{args.prefix}/{entry['storage_key']}" if args.prefix else entry['storage_key']
+        if key not in not_uploaded:
+            urls[entry['storage_key']] = f"{public_base}/{args.bucket}/{key}"
+
+    report = {
+        'endpoint': endpoint,
+        'bucket': args.bucket,
+        'uploaded': 0 if args.dry_run else len(pending) - len(failures),
+        'skipped': skipped,
+        'failures': failures,
+        'pending': sorted(pending_keys) if args.dry_run else [],
+        'urls': urls,
+    }
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"\n✅ 上传报告: {args.report}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,763 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+题库校验引擎
+============
+题目分散在 shuju/ 下的 JSON、粘贴的原始文本和各批导入 SQL 中，原有的检查
+（question_parser_advanced.py、json_to_sql.py）各自只覆盖一种格式、一两条规则。
+
+本工具把所有来源统一成同一种题目记录，再跑同一套规则：
+  - 规则注册表：@rule 装饰器登记，分单题规则与整份来源规则（如题号重复），
+    --rules 只跑指定规则，--list-rules 查看全部；
+  - 来源适配：历年真题 JSON（经 import_exam_history 规范化，与导入结果一致）、
+    章节练习题库、通用题目数组、原始文本（"1. 题干 / A.选项 / 正确答案：C / 解题思路："）、
+    SQL 中 INSERT INTO questions / question ... VALUES 与 COPY questions* FROM stdin 载荷；
+  - 按文件并行（ProcessPoolExecutor），全库校验在数秒内完成；
+  - 输出一份机器可读的 JSON 报告：规则统计、来源统计与全部问题明细。
+
+使用方法：
+  python validate_questions.py
+  python validate_questions.py shuju/执业药师西药二1200题原.json --rules answer_in_options,multi_answer_type
+  python validate_questions.py --list-rules
+  python validate_questions.py --strict            # 有 error 级问题时退出码为 1
+
+输入：shuju/ 下的题目 JSON、题库原始数据*.txt、根目录与 shuju/ 下的 SQL（默认）
+输出：shuju/题库校验报告.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from import_exam_history import (OPTION_PATTERN, infer_source, load_questions, normalize_source,
+                                 parse_answer)
+from normalize_layout import detect_encoding
+
+
+DEFAULT_OUTPUT = 'shuju/题库校验报告.json'
+DEFAULT_PATTERNS = {
+    'json': ['shuju/*.json', 'shuju/20*年*/*.json'],
+    'text': ['题库原始数据*.txt'],
+    'sql': ['*.sql', 'shuju/*.sql'],
+}
+
+MULTIPLE_TYPES = {'multiple', '多项选择题', '多选题', 'X型题'}
+JUDGE_TYPES = {'judge', 'true_false', '判断题'}
+# 各题型允许的选项数（闭区间）
+OPTION_COUNTS = {'single': (4, 5), 'multiple': (4, 5), 'judge': (2, 2)}
+
+ANSWER_LETTERS = re.compile(r'[A-Z]')
+ANSWER_NOISE = re.compile(r'[\s,，、;；]+')
+
+
+@dataclass
+class QuestionItem:
+    """各来源统一后的题目记录"""
+    source: str                 # 文件路径
+    location: str               # 定位：第N题 / 第N行
+    number: Optional[int]
+    question_type: str          # 原始题型（single / 多项选择题 ...）
+    content: str
+    options: List[Tuple[str, str]]
+    answer: str
+    explanation: str
+    paper: Optional[str] = None  # 题号查重分组（同一套卷 / 同一小节），None 不查重
+
+
+@dataclass
+class Issue:
+    source: str
+    location: str
+    number: Optional[int]
+    rule: str
+    severity: str
+    message: str
+
+
+@dataclass
+class Rule:
+    name: str
+    severity: str               # error / warning
+    description: str
+    scope: str                  # question / source
+    check: Callable
+
+
+RULES: Dict[str, Rule] = {}
+
+
+def rule(name: str, severity: str, description: str, scope: str = 'question'):
+    """登记规则：question 规则 check(item) 产出提示文字；source 规则 check(items) 产出 (item, 提示)"""
+    def register(func: Callable) -> Callable:
+        RULES[name] = Rule(name, severity, description, scope, func)
+        return func
+    return register
+
+
+def type_category(question_type: str) -> str:
+    if question_type in MULTIPLE_TYPES:
+        return 'multiple'
+    if question_type in JUDGE_TYPES:
+        return 'judge'
+    return 'single'
+
+
+def answer_letters(answer: str) -> List[str]:
+    return ANSWER_LETTERS.findall(ANSWER_NOISE.sub('', answer.upper()))
+
+
+# ==================== 规则 ====================
+
+@rule('empty_content', 'error', '题干为空')
+def check_empty_content(item: QuestionItem) -> Iterator[str]:
+    if not item.content.strip():
+        yield '题干为空'
+
+
+@rule('options_count', 'error', '选项数量与题型不符（单选 / 多选 4-5 个，判断 2 个）')
+def check_options_count(item: QuestionItem) -> Iterator[str]:
+    category = type_category(item.question_type)
+    low, high = OPTION_COUNTS[category]
+    count = len(item.options)
+    if not low <= count <= high:
+        yield f"{item.question_type or category} 有 {count} 个选项（应为 {low}-{high} 个）"
+
+
+@rule('option_keys', 'error', '选项字母重复、不连续或选项内容为空')
+def check_option_keys(item: QuestionItem) -> Iterator[str]:
+    keys = [key for key, _ in item.options]
+    duplicated = sorted(k for k, c in Counter(keys).items() if c > 1)
+    if duplicated:
+        yield f"选项字母重复：{''.join(duplicated)}"
+    expected = [chr(ord('A') + i) for i in range(len(set(keys)))]
+    if not duplicated and keys and keys != expected:
+        yield f"选项字母不连续：{''.join(keys)}"
+    empty = [key for key, value in item.options if not value.strip()]
+    if empty:
+        yield f"选项内容为空：{''.join(empty)}"
+
+
+@rule('answer_missing', 'error', '缺少正确答案')
+def check_answer_missing(item: QuestionItem) -> Iterator[str]:
+    if not answer_letters(item.answer):
+        yield f"答案为空或无法识别：{item.answer!r}" if item.answer.strip() else '缺少答案'
+
+
+@rule('answer_in_options', 'error', '答案字母不在选项中')
+def check_answer_in_options(item: QuestionItem) -> Iterator[str]:
+    if not item.options:
+        return
+    keys = {key for key, _ in item.options}
+    missing = [letter for letter in answer_letters(item.answer) if letter not in keys]
+    if missing:
+        yield f"答案 {item.answer} 中的 {''.join(missing)} 不在选项 {''.join(sorted(keys))} 中"
+
+
+@rule('multi_answer_type', 'error', '多个答案只允许出现在多项选择题')
+def check_multi_answer_type(item: QuestionItem) -> Iterator[str]:
+    letters = answer_letters(item.answer)
+    if len(letters) > 1 and type_category(item.question_type) != 'multiple':
+        yield f"{item.question_type or '单选'} 的答案为 {''.join(letters)}"
+
+
+@rule('multiple_min_answers', 'warning', '多项选择题只有一个答案')
+def check_multiple_min_answers(item: QuestionItem) -> Iterator[str]:
+    letters = answer_letters(item.answer)
+    if len(letters) == 1 and type_category(item.question_type) == 'multiple':
+        yield f"多项选择题只有一个答案 {letters[0]}"
+
+
+@rule('empty_explanation', 'warning', '解析为空')
+def check_empty_explanation(item: QuestionItem) -> Iterator[str]:
+    if not item.explanation.strip():
+        yield '解析为空'
+
+
+@rule('duplicate_number', 'error', '同一套卷 / 同一小节内题号重复', scope='source')
+def check_duplicate_number(items: List[QuestionItem]) -> Iterator[Tuple[QuestionItem, str]]:
+    first_seen: Dict[Tuple[str, int], QuestionItem] = {}
+    for item in items:
+        if item.paper is None or item.number is None:
+            continue
+        key = (item.paper, item.number)
+        if key in first_seen:
+            yield item, f"第{item.number}题与{first_seen[key].location}重复"
+        else:
+            first_seen[key] = item
+
+
+def run_rules(items: List[QuestionItem], rule_names: List[str]) -> List[Issue]:
+    issues = []
+    selected = [RULES[name] for name in rule_names]
+    for item in items:
+        for spec in selected:
+            if spec.scope != 'question':
+                continue
+            for message in spec.check(item):
+                issues.append(Issue(item.source, item.location, item.number, spec.name, spec.severity, message))
+    for spec in selected:
+        if spec.scope != 'source':
+            continue
+        for item, message in spec.check(items):
+            issues.append(Issue(item.source, item.location, item.number, spec.name, spec.severity, message))
+    return issues
+
+
+# ==================== 来源适配 ====================
+
+def option_pairs(raw) -> List[Tuple[str, str]]:
+    """选项统一为 [(字母, 内容)]；与 import_exam_history.parse_options 不同，重复字母原样保留供规则检查"""
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError:
+            raw = [line for line in raw.splitlines() if line.strip()]
+    if isinstance(raw, dict):
+        return [(str(k).strip().upper(), str(v or '')) for k, v in raw.items()]
+    pairs = []
+    for idx, option in enumerate(raw or []):
+        if isinstance(option, dict):
+            pairs.append((str(option.get('key', '')).strip().upper(), str(option.get('value') or '')))
+            continue
+        match = OPTION_PATTERN.match(str(option))
+        if match:
+            pairs.append((match.group(1).upper(), match.group(2).strip()))
+        else:
+            pairs.append((chr(ord('A') + idx), str(option)))
+    return pairs
+
+
+def to_int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def load_json(path: str):
+    with open(path, 'r', encoding=detect_encoding(path)) as f:
+        return json.load(f)
+
+
+def history_items(path: str) -> Optional[List[QuestionItem]]:
+    """历年真题：校验 normalize_source 规范化后的记录（配伍题已补齐共用选项），
+    但答案取原始字段，避免 normalize_answer 截断单选题的多字母答案"""
+    source = infer_source(path)
+    if source is None:
+        return None
+    questions = load_questions(path)
+    if questions is None:
+        return None
+    source.questions = questions
+    raw_answers = {}
+    for q in questions:
+        answers, _ = parse_answer(str(q.get('answer') or ''))
+        if len(answers) == 1:
+            raw_answers[to_int(q.get('number'))] = answers[0]
+
+    rows, _ = normalize_source(source)
+    paper = f"{source.year}:{source.subject}"
+    return [QuestionItem(
+        source=path,
+        location=f"第{row['question_number']}题",
+        number=row['question_number'],
+        question_type=row['chapter'].split('、')[-1],
+        content=row['content'],
+        options=[(o['key'], o['value']) for o in row['options']],
+        answer=raw_answers.get(row['question_number'], row['correct_answer']),
+        explanation=row['explanation'],
+        paper=paper,
+    ) for row in rows]
+
+
+def chapter_items(path: str, data: List[Dict]) -> List[QuestionItem]:
+    """章节练习题库（chapter/section/qtype/qno/stem/options/answer/explanation）"""
+    return [QuestionItem(
+        source=path,
+        location=f"{q.get('chapter', '')[:4]} {q.get('section', '')[:4]} 第{q.get('qno')}题",
+        number=to_int(q.get('qno')),
+        question_type=str(q.get('qtype') or ''),
+        content=str(q.get('stem') or ''),
+        options=option_pairs(q.get('options')),
+        answer=str(q.get('answer') or ''),
+        explanation=str(q.get('explanation') or ''),
+        paper=f"{q.get('chapter', '')}/{q.get('section', '')}",
+    ) for q in data]
+
+
+def generic_items(path: str, data: List[Dict]) -> List[QuestionItem]:
+    """通用题目数组：question_parser.py 导出、数据库导出的 questions 等"""
+    items = []
+    for idx, q in enumerate(data):
+        number = to_int(q.get('question_number', q.get('number')))
+        items.append(QuestionItem(
+            source=path,
+            location=f"第{number}题" if number is not None else f"第{idx + 1}条",
+            number=number,
+            question_type=str(q.get('question_type') or q.get('type') or q.get('qtype') or ''),
+            content=str(q.get('content') or q.get('question') or q.get('stem') or ''),
+            options=option_pairs(q.get('options')),
+            answer=str(q.get('correct_answer') or q.get('answer') or ''),
+            explanation=str(q.get('explanation') or q.get('analysis') or ''),
+            paper=f"{q.get('subject', '')}:{q.get('source_year', '')}" if number is not None else None,
+        ))
+    return items
+
+
+def json_items(path: str) -> Tuple[Optional[List[QuestionItem]], str]:
+    items = history_items(path)
+    if items is not None:
+        return items, '历年真题'
+    data = load_json(path)
+    if isinstance(data, dict):
+        data = data.get('questions')
+    if not isinstance(data, list) or not data or not all(isinstance(q, dict) for q in data):
+        return None, ''
+    if all('stem' in q and 'qno' in q for q in data):
+        return chapter_items(path, data), '章节练习'
+    if all(('content' in q or 'question' in q or 'stem' in q) and 'options' in q for q in data):
+        return generic_items(path, data), 'JSON'
+    return None, ''
+
+
+# ---------- 原始文本 ----------
+
+TEXT_SECTION = re.compile(r'^[一二三四五六七八九十]+\s*[、．.]\s*(最佳选择题|配伍选择题|综合分析(?:选择)?题|多项选择题)')
+TEXT_GROUP = re.compile(r'^[【\[]\s*(\d+)\s*[-－~～]\s*(\d+)\s*[】\]]')
+TEXT_QUESTION = re.compile(r'^(\d{1,3})\s*[\.．、](?!\d)\s*(.*)$')
+TEXT_ORPHAN_STEM = re.compile(r'^[\.．]\s*(\S.*)$')      # PDF 复制时题号掉到下一行：".题干" + "1"
+TEXT_OPTION = re.compile(r'^([A-E])\s*[\.．、]\s*(.*)$')
+TEXT_ANSWER = re.compile(r'^(?:正确)?答案\s*[：:]\s*(.*)$')
+TEXT_EXPLANATION = re.compile(r'^(?:解题思路|解析|答案解析)\s*[：:]\s*(.*)$')
+
+
+class TextQuestionParser:
+    """逐行解析粘贴的原始题目文本，配伍题【41-43】组内共用选项、答案 "C,D,B" 依次分配"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.items: List[QuestionItem] = []
+        self.question_type = ''
+        self.current: Optional[QuestionItem] = None
+        self.group: Optional[Dict] = None
+        self.field = ''                 # 续行归属：content / option / explanation
+        self.papers = 0
+
+    def accepts_question(self) -> bool:
+        """题号行只在上一题已结束（有答案）或配伍组已给出共用选项时才开始新题，避免把续行里的数字当题号"""
+        if self.current is None or self.current.answer:
+            return True
+        return bool(self.group and self.group['options'])
+
+    def start(self, number: Optional[int], text: str, lineno: int):
+        if self.group and self.group['answered']:
+            self.group = None
+        self.current = QuestionItem(
+            source=self.path,
+            location=f"第{lineno}行",
+            number=number,
+            question_type=self.question_type,
+            content=text.strip(),
+            options=list(self.group['options']) if self.group else [],
+            answer='',
+            explanation='',
+            paper=f"{self.path}#{self.papers}",
+        )
+        self.items.append(self.current)
+        if self.group:
+            self.group['members'].append(self.current)
+        self.field = 'content'
+
+    def set_answer(self, text: str):
+        answers, _ = parse_answer(text)
+        members = self.group['members'] if self.group and self.group['members'] else [self.current]
+        if len(answers) > 1 and len(answers) <= len(members) and type_category(self.question_type) != 'multiple':
+            for member, answer in zip(members[-len(answers):], answers):
+                member.answer = answer
+        elif self.current is not None:
+            self.current.answer = ''.join(answers) or text.strip()
+        if self.group:
+            self.group['answered'] = True
+        self.field = ''
+
+    def set_explanation(self, text: str):
+        members = self.group['members'] if self.group and self.group['members'] else [self.current]
+        for member in members:
+            if member is not None:
+                member.explanation = text
+        self.field = 'explanation'
+
+    def append(self, line: str):
+        if self.field == 'explanation':
+            members = self.group['members'] if self.group and self.group['members'] else [self.current]
+            for member in members:
+                member.explanation += line
+        elif self.field == 'option' and self.current is not None and self.current.options:
+            key, value = self.current.options[-1]
+            self.current.options[-1] = (key, value + line)
+        elif self.field == 'content' and self.current is not None:
+            if self.current.number is None and line.isdigit():
+                self.current.number = int(line)
+            else:
+                self.current.content += line
+
+    def parse(self) -> List[QuestionItem]:
+        with open(self.path, 'r', encoding=detect_encoding(self.path)) as f:
+            lines = f.read().splitlines()
+        # 第一个题型标题之前是说明文字；"一、" 每出现一次视为一套新卷（模板示例题不与正文查重）
+        headers = [i for i, line in enumerate(lines) if TEXT_SECTION.match(line.strip())]
+        start = headers[0] if headers else 0
+        for lineno, raw_line in enumerate(lines[start:], start + 1):
+            line = raw_line.strip()
+            if not line:
+                continue
+            match = TEXT_SECTION.match(line)
+            if match:
+                if line.startswith('一'):
+                    self.papers += 1
+                self.question_type = match.group(1)
+                self.current, self.group, self.field = None, None, ''
+                continue
+            if TEXT_GROUP.match(line):
+                self.current = None
+                self.group = {'options': [], 'members': [], 'answered': False}
+                self.field = ''
+                continue
+            match = TEXT_OPTION.match(line)
+            if match and self.field != 'explanation':
+                option = (match.group(1), match.group(2).strip())
+                if self.group is not None and not self.group['members']:
+                    self.group['options'].append(option)
+                elif self.current is not None and not self.current.answer:
+                    if self.group and self.current.options == self.group['options']:
+                        self.current.options = []       # 组内单题自带选项
+                    self.current.options.append(option)
+                    self.field = 'option'
+                continue
+            match = TEXT_QUESTION.match(line)
+            if match and self.accepts_question():
+                self.start(int(match.group(1)), match.group(2), lineno)
+                continue
+            match = TEXT_ORPHAN_STEM.match(line)
+            if match and self.accepts_question():
+                self.start(None, match.group(1), lineno)
+                continue
+            match = TEXT_ANSWER.match(line)
+            if match and (self.current is not None or self.group):
+                self.set_answer(match.group(1))
+                continue
+            match = TEXT_EXPLANATION.match(line)
+            if match and self.current is not None:
+                self.set_explanation(match.group(1).strip())
+                continue
+            self.append(line)
+        return self.items
+
+
+# ---------- SQL ----------
+
+SQL_INSERT = re.compile(r'INSERT\s+INTO\s+(?:public\.)?"?(questions?)"?\s*\(([^)]*)\)\s*VALUES', re.I)
+SQL_COPY = re.compile(r'^COPY\s+(?:public\.)?"?(questions(?:_\w+)?)"?\s*\(([^)]*)\)\s+FROM\s+stdin;?\s*$',
+                      re.I | re.M)
+SQL_STRING = re.compile(r"^[Ee]?'((?:[^']|'')*)'(?:\s*::\s*[\w\[\]]+)?$", re.S)
+SQL_COMMENT = re.compile(r'--[^\n]*')
+SQL_ID_NUMBER = re.compile(r'^[A-Za-z0-9]+_[A-Za-z]+_(\d{1,3})$')     # 2024_zyyz_001
+COPY_ESCAPE = re.compile(r'\\(.)')
+COPY_UNESCAPE = {'t': '\t', 'n': '\n', 'r': '\r'}
+COLUMN_ALIASES = {'question_text': 'content', 'stem': 'content', 'answer': 'correct_answer',
+                  'analysis': 'explanation', 'qtype': 'question_type'}
+
+
+def skip_blank(text: str, pos: int) -> int:
+    """跳过空白与 -- 注释"""
+    while pos < len(text):
+        if text[pos].isspace():
+            pos += 1
+        elif text.startswith('--', pos):
+            end = text.find('\n', pos)
+            pos = len(text) if end < 0 else end + 1
+        else:
+            break
+    return pos
+
+
+def split_tuple(text: str, pos: int) -> Tuple[List[str], int]:
+    """pos 指向 '(' 之后；按顶层逗号切分值表达式，返回 (表达式列表, ')' 之后的位置)"""
+    values = []
+    start = pos
+    depth = 0
+    while pos < len(text):
+        ch = text[pos]
+        if ch == "'":
+            pos += 1
+            while pos < len(text):
+                if text[pos] == "'":
+                    if text.startswith("''", pos):
+                        pos += 2
+                        continue
+                    break
+                pos += 1
+        elif text.startswith('--', pos):
+            end = text.find('\n', pos)
+            pos = len(text) - 1 if end < 0 else end
+        elif ch in '([':
+            depth += 1
+        elif ch in ')]':
+            if depth == 0:
+                values.append(text[start:pos])
+                return values, pos + 1
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            values.append(text[start:pos])
+            start = pos + 1
+        pos += 1
+    raise ValueError('VALUES 括号未闭合')
+
+
+def sql_value(expr: str):
+    expr = SQL_COMMENT.sub('', expr).strip()
+    match = SQL_STRING.match(expr)
+    if match:
+        return match.group(1).replace("''", "'")
+    upper = expr.upper()
+    if upper == 'NULL':
+        return None
+    if upper.startswith('ARRAY['):
+        return [s.replace("''", "'") for s in re.findall(r"'((?:[^']|'')*)'", expr)]
+    return expr
+
+
+def sql_row_item(path: str, row: Dict, lineno: int) -> QuestionItem:
+    number = to_int(row.get('question_number'))
+    if number is None:
+        match = SQL_ID_NUMBER.match(str(row.get('id') or ''))
+        number = int(match.group(1)) if match else None
+    year = row.get('source_year')
+    return QuestionItem(
+        source=path,
+        location=f"第{lineno}行",
+        number=number,
+        question_type=str(row.get('question_type') or ''),
+        content=str(row.get('content') or ''),
+        options=option_pairs(row.get('options')),
+        answer=str(row.get('correct_answer') or ''),
+        explanation=str(row.get('explanation') or ''),
+        paper=f"{row.get('subject', '')}:{year}" if year not in (None, '') else None,
+    )
+
+
+def sql_items(path: str) -> Optional[List[QuestionItem]]:
+    with open(path, 'r', encoding=detect_encoding(path)) as f:
+        text = f.read()
+    line_starts = [0] + [m.end() for m in re.finditer('\n', text)]
+
+    def line_of(pos: int) -> int:
+        lo, hi = 0, len(line_starts)
+        while lo + 1 < hi:
+            mid = (lo + hi) // 2
+            if line_starts[mid] <= pos:
+                lo = mid
+            else:
+                hi = mid
+        return lo + 1
+
+    items = []
+    found = False
+    for match in SQL_INSERT.finditer(text):
+        found = True
+        columns = [COLUMN_ALIASES.get(c.strip().strip('"'), c.strip().strip('"')) for c in match.group(2).split(',')]
+        pos = skip_blank(text, match.end())
+        while pos < len(text) and text[pos] == '(':
+            tuple_start = pos
+            values, pos = split_tuple(text, pos + 1)
+            row = dict(zip(columns, (sql_value(v) for v in values)))
+            items.append(sql_row_item(path, row, line_of(tuple_start)))
+            pos = skip_blank(text, pos)
+            if pos < len(text) and text[pos] == ',':
+                pos = skip_blank(text, pos + 1)
+
+    for match in SQL_COPY.finditer(text):
+        found = True
+        columns = [COLUMN_ALIASES.get(c.strip(), c.strip()) for c in match.group(2).split(',')]
+        pos = match.end() + 1
+        lineno = line_of(pos)
+        while pos < len(text):
+            end = text.find('\n', pos)
+            end = len(text) if end < 0 else end
+            line = text[pos:end]
+            pos = end + 1
+            if line == '\\.':
+                break
+            fields = [None if f == '\\N' else COPY_ESCAPE.sub(lambda m: COPY_UNESCAPE.get(m.group(1), m.group(1)), f)
+                      for f in line.split('\t')]
+            items.append(sql_row_item(path, dict(zip(columns, fields)), lineno))
+            lineno += 1
+    return items if found else None
+
+
+# ==================== 执行 ====================
+
+def validate_file(path: str, kind: str, rule_names: List[str]) -> Dict:
+    """校验单个文件（在子进程中运行），返回可 JSON 序列化的结果"""
+    result = {'path': path, 'kind': kind, 'questions': 0, 'issues': [], 'skipped': None}
+    try:
+        if kind == 'json':
+            items, result['kind'] = json_items(path)
+        elif kind == 'text':
+            items, result['kind'] = TextQuestionParser(path).parse() or None, '原始文本'
+        else:
+            items, result['kind'] = sql_items(path), 'SQL'
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        result['skipped'] = f"无法解析：{e}"
+        return result
+    except Exception as e:
+        # 单个文件的意外结构不能中断整个并行校验，记为文件级问题
+        result['issues'] = [asdict(Issue(path, '整个文件', None, 'file_error', 'error',
+                                         f"解析失败：{type(e).__name__}: {e}"))]
+        return result
+    if not items:
+        result['skipped'] = '不含题目数据'
+        return result
+    result['questions'] = len(items)
+    result['issues'] = [asdict(issue) for issue in run_rules(items, rule_names)]
+    return result
+
+
+def discover_files(inputs: List[str]) -> List[Tuple[str, str]]:
+    """返回 [(路径, 类型)]；未指定时按默认模式扫描"""
+    if not inputs:
+        found = []
+        for kind, patterns in DEFAULT_PATTERNS.items():
+            paths = sorted({p for pattern in patterns for p in glob.glob(pattern)})
+            found.extend((p, kind) for p in paths)
+        return found
+    files = []
+    for pattern in inputs:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            ext = os.path.splitext(path)[1].lower()
+            files.append((path, {'.json': 'json', '.txt': 'text', '.sql': 'sql'}.get(ext, 'text')))
+    return files
+
+
+def run_validation(files: List[Tuple[str, str]], rule_names: List[str], workers: int) -> List[Dict]:
+    if workers <= 1 or len(files) <= 1:
+        return [validate_file(path, kind, rule_names) for path, kind in files]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(validate_file, [p for p, _ in files], [k for _, k in files],
+                             [rule_names] * len(files)))
+
+
+def build_report(results: List[Dict], rule_names: List[str], elapsed: float) -> Dict:
+    issues = [issue for result in results for issue in result['issues']]
+    by_rule = Counter(issue['rule'] for issue in issues)
+    by_severity = Counter(issue['severity'] for issue in issues)
+    sources = []
+    for result in results:
+        if result['skipped']:
+            continue
+        severity = Counter(issue['severity'] for issue in result['issues'])
+        sources.append({
+            'path': result['path'],
+            'kind': result['kind'],
+            'questions': result['questions'],
+            'errors': severity['error'],
+            'warnings': severity['warning'],
+            'rules': dict(Counter(issue['rule'] for issue in result['issues']).most_common()),
+        })
+    return {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'elapsed_seconds': round(elapsed, 3),
+        'summary': {
+            'files': len(sources),
+            'questions': sum(s['questions'] for s in sources),
+            'errors': by_severity['error'],
+            'warnings': by_severity['warning'],
+            'file_errors': by_rule['file_error'],
+        },
+        'rules': {name: {'severity': RULES[name].severity, 'description': RULES[name].description,
+                         'count': by_rule[name]} for name in rule_names},
+        'sources': sources,
+        'skipped': [{'path': r['path'], 'reason': r['skipped']} for r in results if r['skipped']],
+        'issues': issues,
+    }
+
+
+def print_summary(report: Dict, output: str):
+    summary = report['summary']
+    print(f"\n📊 校验了 {summary['files']} 个文件、{summary['questions']} 道题，"
+          f"用时 {report['elapsed_seconds']:.2f} 秒")
+    print(f"   ❌ error: {summary['errors']}   ⚠️  warning: {summary['warnings']}")
+    if summary['file_errors']:
+        print(f"   ❌ {summary['file_errors']} 个文件解析失败（规则 file_error，详见报告 issues）")
+    print("\n规则统计：")
+    for name, spec in report['rules'].items():
+        mark = '✅' if not spec['count'] else ('❌' if spec['severity'] == 'error' else '⚠️ ')
+        print(f"   {mark} {name:<22} {spec['count']:>5}  {spec['description']}")
+
+    flagged = [s for s in report['sources'] if s['errors'] or s['warnings']]
+    if flagged:
+        print("\n问题最多的来源：")
+        for source in sorted(flagged, key=lambda s: (-s['errors'], -s['warnings']))[:10]:
+            print(f"   - [{source['kind']}] {source['path']}: {source['questions']} 题，"
+                  f"error {source['errors']}，warning {source['warnings']}")
+    if report['skipped']:
+        print(f"\n跳过 {len(report['skipped'])} 个非题目文件（详见报告 skipped）")
+    print(f"\n✅ 报告已写入：{output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='题库校验：统一规则检查 JSON / 原始文本 / SQL 中的题目')
+    parser.add_argument('inputs', nargs='*', help='要校验的文件或通配符（默认扫描 shuju/、原始文本与 SQL）')
+    parser.add_argument('--rules', help='只运行这些规则（逗号分隔）')
+    parser.add_argument('--list-rules', action='store_true', help='列出全部规则后退出')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='并行进程数（1 为串行）')
+    parser.add_argument('--output', '-o', default=DEFAULT_OUTPUT, help='JSON 报告路径')
+    parser.add_argument('--strict', action='store_true', help='存在 error 级问题时以退出码 1 结束')
+
+    args = parser.parse_args()
+
+    if args.list_rules:
+        print("=== 校验规则 ===\n")
+        for spec in RULES.values():
+            print(f"  {spec.name:<22} [{spec.severity}/{spec.scope}] {spec.description}")
+        return
+
+    rule_names = list(RULES)
+    if args.rules:
+        rule_names = [name.strip() for name in args.rules.split(',') if name.strip()]
+        unknown = [name for name in rule_names if name not in RULES]
+        if unknown:
+            print(f"❌ 未知规则: {', '.join(unknown)}（--list-rules 查看全部）")
+            exit(1)
+
+    files = discover_files(args.inputs)
+    missing = [path for path, _ in files if not os.path.exists(path)]
+    if missing:
+        print(f"❌ 文件不存在: {', '.join(missing)}")
+        exit(1)
+
+    print("=== 题库校验 ===\n")
+    print(f"📂 {len(files)} 个文件，{len(rule_names)} 条规则，{max(args.workers, 1)} 个进程")
+
+    started = time.time()
+    results = run_validation(files, rule_names, args.workers)
+    report = build_report(results, rule_names, time.time() - started)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print_summary(report, args.output)
+
+    if args.strict and report['summary']['errors']:
+        exit(1)
+
+
+if __name__ == '__main__':
+    main()
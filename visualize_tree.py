@@ -2,60 +2,321 @@
 # -*- coding: utf-8 -*-
 """
 可视化知识树结构
+================
+流式读取知识树 JSON（normalize_layout.JsonStreamReader），一次只解码一个章 / 小节，
+不在路径范围内的章节直接跳过，查看多 MB 合并版中的某一节也能立即输出：
+
+  - 路径过滤：--path 2（第 2 章）、--path 2.1（第 2 章第 1 节）、--path 2.1.3（单个考点）；
+  - 深度限制：--depth 1 只列章，2 列到小节，3 列到考点，4 再显示考点详情；
+  - 药物 / 关键词过滤：只显示药物名或标题、内容中包含关键词的考点及其所在章节；
+  - 统计信息在同一遍读取中累计，最后输出。
+
+支持 build_knowledge_tree.py（chapter_id/section_id/point_id）、提取脚本（id/title）
+以及合并版（chapter_number/section_number/parts）三种结构。
+
+使用方法：
+  python visualize_tree.py
+  python visualize_tree.py shuju/西药药二_知识树_v2.json --depth 2
+  python visualize_tree.py --path 6.1 --depth 4
+  python visualize_tree.py --drug 华法林 --max-points 0
+
+输入：知识树 JSON（默认 shuju/西药药二_合并完整版.json）
 """
 
-import json
-import sys
-
-def print_tree(knowledge_tree, indent=0):
-    """打印树状结构"""
-    prefix = "  " * indent
-    
-    if isinstance(knowledge_tree, dict):
-        if 'title' in knowledge_tree:
-            print(f"\n{'='*60}")
-            print(f"{knowledge_tree['title']}")
-            print(f"{'='*60}")
-            print(f"总章节数: {knowledge_tree.get('total_chapters', 0)}")
-            print(f"总节数: {knowledge_tree.get('total_sections', 0)}")
-            print(f"总知识点数: {knowledge_tree.get('total_points', 0)}")
-            print(f"{'='*60}\n")
-        
-        if 'chapters' in knowledge_tree:
-            for chapter in knowledge_tree['chapters']:
-                print(f"{prefix}📚 {chapter.get('chapter_id', '')} {chapter.get('chapter_name', '')}")
-                
-                if 'sections' in chapter:
-                    for section in chapter['sections']:
-                        print(f"{prefix}  📖 {section.get('section_id', '')} {section.get('section_name', '')} ({section.get('point_count', 0)}个知识点)")
-                        
-                        if 'knowledge_points' in section:
-                            for point in section['knowledge_points'][:3]:  # 只显示前3个
-                                print(f"{prefix}    🎯 [{point.get('point_id', '')}] {point.get('point_title', '')[:50]}")
-                                print(f"{prefix}       药物: {point.get('drug_name', '未识别')}")
-                                print(f"{prefix}       类型: {', '.join(point.get('knowledge_types', []))}")
-                                print(f"{prefix}       重要性: {'★' * point.get('importance_level', 3)}")
-                            
-                            if len(section['knowledge_points']) > 3:
-                                print(f"{prefix}    ... 还有 {len(section['knowledge_points']) - 3} 个知识点")
-                        print()
+import argparse
+import os
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+from cn_numerals import CN_NUMERAL_CHARS, cn_to_num
+from import_chapter_questions import DEFAULT_TREE
+from normalize_layout import JsonStreamReader, detect_encoding
+
+
+ORDINAL_PATTERN = re.compile(rf'第?\s*([{CN_NUMERAL_CHARS}\d]+)\s*[章节]?')
+DEFAULT_MAX_POINTS = 3
+
+
+@dataclass
+class TreeStats:
+    """单遍读取中累计的统计"""
+    chapters: int = 0
+    sections: int = 0
+    points: int = 0
+    shown_chapters: int = 0
+    shown_sections: int = 0
+    matched_points: int = 0
+    skipped_chapters: int = 0
+    point_types: Counter = field(default_factory=Counter)
+    drugs: Counter = field(default_factory=Counter)
+    importance: Counter = field(default_factory=Counter)
+    content_chars: int = 0
+
+
+def ordinal_code(value) -> str:
+    """'第1章' / '一' / 3 / '2.1' -> 编号字符串"""
+    text = str(value if value is not None else '').strip()
+    if re.fullmatch(r'\d+(\.\d+)*', text):
+        return text
+    match = ORDINAL_PATTERN.search(text)
+    return str(cn_to_num(match.group(1))) if match else text
+
+
+def content_text(value) -> str:
+    if isinstance(value, list):
+        return '\n'.join(content_text(item) for item in value if item)
+    if isinstance(value, dict):
+        return str(value.get('content') or '')
+    return str(value or '')
+
+
+def normalize_point(point: Dict, code: str) -> Dict:
+    types = point.get('knowledge_types') or ([point['point_type']] if point.get('point_type') else [])
+    return {
+        'code': code,
+        'title': str(point.get('title') or point.get('point_title') or '').strip(),
+        'drug': str(point.get('drug_name') or ''),
+        'types': types,
+        'importance': int(point.get('importance') or point.get('importance_level') or 3),
+        'content': content_text(point.get('content')),
+    }
+
+
+def section_points(section: Dict, section_code: str) -> List[Dict]:
+    points = list(section.get('knowledge_points') or section.get('points') or [])
+    for part in (section.get('parts') or {}).values():
+        points.extend(part.get('knowledge_points', []))
+    result = []
+    for idx, point in enumerate(points, 1):
+        raw_code = str(point.get('id') or point.get('point_id') or '')
+        code = raw_code if raw_code.startswith(section_code + '.') else f"{section_code}.{idx}"
+        result.append(normalize_point(point, code))
+    return result
+
+
+class TreeViewer:
+    def __init__(self, path_filter: Optional[str], depth: int, max_points: int,
+                 drug: Optional[str], keyword: Optional[str]):
+        self.path = path_filter.strip('.') if path_filter else None
+        self.depth = depth
+        self.max_points = max_points
+        self.drug = drug
+        self.keyword = keyword
+        self.stats = TreeStats()
+
+    def in_path(self, code: str) -> bool:
+        """节点与路径过滤互为前缀时需要展开"""
+        if not self.path:
+            return True
+        return code == self.path or code.startswith(self.path + '.') or self.path.startswith(code + '.')
+
+    def matches(self, point: Dict) -> bool:
+        if self.drug and self.drug not in point['drug'] and self.drug not in point['title'] \
+                and self.drug not in point['content']:
+            return False
+        if self.keyword and self.keyword not in point['title'] and self.keyword not in point['content']:
+            return False
+        return True
+
+    @property
+    def filtering(self) -> bool:
+        return bool(self.drug or self.keyword)
+
+    def iter_sections(self, reader: JsonStreamReader, chapter_code: str) -> Iterator[Dict]:
+        for section in reader.iter_array():
+            code = ordinal_code(section.get('id') or section.get('section_id') or '')
+            if not code or '.' not in code:
+                number = section.get('section_number') or section.get('id') or section.get('section_id')
+                code = f"{chapter_code}.{ordinal_code(number)}"
+            yield {'code': code,
+                   'title': str(section.get('title') or section.get('section_title')
+                                or section.get('section_name') or '').strip(),
+                   'points': section_points(section, code)}
+
+    def visit_chapter(self, reader: JsonStreamReader):
+        """逐键读取一个章；sections 之前已得到章编号时，不在路径内的章不展开小节与考点"""
+        chapter: Dict = {}
+        sections: Optional[List[Dict]] = None
+        for key in reader.iter_object():
+            if key != 'sections':
+                chapter[key] = reader.read_value()
+                continue
+            code = self._chapter_code(chapter)
+            if code and not self.in_path(code):
+                reader.read_value()
+                sections = None
+                chapter['_skipped'] = True
+            else:
+                # 章编号可能出现在 sections 之后，此时先收集
+                sections = list(self.iter_sections(reader, code or '?'))
+        code = self._chapter_code(chapter)
+        self.stats.chapters += 1
+        if chapter.get('_skipped') or not self.in_path(code):
+            self.stats.skipped_chapters += 1
+            return
+        if sections and code and sections[0]['code'].startswith('?.'):
+            for section in sections:
+                section['code'] = code + section['code'][1:]
+                for point in section['points']:
+                    point['code'] = code + point['code'][1:]
+        title = str(chapter.get('title') or chapter.get('chapter_title') or chapter.get('chapter_name') or '').strip()
+        self.render_chapter(code, title, sections or [])
+
+    @staticmethod
+    def _chapter_code(chapter: Dict) -> str:
+        value = chapter.get('id') or chapter.get('chapter_id') or chapter.get('chapter_number')
+        return ordinal_code(value) if value is not None else ''
+
+    def render_chapter(self, code: str, title: str, sections: List[Dict]):
+        lines = []
+        shown_sections = 0
+        for section in sections:
+            self.stats.sections += 1
+            if not self.in_path(section['code']):
+                continue
+            points = [p for p in section['points'] if self.in_path(p['code'])]
+            matched = [p for p in points if self.matches(p)]
+            for point in points:
+                self.stats.points += 1
+                self.stats.content_chars += len(point['content'])
+            for point in matched:
+                self.stats.matched_points += 1
+                self.stats.point_types.update(point['types'] or ['未分类'])
+                if point['drug']:
+                    self.stats.drugs[point['drug']] += 1
+                self.stats.importance[point['importance']] += 1
+            if self.filtering and not matched:
+                continue
+            shown_sections += 1
+            if self.depth >= 2:
+                lines.append(f"  📖 {section['code']} {section['title']} ({len(matched)}个知识点)")
+            if self.depth >= 3:
+                lines.extend(self.render_points(matched))
+        if self.filtering and not shown_sections:
+            return
+        self.stats.shown_chapters += 1
+        self.stats.shown_sections += shown_sections
+        print(f"📚 {code} {title}")
+        for line in lines:
+            print(line)
+        if self.depth >= 2:
+            print()
+
+    def render_points(self, points: List[Dict]) -> List[str]:
+        limit = len(points) if self.max_points <= 0 or self.path or self.filtering else self.max_points
+        lines = []
+        for point in points[:limit]:
+            lines.append(f"    🎯 [{point['code']}] {point['title'][:50]}")
+            if self.depth >= 4:
+                lines.append(f"       药物: {point['drug'] or '未识别'}")
+                lines.append(f"       类型: {', '.join(point['types']) or '未分类'}")
+                lines.append(f"       重要性: {'★' * point['importance']}")
+                preview = ' '.join(point['content'].split())[:80]
+                if preview:
+                    lines.append(f"       内容: {preview}")
+        if len(points) > limit:
+            lines.append(f"    ... 还有 {len(points) - limit} 个知识点")
+        return lines
+
+    def run(self, path: str):
+        with open(path, 'r', encoding=detect_encoding(path)) as f:
+            reader = JsonStreamReader(f)
+            header: Dict = {}
+            totals_shown = False
+            for key in reader.iter_object():
+                if key != 'chapters':
+                    header[key] = reader.read_value()
+                    continue
+                self.print_header(header)
+                totals_shown = self.print_totals(header)
+                if totals_shown:
+                    print()
+                for _ in iter_chapter_starts(reader):
+                    self.visit_chapter(reader)
+            if not totals_shown:
+                # total_* 写在 chapters 之后时，读完再补打
+                self.print_totals(header)
+
+    def print_header(self, header: Dict):
+        meta = header.get('metadata') or {}
+        title = header.get('title') or meta.get('title') or header.get('subject') or ''
+        print(f"{'=' * 60}")
+        print(title)
+        print(f"{'=' * 60}\n")
+
+    @staticmethod
+    def print_totals(header: Dict) -> bool:
+        """build_knowledge_tree.py 输出带有 total_* 汇总字段"""
+        labels = [('total_chapters', '总章节数'), ('total_sections', '总节数'), ('total_points', '总知识点数')]
+        present = [(label, header[key]) for key, label in labels if key in header]
+        for label, value in present:
+            print(f"{label}: {value}")
+        return bool(present)
+
+
+def iter_chapter_starts(reader: JsonStreamReader) -> Iterator[None]:
+    """逐个定位 chapters 数组中的章对象，由调用方用 iter_object 读取（不整体解码章对象）"""
+    reader.expect('[')
+    if reader.peek() == ']':
+        reader.pos += 1
+        return
+    while True:
+        yield None
+        ch = reader.peek()
+        reader.pos += 1
+        if ch == ']':
+            return
+        if ch != ',':
+            raise ValueError(f"JSON 格式错误：数组中出现 {ch!r}")
+
+
+def print_stats(stats: TreeStats, elapsed: float, size: int, viewer: TreeViewer):
+    print(f"{'=' * 60}")
+    print("📊 统计（同一遍读取）")
+    print(f"   - 章: {stats.chapters}（显示 {stats.shown_chapters}，路径外跳过 {stats.skipped_chapters}）")
+    print(f"   - 小节（已展开章内）: {stats.sections}（显示 {stats.shown_sections}）")
+    label = '匹配考点' if viewer.filtering else '考点'
+    print(f"   - 考点（路径内）: {stats.points}，{label}: {stats.matched_points}")
+    if stats.point_types:
+        print(f"   - 类型: {', '.join(f'{k} {v}' for k, v in stats.point_types.most_common(6))}")
+    if stats.drugs:
+        print(f"   - 涉及药物: {len(stats.drugs)} 种（{', '.join(k for k, _ in stats.drugs.most_common(5))}）")
+    if stats.importance:
+        print(f"   - 重要性: {', '.join(f'{k}★ {v}' for k, v in sorted(stats.importance.items(), reverse=True))}")
+    print(f"   - 内容字数: {stats.content_chars:,}")
+    print(f"⏱️  {elapsed * 1000:.0f} ms，文件 {size / 1024:.0f} KB")
+
 
 def main():
-    json_file = r'e:\tiku\shuju\西药药二知识树.json'
-    
-    try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            knowledge_tree = json.load(f)
-        
-        print_tree(knowledge_tree)
-        
-    except FileNotFoundError:
-        print(f"❌ 文件不存在: {json_file}")
+    parser = argparse.ArgumentParser(description='流式查看知识树（路径 / 深度 / 药物过滤）')
+    parser.add_argument('input', nargs='?', default=DEFAULT_TREE, help='知识树 JSON')
+    parser.add_argument('--path', '-p', help='只看某章 / 某节 / 某考点，如 2、2.1、2.1.3')
+    parser.add_argument('--depth', '-d', type=int, default=3, choices=[1, 2, 3, 4],
+                        help='显示深度：1 章，2 小节，3 考点，4 考点详情')
+    parser.add_argument('--max-points', type=int, default=DEFAULT_MAX_POINTS,
+                        help='每节最多显示的考点数（0 为不限；指定路径或过滤时不限）')
+    parser.add_argument('--drug', help='只显示涉及该药物的考点')
+    parser.add_argument('--keyword', '-k', help='只显示标题或内容包含关键词的考点')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"❌ 文件不存在: {args.input}")
         print("请先运行 build_knowledge_tree.py 生成知识树文件")
-    except Exception as e:
-        print(f"❌ 发生错误: {e}")
-        import traceback
-        traceback.print_exc()
+        return
+
+    viewer = TreeViewer(args.path, args.depth, args.max_points, args.drug, args.keyword)
+    started = time.time()
+    try:
+        viewer.run(args.input)
+    except ValueError as e:
+        print(f"❌ 知识树格式错误: {e}")
+        return
+    print_stats(viewer.stats, time.time() - started, os.path.getsize(args.input), viewer)
+
 
 if __name__ == '__main__':
     main()